@@ -7,9 +7,21 @@ import streamlit as st
 import pandas as pd
 import io
 import json
+import hashlib
+import queue
 from datetime import datetime
 
-from halal_screener import screen_stock, THRESHOLDS
+from halal_screener import (
+    init, iter_fetch, evaluate_stock, screen_frame, Thresholds, VERDICT_ORDER,
+    RateLimiter, AdaptiveRateLimiter, PRESETS, revalidations_pending,
+)
+from screener_cache import FundamentalsCache
+from screener_warm import Warmer, default_universe
+from screener_jobs import JobStore, start_job, cancel_job, is_running
+from screener_metrics import METRICS, summarize
+from screener_results import ResultsTable, verdict_counts
+
+init()
 
 # ─────────────────────────────────────────────
 #  PAGE CONFIG — must be first
@@ -146,17 +158,6 @@ hr { border-color: var(--navy-edge) !important; margin: 1.5rem 0 !important; }
 #  HELPERS
 # ═══════════════════════════════════════════════════════════════
 
-PRESETS = {
-    "🖥️ Big Tech":      "AAPL, MSFT, GOOGL, META, AMZN, NVDA, TSLA",
-    "🏥 Healthcare":    "JNJ, PFE, ABBV, MRK, UNH, BMY, AMGN",
-    "🛒 Consumer":      "WMT, COST, TGT, MCD, PG, KO, SBUX",
-    "🌙 Islamic ETFs":  "SPUS, HLAL, ISDU, UMMA",
-    "🏦 Banks (Test)":  "JPM, BAC, GS, WFC, C",
-    "⚡ Energy":        "XOM, CVX, COP, SLB, OXY",
-    "💊 Pharma":        "LLY, NVO, AZN, GILD, REGN, BIIB",
-    "🏗️ Industrial":   "CAT, DE, HON, MMM, GE, RTX",
-}
-
 STANDARDS = {
     "AAOIFI  (Recommended)": {
         "debt": 30, "sec": 30, "rev": 5,
@@ -190,8 +191,110 @@ def badge_html(verdict: str) -> str:
         return f'<span class="badge-fail">{verdict}</span>'
 
 
-def fmt(value, suffix="%", decimals=1):
-    return "N/A" if value is None else f"{value:.{decimals}f}{suffix}"
+# Concurrent fetches per screening run; the rate itself is set by the
+# process-wide limiter below, shared by every session on this server
+FETCH_WORKERS = 4
+
+
+# Bigger screens run as resumable background jobs instead of in the page
+MAX_INTERACTIVE_TICKERS = 30
+
+# Result cards rendered per page of a tab
+CARDS_PER_PAGE = 50
+
+# Show recently expired cached data at once and swap in fresh data as it
+# lands (stale-while-revalidate), instead of waiting for Yahoo
+REVALIDATE = True
+
+# Keep DEFAULT_TICKERS and PRESETS warm in the shared cache from a
+# background thread (see screener_warm), so presets load instantly
+WARM_PRESETS = True
+
+
+@st.cache_resource
+def shared_limiter() -> RateLimiter:
+    # Adapts to Yahoo's actual limit; the learned rate survives restarts
+    return AdaptiveRateLimiter(max_concurrency=FETCH_WORKERS)
+
+
+@st.cache_resource
+def job_store() -> JobStore:
+    return JobStore()
+
+
+@st.cache_resource
+def shared_cache() -> FundamentalsCache:
+    # Fundamentals fetched for one session serve every session until their
+    # group TTLs expire; verdicts are still computed per session
+    return FundamentalsCache()
+
+
+@st.cache_resource
+def preset_warmer() -> Warmer:
+    # One warming thread per server process, shared by every session
+    return Warmer(default_universe(), shared_cache()).start()
+
+
+def data_as_of(tickers) -> datetime:
+    """When the stalest of `tickers` was last fetched (None if none are cached)."""
+    stamps = shared_cache().fetched_at(list(tickers)).values()
+    return datetime.fromtimestamp(min(stamps)) if stamps else None
+
+
+def format_as_of(as_of: datetime) -> str:
+    if as_of.date() == datetime.now().date():
+        return as_of.strftime("%H:%M")
+    return as_of.strftime("%b %d, %H:%M")
+
+
+def fetch_options() -> dict:
+    """Fetch settings shared by every session on this server."""
+    return {
+        "workers":  FETCH_WORKERS,
+        "limiter":  shared_limiter(),
+        "cache":    shared_cache(),
+    }
+
+
+def thresholds_for(std_name: str) -> Thresholds:
+    """Screening thresholds for an entry of STANDARDS."""
+    if std_name == "Custom":
+        debt = st.session_state.get("custom_debt", STANDARDS["Custom"]["debt"])
+        sec  = st.session_state.get("custom_sec",  STANDARDS["Custom"]["sec"])
+        rev  = st.session_state.get("custom_rev",  STANDARDS["Custom"]["rev"])
+    else:
+        cfg = STANDARDS[std_name]
+        debt, sec, rev = cfg["debt"], cfg["sec"], cfg["rev"]
+    return Thresholds.from_percent(debt, sec, rev)
+
+
+def evaluate_cached():
+    """
+    Recompute verdicts from the fundamentals already in session state.
+    Thresholds only affect the ratio comparisons, so nothing is refetched;
+    verdicts are kept per Thresholds (as a ResultsTable), so switching back
+    is free too.
+    """
+    thresholds = st.session_state.thresholds
+    verdicts   = st.session_state.verdicts
+
+    if thresholds not in verdicts:
+        verdicts[thresholds] = results_table(
+            evaluate_stock(d, thresholds) for d in st.session_state.fundamentals.values()
+        )
+
+    table = verdicts[thresholds]
+    st.session_state.results_table       = table
+    st.session_state.results             = table.results
+    st.session_state.results_thresholds  = thresholds
+    st.session_state.results_fingerprint = results_fingerprint(table.results)
+
+
+def results_table(results) -> ResultsTable:
+    """Results (in input order) as a ResultsTable, sorted by verdict."""
+    results = list(results)
+    results.sort(key=lambda x: VERDICT_ORDER.get(x.get("overall", ""), 99))
+    return ResultsTable(results)
 
 
 def run_screening(tickers_raw: str):
@@ -203,43 +306,251 @@ def run_screening(tickers_raw: str):
     ]
     tickers = list(dict.fromkeys(tickers))
 
-    if len(tickers) > 30:
-        st.warning("⚠️ Max 30 tickers. Using first 30.")
-        tickers = tickers[:30]
+    if len(tickers) > MAX_INTERACTIVE_TICKERS:
+        job_id = job_store().create(tickers)
+        start_job(job_store(), job_id, **fetch_options())
+        st.session_state.job_id = job_id
+        return
 
     # Warn if large batch — Yahoo Finance rate limits kick in above ~8 tickers
     if len(tickers) > 6:
         st.info(
             f"⏳ Screening {len(tickers)} tickers. "
-            f"Each request is spaced out to avoid Yahoo Finance rate limits — "
-            f"estimated **{len(tickers) * 2}–{len(tickers) * 3} seconds**. Please wait."
+            f"Requests are rate-limited to stay under Yahoo Finance limits — "
+            f"results appear below as each ticker completes."
         )
 
-    progress = st.progress(0, text="Connecting to market data...")
-    results  = []
+    # Results stream in: summary and cards update as each ticker lands
+    progress     = st.progress(0, text="Connecting to market data...")
+    summary      = st.empty()
+    cards        = st.container()
+    thresholds   = st.session_state.thresholds
+    fundamentals = {}
+    streamed     = []
+
+    stream = iter_fetch(
+        tickers, **fetch_options(),
+        revalidate=REVALIDATE, on_revalidated=st.session_state.revalidated.put,
+    )
+    for i, data in enumerate(stream, 1):
+        fundamentals[data["ticker"]] = data
+        result = evaluate_stock(data, thresholds)
+        streamed.append(result)
 
-    for i, ticker in enumerate(tickers):
         progress.progress(
-            (i + 1) / len(tickers),
-            text=f"📊 Screening **{ticker}**... ({i+1}/{len(tickers)}) — fetching market data"
+            i / len(tickers),
+            text=f"📊 Screened **{data['ticker']}** ({i}/{len(tickers)}) — fetching market data"
         )
-        results.append(screen_stock(ticker))
+        with summary.container():
+            render_summary_metrics(verdict_counts(streamed))
+        with cards:
+            render_result_card(result)
 
     progress.empty()
 
-    # Count errors
-    errors = [r for r in results if r.get("overall") == "⚠️ ERROR"]
-    if errors:
-        err_tickers = ", ".join(r["ticker"] for r in errors)
+    # Keep the raw data (input order) — changing the standard re-evaluates it
+    # locally; the verdicts just streamed are kept for the current standard
+    by_ticker = {r["ticker"]: r for r in streamed}
+    st.session_state.fundamentals = {t: fundamentals[t] for t in tickers}
+    st.session_state.verdicts     = {thresholds: results_table(by_ticker[t] for t in tickers)}
+    st.session_state.data_as_of   = data_as_of(tickers)
+    st.session_state.revalidating = {
+        t for t, d in fundamentals.items() if d["timing"]["cache"] == "revalidate"
+    }
+    evaluate_cached()
+
+    # Count errors — unknown symbols apart from rate-limit failures
+    errors  = [d for d in fundamentals.values() if "error" in d]
+    unknown = [d["ticker"] for d in errors if "not found" in d["error"]]
+    limited = [d["ticker"] for d in errors if d["ticker"] not in unknown]
+    if unknown:
+        st.warning(f"⚠️ **Ticker(s) not found:** {', '.join(unknown)}. Check the symbols.")
+    if limited:
         st.warning(
-            f"⚠️ **{len(errors)} ticker(s) could not be fetched** ({err_tickers}). "
+            f"⚠️ **{len(limited)} ticker(s) could not be fetched** ({', '.join(limited)}). "
             f"Yahoo Finance rate-limited the request. "
             f"Wait 30 seconds then re-screen just those tickers."
         )
+    stale = [d["ticker"] for d in fundamentals.values() if d["timing"]["cache"] == "stale"]
+    if stale:
+        st.info(
+            f"🕐 Yahoo Finance is rate-limiting, so {', '.join(stale)} "
+            f"{'is' if len(stale) == 1 else 'are'} shown from older cached data."
+        )
+
+
+def load_job_results(job_id: str):
+    """Show a background job's fetched data (partial or complete) as the current screen."""
+    st.session_state.fundamentals = job_store().fundamentals(job_id)
+    st.session_state.verdicts     = {}
+    st.session_state.data_as_of   = data_as_of(st.session_state.fundamentals)
+    st.session_state.job_loaded   = job_id
+    evaluate_cached()
+
+
+def standards_comparison():
+    """
+    Overall verdict per STANDARDS entry for the fetched data, or None if
+    nothing was fetched. Kept until the data or a standard's thresholds change.
+    """
+    fundamentals = st.session_state.fundamentals
+    standards    = tuple(thresholds_for(std_name) for std_name in STANDARDS)
+    cached       = st.session_state.get("comparison")
+    if cached is not None and cached[0] is fundamentals and cached[1] == standards:
+        return cached[2]
+
+    compare = None
+    fetched = [d for d in fundamentals.values() if "error" not in d]
+    if fetched:
+        frame   = pd.DataFrame(fetched)
+        columns = {"Ticker": frame["ticker"], "Company": frame["name"].fillna("").str[:32]}
+        for std_name, thresholds in zip(STANDARDS, standards):
+            verdicts = screen_frame(frame, thresholds)["overall"]
+            columns[std_name.split("(")[0].strip()] = verdicts.values
+        compare = pd.DataFrame(columns)
+
+    st.session_state.comparison = (fundamentals, standards, compare)
+    return compare
+
+
+# ═══════════════════════════════════════════════════════════════
+#  BACKGROUND JOB PANEL
+# ═══════════════════════════════════════════════════════════════
+
+@st.fragment(run_every=2)
+def apply_revalidated():
+    """Swaps in fresh data for tickers shown from expired cache, as it lands."""
+    pending = st.session_state.get("revalidating")
+    if not pending:
+        return
+
+    # Checked before draining: once nothing is pending process-wide, every
+    # callback has already put its data on the queue
+    idle  = not revalidations_pending()
+    inbox = st.session_state.revalidated
+    fresh = {}
+    while not inbox.empty():
+        data = inbox.get_nowait()
+        if data["ticker"] in pending:
+            pending.discard(data["ticker"])
+            # Failed refreshes keep the cached data on screen
+            if "error" not in data and data["timing"]["cache"] != "stale":
+                fresh[data["ticker"]] = data
+    if idle:
+        pending.clear()
+
+    if fresh:
+        # A new dict, so caches keyed on the old one (standards_comparison) rebuild
+        st.session_state.fundamentals = {**st.session_state.fundamentals, **fresh}
+        st.session_state.verdicts   = {}
+        st.session_state.data_as_of = data_as_of(st.session_state.fundamentals)
+        evaluate_cached()
+        st.rerun()
+    if pending:
+        st.caption(f"🔄 Refreshing {len(pending)} ticker(s) shown from cached data…")
+
+
+@st.fragment(run_every=3)
+def render_job_panel():
+    """Polls the session's background job; loads the results when it finishes."""
+    job_id = st.session_state.get("job_id")
+    if not job_id:
+        return
+
+    store   = job_store()
+    prog    = store.progress(job_id)
+    running = is_running(job_id)
+
+    if prog["status"] == "done" and st.session_state.get("job_loaded") != job_id:
+        load_job_results(job_id)
+        st.rerun()
+
+    st.markdown('<p class="sec-label">🗂 Background Screening Job</p>', unsafe_allow_html=True)
+    if running:
+        state = "waiting for Yahoo Finance rate limits" if prog["status"] == "waiting" else "running"
+    else:
+        state = "finished" if not prog["pending"] else "paused"
+    st.progress(
+        prog["pct"] / 100,
+        text=f"Job `{job_id}` — {prog['done']}/{prog['total']} screened · "
+             f"{prog['errors']} error(s) · {state}"
+    )
+
+    j1, j2, j3 = st.columns(3)
+    with j1:
+        if st.button("📥 Show Results So Far", use_container_width=True, key="job_load"):
+            load_job_results(job_id)
+            st.rerun()
+    with j2:
+        if running:
+            if st.button("⏸ Pause", use_container_width=True, key="job_pause"):
+                cancel_job(job_id)
+        elif prog["pending"]:
+            # Also resumes jobs interrupted by a server restart
+            if st.button("▶️ Resume", use_container_width=True, key="job_resume"):
+                start_job(store, job_id, **fetch_options())
+    with j3:
+        if st.button("✕ Dismiss", use_container_width=True, key="job_dismiss"):
+            st.session_state.job_id = None
+            st.rerun()
+
 
-    order = {"✅ COMPLIANT": 0, "🟡 QUESTIONABLE": 1, "❌ NON-COMPLIANT": 2, "⚠️ ERROR": 3}
-    results.sort(key=lambda x: order.get(x.get("overall", ""), 99))
-    st.session_state.results = results
+# ═══════════════════════════════════════════════════════════════
+#  SUMMARY METRICS
+# ═══════════════════════════════════════════════════════════════
+
+def render_summary_metrics(counts: dict, as_of: datetime = None):
+    """
+    Headline counts — ResultsTable.counts, or verdict_counts() of a partial
+    list — and when the data was fetched (`as_of`, default now).
+    """
+    total = counts["all"]
+    comp  = counts["compliant"]
+    quest = counts["questionable"]
+    fail  = counts["non_compliant"]
+
+    m1, m2, m3, m4, m5 = st.columns(5)
+    with m1: st.metric("Total Screened",      total)
+    with m2: st.metric("✅ Compliant",         comp,  delta=f"{int(comp/total*100)}%" if total else None)
+    with m3: st.metric("🟡 Questionable",      quest)
+    with m4: st.metric("❌ Non-Compliant",      fail)
+    with m5: st.metric("🕐 Data as of",        format_as_of(as_of or datetime.now()))
+
+
+def render_pipeline_metrics(results: list):
+    """Where the time went for the current results, plus process-wide metric exports."""
+    snap = summarize(results).snapshot()
+    t    = snap["tickers"]
+
+    with st.expander("⏱ Pipeline Timings"):
+        p1, p2, p3, p4, p5 = st.columns(5)
+        with p1: st.metric("Fetched",      t["miss"] + t["refresh"] + t["off"])
+        with p2: st.metric("Cache Hits",   t["hit"])
+        with p3: st.metric("Shared",       snap["saved"],
+                           help="Tickers another screen was already fetching — no extra request")
+        with p4: st.metric("Retries",      snap["retries"])
+        with p5: st.metric("Rate-Limited", snap["rate_limited"])
+
+        st.dataframe(pd.DataFrame([{
+            "Stage":     stage.title(),
+            "Calls":     s["count"],
+            "Total (s)": s["total_s"],
+            "Mean (ms)": s["mean_ms"],
+            "Max (ms)":  s["max_ms"],
+        } for stage, s in snap["stages"].items() if s["count"]]), use_container_width=True, hide_index=True)
+
+        st.caption("Wait = rate limiter / request stagger · Provider = Yahoo Finance calls · "
+                   "Backoff = pauses after rate limits · Business / Financial / Purification = rule evaluation")
+
+        d1, d2 = st.columns(2)
+        with d1:
+            st.download_button("📈 Server Metrics (Prometheus)", data=METRICS.to_prometheus,
+                               file_name="halal_screener_metrics.prom", mime="text/plain",
+                               on_click="ignore", use_container_width=True)
+        with d2:
+            st.download_button("🗂 Server Metrics (JSON)", data=METRICS.to_json,
+                               file_name="halal_screener_metrics.json", mime="application/json",
+                               on_click="ignore", use_container_width=True)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -258,6 +569,15 @@ def render_result_card(r: dict):
 
     with st.expander(label, expanded=True):
 
+        timing = r.get("timing") or {}
+        if timing.get("cache") in ("stale", "revalidate"):
+            age  = timing.get("age_s", 0)
+            when = f"{age / 3600:.0f}h" if age >= 3600 else f"{age / 60:.0f} min"
+            st.caption(
+                f"🕐 Cached data from {when} ago — "
+                + ("refreshing…" if timing["cache"] == "revalidate" else "Yahoo Finance is rate-limiting")
+            )
+
         col_info, col_badge = st.columns([4, 1])
         with col_info:
             st.caption(
@@ -305,9 +625,10 @@ def render_result_card(r: dict):
 
         with fin_col:
             st.markdown("**📊 Screen 2 — Financial Ratios**")
-            debt_lim = THRESHOLDS["max_debt_to_market_cap"] * 100
-            sec_lim  = THRESHOLDS["max_interest_bearing_securities"] * 100
-            rev_lim  = THRESHOLDS["max_haram_revenue_ratio"] * 100
+            th       = st.session_state.thresholds
+            debt_lim = th.max_debt_to_market_cap * 100
+            sec_lim  = th.max_interest_bearing_securities * 100
+            rev_lim  = th.max_haram_revenue_ratio * 100
             st.caption(f"*AAOIFI: Debt <{debt_lim:.0f}% · Securities <{sec_lim:.0f}% · Haram rev <{rev_lim:.0f}%*")
 
             def ratio_row(label, val, limit, note=""):
@@ -334,6 +655,20 @@ def render_result_card(r: dict):
             )
 
 
+def render_cards(table: ResultsTable, group: str, sort: str, key: str):
+    """Result cards for one tab, a page at a time."""
+    total = table.counts[group]
+    pages = max(1, -(-total // CARDS_PER_PAGE))
+    page  = 1
+    if pages > 1:
+        page = st.number_input(
+            f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"page_{key}"
+        )
+    start = (page - 1) * CARDS_PER_PAGE
+    for r in table.view(group, sort, start, start + CARDS_PER_PAGE):
+        render_result_card(r)
+
+
 # ═══════════════════════════════════════════════════════════════
 #  HEADER
 # ═══════════════════════════════════════════════════════════════
@@ -403,10 +738,12 @@ def render_sidebar():
             sec_lim  = std_config["sec"]
             rev_lim  = std_config["rev"]
 
-        # Apply thresholds globally
-        THRESHOLDS["max_debt_to_market_cap"]          = debt_lim / 100
-        THRESHOLDS["max_interest_bearing_securities"] = sec_lim  / 100
-        THRESHOLDS["max_haram_revenue_ratio"]         = rev_lim  / 100
+        # Thresholds belong to this session only — never shared with other users
+        st.session_state.thresholds = thresholds_for(selected_std)
+
+        # Re-evaluate fetched data right away — no refetch, no extra click
+        if st.session_state.fundamentals and st.session_state.get("results_thresholds") != st.session_state.thresholds:
+            evaluate_cached()
 
         # ── Show live threshold values (so users see what changed) ──
         st.markdown(
@@ -436,14 +773,6 @@ def render_sidebar():
         if std_config["note"]:
             st.caption(f"ℹ️ {std_config['note']}")
 
-        # If results already exist, offer to re-screen with new thresholds
-        if st.session_state.get("results") and selected_std != st.session_state.get("last_standard"):
-            st.session_state["last_standard"] = selected_std
-            st.warning("⚠️ Standard changed — click **Re-Screen** to apply new thresholds.")
-            if st.button("🔄 Re-Screen with New Thresholds", use_container_width=True):
-                run_screening(st.session_state.get("input_tickers", ""))
-                st.rerun()
-
         st.divider()
 
         # ══════════════════════════════════════════════════════
@@ -462,21 +791,24 @@ def render_sidebar():
         )
 
         if chosen != "— Select a preset to screen —":
-            preset_tickers = PRESETS[chosen]
+            preset_tickers = ", ".join(PRESETS[chosen])
             st.session_state["input_tickers"] = preset_tickers
 
-            # Show which tickers will be screened
+            # Show which tickers will be screened, and how fresh their cached data is
             st.markdown(
                 f"<div style='font-size:0.8rem; color:#8B9BB4; margin:0.3rem 0;'>"
                 f"Tickers: <span style='color:#C9A84C; font-family:monospace;'>{preset_tickers}</span>"
                 f"</div>",
                 unsafe_allow_html=True
             )
+            as_of = data_as_of(PRESETS[chosen])
+            if as_of:
+                st.caption(f"🕐 Data as of {format_as_of(as_of)}")
 
-            # Auto-screen button (clearly labelled)
+            # Auto-screen button (clearly labelled). The screen itself runs
+            # from main(), so its results stream into the main area
             if st.button(f"🔍 Screen {chosen}", use_container_width=True, key="preset_screen_btn"):
-                run_screening(preset_tickers)
-                st.rerun()
+                st.session_state.screen_request = preset_tickers
 
         st.divider()
 
@@ -508,60 +840,81 @@ def render_sidebar():
 #  EXPORT HELPERS
 # ═══════════════════════════════════════════════════════════════
 
-def to_excel_bytes(results: list) -> bytes:
-    rows = [{
-        "Ticker":            r.get("ticker"),
-        "Company":           r.get("name"),
-        "Sector":            r.get("sector"),
-        "Country":           r.get("country"),
-        "Price ($)":         r.get("price"),
-        "Market Cap":        r.get("market_cap"),
-        "P/E":               r.get("pe_ratio"),
-        "Div Yield (%)":     r.get("dividend_yield"),
-        "Debt/MktCap (%)":   r.get("debt_ratio_pct"),
-        "IntAssets/MktCap":  r.get("sec_ratio_pct"),
-        "Haram Rev (%)":     r.get("haram_rev_pct"),
-        "Purification (%)":  r.get("purification_pct"),
-        "Biz Screen":        r.get("biz_status"),
-        "Biz Reason":        r.get("biz_reason"),
-        "Fin Screen":        r.get("fin_status"),
-        "Overall Verdict":   r.get("overall"),
-        "Methodology":       r.get("methodology"),
-        "Screened At":       r.get("screened_at"),
-    } for r in results]
-
-    df  = pd.DataFrame(rows)
-    buf = io.BytesIO()
+# (header, result key) — column order of the Excel report
+EXCEL_COLUMNS = [
+    ("Ticker",           "ticker"),
+    ("Company",          "name"),
+    ("Sector",           "sector"),
+    ("Country",          "country"),
+    ("Price ($)",        "price"),
+    ("Market Cap",       "market_cap"),
+    ("P/E",              "pe_ratio"),
+    ("Div Yield (%)",    "dividend_yield"),
+    ("Debt/MktCap (%)",  "debt_ratio_pct"),
+    ("IntAssets/MktCap", "sec_ratio_pct"),
+    ("Haram Rev (%)",    "haram_rev_pct"),
+    ("Purification (%)", "purification_pct"),
+    ("Biz Screen",       "biz_status"),
+    ("Biz Reason",       "biz_reason"),
+    ("Fin Screen",       "fin_status"),
+    ("Overall Verdict",  "overall"),
+    ("Methodology",      "methodology"),
+    ("Screened At",      "screened_at"),
+]
+
+
+def _row_style(verdict: str) -> str:
+    if "COMPLIANT" in verdict and "NON" not in verdict:
+        return "row_green"
+    return "row_yellow" if "QUESTIONABLE" in verdict else "row_red"
 
-    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="Halal Screening", index=False)
-        from openpyxl.styles import PatternFill, Font, Alignment
-        ws = writer.sheets["Halal Screening"]
-
-        for cell in ws[1]:
-            cell.fill      = PatternFill("solid", fgColor="0A0F1E")
-            cell.font      = Font(name="Calibri", bold=True, color="C9A84C", size=11)
-            cell.alignment = Alignment(horizontal="center")
-
-        green  = PatternFill("solid", fgColor="E8F5E9")
-        yellow = PatternFill("solid", fgColor="FFF9E6")
-        red    = PatternFill("solid", fgColor="FFEBEE")
-        vcol   = df.columns.get_loc("Overall Verdict") + 1
-
-        for i, row in enumerate(ws.iter_rows(min_row=2, max_row=len(rows)+1), 1):
-            v    = str(ws.cell(row=i+1, column=vcol).value or "")
-            fill = green if "COMPLIANT" in v and "NON" not in v else (
-                   yellow if "QUESTIONABLE" in v else red)
-            for c in row:
-                c.fill = fill
-
-        for col in ws.columns:
-            ws.column_dimensions[col[0].column_letter].width = min(
-                max(len(str(c.value or "")) for c in col) + 3, 45
-            )
 
-    buf.seek(0)
-    return buf.read()
+def to_excel_bytes(results: list) -> bytes:
+    """
+    Colour-coded Excel report. Written with openpyxl's write-only (streaming)
+    workbook: the header and row formats (font, fill, alignment) are
+    registered once as named styles and applied by name, and column widths
+    come from the plain values, so cost stays linear in the number of rows.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import NamedStyle, PatternFill, Font, Alignment
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    wb.add_named_style(NamedStyle(
+        name="header",
+        fill=PatternFill("solid", fgColor="0A0F1E"),
+        font=Font(name="Calibri", bold=True, color="C9A84C", size=11),
+        alignment=Alignment(horizontal="center"),
+    ))
+    for name, color in (("row_green", "E8F5E9"), ("row_yellow", "FFF9E6"), ("row_red", "FFEBEE")):
+        wb.add_named_style(NamedStyle(name=name, fill=PatternFill("solid", fgColor=color)))
+
+    ws   = wb.create_sheet("Halal Screening")
+    rows = [[r.get(key) for _, key in EXCEL_COLUMNS] for r in results]
+
+    # Write-only sheets need their widths before the first row
+    for i, (header, _) in enumerate(EXCEL_COLUMNS):
+        width = max([len(header)] + [len(str(row[i])) for row in rows if row[i] is not None])
+        ws.column_dimensions[get_column_letter(i + 1)].width = min(width + 3, 45)
+
+    def styled(value, style):
+        # Assigning a named style is one lookup; setting font / fill per
+        # cell re-registers each object and is several times slower
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    ws.append([styled(header, "header") for header, _ in EXCEL_COLUMNS])
+    verdict_col = [key for _, key in EXCEL_COLUMNS].index("overall")
+    for row in rows:
+        style = _row_style(str(row[verdict_col] or ""))
+        ws.append([styled(value, style) for value in row])
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
 
 
 def to_csv(results: list) -> str:
@@ -579,17 +932,47 @@ def to_csv(results: list) -> str:
     } for r in results]).to_csv(index=False)
 
 
+def results_fingerprint(results: list) -> str:
+    """Content hash of a result set — the cache key for its exports."""
+    return hashlib.sha1(json.dumps(results, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# Builders per format: (builder, file extension, mime type)
+EXPORT_FORMATS = {
+    "excel": (to_excel_bytes, "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv":   (to_csv,         "csv",  "text/csv"),
+    "json":  (lambda results: json.dumps(results, indent=2, default=str), "json", "application/json"),
+}
+
+
+@st.cache_data(max_entries=12, show_spinner=False)
+def build_export(kind: str, fingerprint: str, _results: list):
+    """Export `_results` as `kind`; reused for as long as the fingerprint matches."""
+    return EXPORT_FORMATS[kind][0](_results)
+
+
+def lazy_export(kind: str, results: list, fingerprint: str):
+    """Deferred download data — nothing is built until the button is clicked."""
+    return lambda: build_export(kind, fingerprint, results)
+
+
 # ═══════════════════════════════════════════════════════════════
 #  MAIN
 # ═══════════════════════════════════════════════════════════════
 
 def main():
     render_header()
+    if WARM_PRESETS:
+        preset_warmer()
 
     # ── Session state defaults ────────────────────────────────
     if "results"          not in st.session_state: st.session_state.results          = []
+    if "fundamentals"     not in st.session_state: st.session_state.fundamentals     = {}
+    if "verdicts"         not in st.session_state: st.session_state.verdicts         = {}
+    if "thresholds"       not in st.session_state: st.session_state.thresholds       = Thresholds()
     if "input_tickers"    not in st.session_state: st.session_state.input_tickers    = "AAPL, MSFT, TSLA, NVDA, JNJ, WMT, JPM, GOOGL"
-    if "last_standard"    not in st.session_state: st.session_state.last_standard    = list(STANDARDS.keys())[0]
+    if "job_id"           not in st.session_state: st.session_state.job_id           = None
+    if "revalidated"      not in st.session_state: st.session_state.revalidated      = queue.Queue()
 
     # Sidebar is rendered AFTER session state is initialised
     render_sidebar()
@@ -619,7 +1002,11 @@ def main():
     with col_btn2:
         st.markdown("<div style='height:10px'></div>", unsafe_allow_html=True)
         if st.button("✕ Clear", use_container_width=True, key="clear_btn"):
-            st.session_state.results = []
+            st.session_state.results       = []
+            st.session_state.results_table = None
+            st.session_state.fundamentals  = {}
+            st.session_state.verdicts      = {}
+            st.session_state.revalidating  = set()
             st.rerun()
 
     if screen_btn and tickers_raw.strip():
@@ -627,12 +1014,21 @@ def main():
         run_screening(tickers_raw)
         st.rerun()
 
+    preset_request = st.session_state.pop("screen_request", None)
+    if preset_request:
+        run_screening(preset_request)
+        st.rerun()
+
+    render_job_panel()
+    apply_revalidated()
+
     # ─────────────────────────────────────────────────────────
     #  EMPTY STATE
     # ─────────────────────────────────────────────────────────
     results = st.session_state.results
+    table   = st.session_state.get("results_table")
 
-    if not results:
+    if not results or table is None:
         st.markdown("""
         <div style="text-align:center; padding:4rem 1rem; color:#8B9BB4;">
             <div style="font-size:3rem; margin-bottom:1rem;">🌙</div>
@@ -651,41 +1047,35 @@ def main():
     # ─────────────────────────────────────────────────────────
     #  SUMMARY METRICS
     # ─────────────────────────────────────────────────────────
-    total = len(results)
-    comp  = sum(1 for r in results if r.get("compliant") is True)
-    quest = sum(1 for r in results if r.get("compliant") is None)
-    fail  = sum(1 for r in results if r.get("compliant") is False)
-
     st.divider()
     st.markdown('<p class="sec-label">📊 Summary</p>', unsafe_allow_html=True)
 
-    m1, m2, m3, m4, m5 = st.columns(5)
-    with m1: st.metric("Total Screened",      total)
-    with m2: st.metric("✅ Compliant",         comp,  delta=f"{int(comp/total*100)}%" if total else None)
-    with m3: st.metric("🟡 Questionable",      quest)
-    with m4: st.metric("❌ Non-Compliant",      fail)
-    with m5: st.metric("🕐 Time",              datetime.now().strftime("%H:%M"))
+    render_summary_metrics(table.counts, st.session_state.get("data_as_of"))
 
+    th = st.session_state.thresholds
     st.markdown(
         '<p style="font-size:0.78rem; color:#8B9BB4; margin-top:0.2rem;">'
         f'📖 AAOIFI Standard'
-        f' · Debt &lt;{THRESHOLDS["max_debt_to_market_cap"]*100:.0f}%'
-        f', Int. Assets &lt;{THRESHOLDS["max_interest_bearing_securities"]*100:.0f}%'
-        f', Haram rev &lt;{THRESHOLDS["max_haram_revenue_ratio"]*100:.0f}%'
+        f' · Debt &lt;{th.max_debt_to_market_cap*100:.0f}%'
+        f', Int. Assets &lt;{th.max_interest_bearing_securities*100:.0f}%'
+        f', Haram rev &lt;{th.max_haram_revenue_ratio*100:.0f}%'
         '</p>',
         unsafe_allow_html=True
     )
 
+    render_pipeline_metrics(results)
+
     st.divider()
 
     # ─────────────────────────────────────────────────────────
     #  TABS
     # ─────────────────────────────────────────────────────────
-    tab_all, tab_comp, tab_quest, tab_table = st.tabs([
+    tab_all, tab_comp, tab_quest, tab_table, tab_std = st.tabs([
         "📋  All Results",
         "✅  Compliant",
         "🟡  Questionable",
         "📊  Data Table",
+        "⚖️  Compare Standards",
     ])
 
     with tab_all:
@@ -703,37 +1093,31 @@ def main():
                 key="sort_tab1"
             )
 
-        filtered = {
-            "All":              results,
-            "✅ Compliant":     [r for r in results if r.get("compliant") is True],
-            "🟡 Questionable":  [r for r in results if r.get("compliant") is None],
-            "❌ Non-Compliant": [r for r in results if r.get("compliant") is False],
+        group = {
+            "All":              "all",
+            "✅ Compliant":     "compliant",
+            "🟡 Questionable":  "questionable",
+            "❌ Non-Compliant": "non_compliant",
         }[filter_by]
-
-        if sort_by == "Ticker A→Z":
-            filtered = sorted(filtered, key=lambda x: x.get("ticker", ""))
-        elif sort_by == "Debt %":
-            filtered = sorted(filtered, key=lambda x: x.get("debt_ratio_pct") or 999)
-        elif sort_by == "Int. Assets %":
-            filtered = sorted(filtered, key=lambda x: x.get("sec_ratio_pct") or 999)
-
-        for r in filtered:
-            render_result_card(r)
+        sort = {
+            "Compliance Status": "status",
+            "Ticker A→Z":        "ticker",
+            "Debt %":            "debt",
+            "Int. Assets %":     "sec",
+        }[sort_by]
+        render_cards(table, group, sort, key="all")
 
     with tab_comp:
-        comp_list = [r for r in results if r.get("compliant") is True]
-        if not comp_list:
+        if not table.counts["compliant"]:
             st.info("No fully compliant stocks found. Try different tickers or adjust thresholds.")
         else:
-            pills = "  ".join(f"`{r['ticker']}`" for r in comp_list)
-            st.markdown(f"**Compliant ({len(comp_list)}):** {pills}")
+            pills = "  ".join(f"`{r['ticker']}`" for r in table.view("compliant"))
+            st.markdown(f"**Compliant ({table.counts['compliant']}):** {pills}")
             st.divider()
-            for r in comp_list:
-                render_result_card(r)
+            render_cards(table, "compliant", "status", key="comp")
 
     with tab_quest:
-        quest_list = [r for r in results if r.get("compliant") is None]
-        if not quest_list:
+        if not table.counts["questionable"]:
             st.info("No questionable stocks in this screen.")
         else:
             st.info(
@@ -743,66 +1127,49 @@ def main():
                 "Exercise caution and do your own research before investing."
             )
             st.divider()
-            for r in quest_list:
-                render_result_card(r)
+            render_cards(table, "questionable", "status", key="quest")
 
     with tab_table:
-        table_rows = [r for r in results if r.get("overall") != "⚠️ ERROR"]
-        if table_rows:
-            df = pd.DataFrame([{
-                "Ticker":      r.get("ticker"),
-                "Company":     (r.get("name") or "")[:32],
-                "Sector":      (r.get("sector") or "")[:22],
-                "Price":       f"${r['price']:.2f}" if r.get("price") else "N/A",
-                "Mkt Cap":     r.get("market_cap","N/A"),
-                "Debt %":      fmt(r.get("debt_ratio_pct")),
-                "Int. Assets": fmt(r.get("sec_ratio_pct")),
-                "Haram Rev %": fmt(r.get("haram_rev_pct"), decimals=3),
-                "Purify %":    f"{r['purification_pct']:.3f}%" if (r.get("purification_pct") or 0) > 0 else "—",
-                "Verdict":     r.get("overall",""),
-            } for r in table_rows])
-
-            st.dataframe(df, use_container_width=True, hide_index=True, height=400)
+        if len(table.display):
+            st.dataframe(table.display, use_container_width=True, hide_index=True, height=400)
             st.caption(
-                f"Thresholds: Debt <{THRESHOLDS['max_debt_to_market_cap']*100:.0f}% · "
-                f"Int. Assets <{THRESHOLDS['max_interest_bearing_securities']*100:.0f}% · "
-                f"Haram Rev <{THRESHOLDS['max_haram_revenue_ratio']*100:.0f}%  "
+                f"Thresholds: Debt <{th.max_debt_to_market_cap*100:.0f}% · "
+                f"Int. Assets <{th.max_interest_bearing_securities*100:.0f}% · "
+                f"Haram Rev <{th.max_haram_revenue_ratio*100:.0f}%  "
                 f"(AAOIFI Standard)"
             )
 
+    with tab_std:
+        compare = standards_comparison()
+        if compare is not None:
+            st.caption(
+                "Verdicts for the same fetched data under every standard — "
+                "computed locally, nothing is refetched."
+            )
+            st.dataframe(compare, use_container_width=True, hide_index=True)
+
     # ─────────────────────────────────────────────────────────
     #  EXPORT
     # ─────────────────────────────────────────────────────────
     st.divider()
     st.markdown('<p class="sec-label">📥 Export</p>', unsafe_allow_html=True)
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M")
-    e1, e2, e3 = st.columns(3)
-
-    with e1:
-        st.download_button(
-            "📊 Excel Report",
-            data=to_excel_bytes(results),
-            file_name=f"halal_screening_{ts}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
-        )
-    with e2:
-        st.download_button(
-            "📄 CSV",
-            data=to_csv(results),
-            file_name=f"halal_screening_{ts}.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
-    with e3:
-        st.download_button(
-            "🗂 JSON",
-            data=json.dumps(results, indent=2, default=str),
-            file_name=f"halal_screening_{ts}.json",
-            mime="application/json",
-            use_container_width=True
-        )
+    # Files are generated only when a button is clicked, then cached per result set
+    ts          = datetime.now().strftime("%Y%m%d_%H%M")
+    fingerprint = st.session_state.get("results_fingerprint") or results_fingerprint(results)
+    labels      = {"excel": "📊 Excel Report", "csv": "📄 CSV", "json": "🗂 JSON"}
+
+    for col, (kind, label) in zip(st.columns(3), labels.items()):
+        _, ext, mime = EXPORT_FORMATS[kind]
+        with col:
+            st.download_button(
+                label,
+                data=lazy_export(kind, results, fingerprint),
+                file_name=f"halal_screening_{ts}.{ext}",
+                mime=mime,
+                on_click="ignore",
+                use_container_width=True
+            )
 
     # ─────────────────────────────────────────────────────────
     #  FOOTER
@@ -0,0 +1,322 @@
+"""
+🌙 Halal Stock Screener — Core Benchmark Suite
+
+Offline, reproducible timings of the screening engine and the exports:
+
+  screen_business_activity · screen_financial_ratios · calculate_purification
+  screen_stock · screen_portfolio (threads, processes) · screen_frame
+  to_excel_bytes · to_csv
+
+Payloads are Yahoo-style `info` dicts — synthetic ones (seeded, with
+realistic 600–2,500 character business summaries) and, with --recorded,
+real ones captured by `halal_screener.py --record`, tiled up to each size.
+Nothing touches the network.
+
+  python benchmarks/bench_core.py                          # 10 / 1k / 100k
+  python benchmarks/bench_core.py --sizes 10 1000          # quicker
+  python benchmarks/bench_core.py --recorded infos.jsonl
+  python benchmarks/bench_core.py --compare old.json       # diff vs a previous run
+
+Results are written as JSON (benchmarks/results/ by default) so runs from
+different versions can be compared with --compare.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import halal_screener as hs                                 # noqa: E402
+from screener_providers import load_recorded_infos          # noqa: E402
+
+DEFAULT_SIZES   = [10, 1_000, 100_000]
+RESULTS_DIR     = os.path.join(ROOT, "benchmarks", "results")
+TIME_BUDGET_S   = 2.0       # repeat small cases until roughly this much time is spent
+MAX_REPEATS     = 20
+PROCESSES       = max(os.cpu_count() or 1, 2)   # process-pool case
+
+
+# ─────────────────────────────────────────────
+#  SYNTHETIC PAYLOADS
+# ─────────────────────────────────────────────
+
+# (sector, industry, weight) — a rough large-cap universe mix
+SECTOR_MIX = [
+    ("Technology",             "Software—Infrastructure",            14),
+    ("Technology",             "Semiconductors",                      8),
+    ("Healthcare",             "Drug Manufacturers—General",          9),
+    ("Healthcare",             "Medical Devices",                     6),
+    ("Industrials",            "Specialty Industrial Machinery",      8),
+    ("Industrials",            "Aerospace & Defense",                 3),
+    ("Consumer Cyclical",      "Auto Manufacturers",                  4),
+    ("Consumer Cyclical",      "Resorts & Casinos",                   2),
+    ("Consumer Cyclical",      "Lodging",                             2),
+    ("Consumer Defensive",     "Grocery Stores",                      3),
+    ("Consumer Defensive",     "Beverages—Wineries & Distilleries",   2),
+    ("Consumer Defensive",     "Household & Personal Products",       4),
+    ("Financial Services",     "Banks—Diversified",                   6),
+    ("Financial Services",     "Insurance—Life",                      3),
+    ("Financial Services",     "Asset Management",                    3),
+    ("Communication Services", "Entertainment",                       3),
+    ("Communication Services", "Advertising Agencies",                2),
+    ("Energy",                 "Oil & Gas Integrated",                5),
+    ("Basic Materials",        "Specialty Chemicals",                 4),
+    ("Real Estate",            "REIT—Industrial",                     3),
+    ("Utilities",              "Utilities—Regulated Electric",        4),
+]
+
+FILLER_SENTENCES = [
+    "The company designs, develops and sells products and services to customers worldwide.",
+    "It operates through several segments organised by geography and product line.",
+    "Its products are sold through direct sales forces, distributors and online channels.",
+    "The company also provides maintenance, support and professional services.",
+    "It serves enterprise, government, education and consumer markets.",
+    "The company was founded in 1976 and is headquartered in the United States.",
+    "It offers a portfolio of platforms, subscriptions and related accessories.",
+    "The firm invests heavily in research and development and holds numerous patents.",
+    "Manufacturing is carried out at facilities in North America, Europe and Asia.",
+    "The company has strategic partnerships with leading suppliers and technology providers.",
+    "It markets its offerings under a number of well-known brand names.",
+    "Revenue is generated from product sales, licensing and recurring service contracts.",
+]
+
+# Sentences that trigger the business-activity rules
+FLAGGED_SENTENCES = [
+    "The company also operates casinos and online gambling platforms.",
+    "It produces and distributes beer, wine and spirits.",
+    "The company provides advertising and marketing services.",
+    "It offers conventional banking, mortgage and consumer lending products.",
+    "The firm operates hotels and resorts with bars and nightlife venues.",
+    "It sells tobacco products and related accessories.",
+    "The company manufactures military aircraft and defense systems.",
+]
+
+
+def _description(rng: random.Random) -> str:
+    target = int(min(max(rng.gauss(1400, 450), 600), 2500))
+    parts  = []
+    while sum(len(p) + 1 for p in parts) < target:
+        pool = FLAGGED_SENTENCES if rng.random() < 0.04 else FILLER_SENTENCES
+        parts.append(rng.choice(pool))
+    return " ".join(parts)
+
+
+def synthetic_infos(n: int, seed: int = 7, distinct_descriptions: int = 2_000) -> list:
+    """
+    `n` Yahoo-style info dicts. Descriptions are drawn from a pool of
+    `distinct_descriptions` so 100k payloads stay cheap to hold in memory.
+    """
+    rng          = random.Random(seed)
+    descriptions = [_description(rng) for _ in range(min(n, distinct_descriptions))]
+    sectors      = [(s, i) for s, i, w in SECTOR_MIX for _ in range(w)]
+
+    infos = []
+    for k in range(n):
+        sector, industry = rng.choice(sectors)
+        market_cap = 10 ** rng.uniform(8.5, 12.5)
+        revenue    = market_cap * rng.uniform(0.05, 1.2)
+        infos.append({
+            "symbol":              f"SYN{k:06d}",
+            "longName":            f"Synthetic Company {k}",
+            "sector":              sector,
+            "industry":            industry,
+            "longBusinessSummary": descriptions[k % len(descriptions)],
+            "country":             rng.choice(["United States", "United Kingdom", "Germany", "Japan", "Malaysia"]),
+            "marketCap":           market_cap if rng.random() > 0.02 else None,
+            "currentPrice":        round(rng.uniform(5, 900), 2),
+            "totalDebt":           market_cap * rng.uniform(0, 0.8),
+            "totalCash":           market_cap * rng.uniform(0, 0.5),
+            "totalRevenue":        revenue,
+            "interestExpense":     -revenue * rng.uniform(0, 0.08) if rng.random() > 0.3 else None,
+            "trailingPE":          round(rng.uniform(5, 80), 2),
+            "priceToBook":         round(rng.uniform(0.5, 30), 2),
+            "dividendYield":       round(rng.uniform(0, 0.06), 4),
+            "trailingEps":         round(rng.uniform(-2, 20), 2),
+            "returnOnEquity":      round(rng.uniform(-0.2, 0.6), 4),
+        })
+    return infos
+
+
+def tile(infos: list, n: int) -> list:
+    """Repeat recorded payloads under fresh symbols until there are `n`."""
+    return [
+        {**infos[k % len(infos)], "symbol": f"REC{k:06d}"}
+        for k in range(n)
+    ]
+
+
+class MemoryProvider:
+    """Serves info dicts from memory — no pacing, no I/O."""
+
+    name   = "memory"
+    jitter = None
+
+    def __init__(self, infos: list):
+        self._infos = {info["symbol"]: info for info in infos}
+
+    def get_info(self, ticker: str) -> dict:
+        return self._infos[ticker]
+
+
+# ─────────────────────────────────────────────
+#  HARNESS
+# ─────────────────────────────────────────────
+
+def measure(fn, items: int) -> dict:
+    """Time fn() — repeated within TIME_BUDGET_S for small cases."""
+    gc.collect()
+    t = time.perf_counter()
+    fn()
+    samples = [time.perf_counter() - t]
+
+    repeats = min(MAX_REPEATS, int(TIME_BUDGET_S / max(samples[0], 1e-6)))
+    for _ in range(repeats):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+
+    best = min(samples)
+    return {
+        "runs":        len(samples),
+        "best_s":      round(best, 6),
+        "median_s":    round(statistics.median(samples), 6),
+        "per_item_us": round(best / items * 1e6, 3) if items else None,
+    }
+
+
+def bench_case(source: str, infos: list) -> list:
+    n        = len(infos)
+    provider = MemoryProvider(infos)
+    tickers  = list(provider._infos)
+    limiter  = hs.RateLimiter(rate=1e9, burst=10**9)
+    data     = [hs.fetch_stock_data(t, provider=provider) for t in tickers]
+    ok       = [d for d in data if "error" not in d]
+    results  = [hs.evaluate_stock(d) for d in data]
+
+    import pandas as pd
+    import app      # export helpers; Streamlit calls are no-ops outside `streamlit run`
+    frame = pd.DataFrame(data)
+
+    def quiet(fn):
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn()
+        return run
+
+    cases = {
+        "screen_business_activity": (lambda: [hs.screen_business_activity(d) for d in ok],    len(ok)),
+        "screen_financial_ratios":  (lambda: [hs.screen_financial_ratios(d) for d in ok],     len(ok)),
+        "calculate_purification":   (lambda: [hs.calculate_purification(d) for d in ok],      len(ok)),
+        "evaluate_stock":           (lambda: [hs.evaluate_stock(d) for d in data],            n),
+        "evaluate_record":          (lambda: [hs.evaluate_record(d) for d in data],           n),
+        "screen_stock":             (lambda: [hs.screen_stock(t, provider=provider) for t in tickers], n),
+        "screen_portfolio[w=1]":    (quiet(lambda: hs.screen_portfolio(tickers, provider=provider)), n),
+        "screen_portfolio[w=4]":    (quiet(lambda: hs.screen_portfolio(
+                                        tickers, workers=4, limiter=limiter, provider=provider)), n),
+        f"screen_portfolio[p={PROCESSES}]": (lambda: hs.screen_portfolio(
+                                        tickers, processes=PROCESSES, provider=provider), n),
+        "screen_frame":             (lambda: hs.screen_frame(frame),                          n),
+        "screen_frame[reasons]":    (lambda: hs.screen_frame(frame, reasons=True),            n),
+        "ResultsTable":             (lambda: app.ResultsTable(results),                       n),
+        "to_csv":                   (lambda: app.to_csv(results),                             n),
+        "to_excel_bytes":           (lambda: app.to_excel_bytes(results),                     n),
+    }
+
+    rows = []
+    for name, (fn, items) in cases.items():
+        r = {"benchmark": name, "source": source, "size": n, **measure(fn, items)}
+        print(f"  {name:<26} {source:<9} {n:>7}  best {r['best_s']:>9.4f}s  "
+              f"{r['per_item_us'] or 0:>9.2f} µs/item  ({r['runs']} runs)", flush=True)
+        rows.append(r)
+    return rows
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import numpy, pandas, openpyxl
+    return {
+        "commit":       commit,
+        "timestamp":    datetime.now().isoformat(timespec="seconds"),
+        "python":       platform.python_version(),
+        "platform":     platform.platform(),
+        "pandas":       pandas.__version__,
+        "numpy":        numpy.__version__,
+        "openpyxl":     openpyxl.__version__,
+        "ahocorasick":  hs.ahocorasick is not None,
+    }
+
+
+def compare(current: list, baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {
+            (r["benchmark"], r["source"], r["size"]): r for r in json.load(f)["results"]
+        }
+    print(f"\nvs {baseline_path}  (ratio < 1 = faster now)")
+    for r in current:
+        old = baseline.get((r["benchmark"], r["source"], r["size"]))
+        if old and old["best_s"]:
+            ratio = r["best_s"] / old["best_s"]
+            flag  = "  ⚠️ slower" if ratio > 1.10 else ""
+            print(f"  {r['benchmark']:<26} {r['source']:<9} {r['size']:>7}  {ratio:>6.2f}x{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the screening core")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Ticker counts to benchmark (default: 10 1000 100000)")
+    parser.add_argument("--recorded", metavar="PATH",
+                        help="Also benchmark recorded info dicts (JSON/JSONL/Parquet/dir)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", metavar="PATH",
+                        help="Results JSON (default: benchmarks/results/bench_<time>.json)")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    # app.py (export helpers) calls init() on import — initialise first so
+    # log files land in a scratch directory, and keep per-ticker INFO quiet
+    scratch = tempfile.mkdtemp(prefix="halal_bench_")
+    hs.init(log_dir=scratch, reports_dir=scratch)
+    logging.getLogger().setLevel(logging.WARNING)
+    # Streamlit warns about every st.* call made outside `streamlit run`
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    recorded = list(load_recorded_infos(args.recorded).values()) if args.recorded else None
+
+    results = []
+    for n in args.sizes:
+        results += bench_case("synthetic", synthetic_infos(n, seed=args.seed))
+        if recorded:
+            results += bench_case("recorded", tile(recorded, n))
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
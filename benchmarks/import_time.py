@@ -0,0 +1,79 @@
+"""
+🌙 Halal Stock Screener — Import-Time Benchmark
+
+Times a cold `import` of each screener module in a fresh interpreter and
+checks that none of them pulls in the heavy dependencies (pandas, numpy,
+yfinance) or touches the filesystem on import.
+
+  python benchmarks/import_time.py            # 10 runs per module
+  python benchmarks/import_time.py --runs 30
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "halal_screener", "screener_cache", "screener_providers",
+    "screener_jobs", "screener_io", "screener_metrics", "screener_pool",
+    "screener_warm",
+]
+HEAVY   = ["pandas", "numpy", "yfinance"]
+
+# Runs in the child interpreter; prints import time and the heavy modules loaded
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"ms": elapsed * 1000, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(module: str, runs: int) -> dict:
+    samples, heavy = [], set()
+    with tempfile.TemporaryDirectory() as cwd:
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+                cwd=cwd, env={**os.environ, "PYTHONPATH": ROOT},
+                capture_output=True, text=True, check=True,
+            )
+            probe = json.loads(out.stdout.strip().splitlines()[-1])
+            samples.append(probe["ms"])
+            heavy.update(probe["heavy"])
+        created = sorted(os.listdir(cwd))
+
+    return {
+        "module":    module,
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms":    round(min(samples), 1),
+        "heavy":     sorted(heavy),
+        "created":   created,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold import time of the screener modules")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'module':<20} {'median':>9} {'min':>9}   notes")
+    for module in MODULES:
+        r     = time_import(module, args.runs)
+        notes = []
+        if r["heavy"]:
+            notes.append("imports " + ", ".join(r["heavy"]))
+        if r["created"]:
+            notes.append("creates " + ", ".join(r["created"]))
+        ok = ok and not notes
+        print(f"{module:<20} {r['median_ms']:>7.1f}ms {r['min_ms']:>7.1f}ms   {'; '.join(notes) or 'ok'}")
+
+    sys.exit(0 if ok else 1)
@@ -31,53 +31,130 @@ Dependencies:
     pip install yfinance pandas tabulate colorama openpyxl requests streamlit
 """
 
-import yfinance as yf
-import pandas as pd
+import functools
+import hashlib
+import json
 import logging
 import os
 import time
 import random
+import re
+import threading
+import itertools
+from collections import namedtuple
+from collections.abc import Mapping
+from dataclasses import dataclass, asdict, replace
+from enum import IntEnum
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
+from typing import TYPE_CHECKING
 import warnings
-warnings.filterwarnings("ignore")
+
+try:
+    import ahocorasick      # optional: pip install pyahocorasick (faster keyword scan)
+except ImportError:
+    ahocorasick = None
+
+from screener_cache import FundamentalsCache, DEFAULT_CACHE_PATH, FIELD_GROUPS
+from screener_providers import (
+    MarketDataProvider, YahooProvider, FileProvider, RecordingProvider, SymbolNotFound,
+)
+from screener_metrics import METRICS, new_timing
+
+if TYPE_CHECKING:
+    import pandas as pd     # imported lazily by screen_frame
 
 # ─────────────────────────────────────────────
 #  LOGGING
 # ─────────────────────────────────────────────
-os.makedirs("logs",    exist_ok=True)
-os.makedirs("reports", exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(
-            f"logs/halal_screener_{datetime.now().strftime('%Y%m%d')}.log"
-        ),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+_initialized = False
+
+
+def init(log_dir: str = "logs", reports_dir: str = "reports"):
+    """
+    Process-wide setup for entry points (CLI, web app): creates the log and
+    report directories, logs to a daily file plus the console, and silences
+    third-party warnings. Importing this module does none of that, so
+    workers and library users start fast. Safe to call more than once.
+    """
+    global _initialized
+    if _initialized:
+        return
+    _initialized = True
+
+    os.makedirs(log_dir,     exist_ok=True)
+    os.makedirs(reports_dir, exist_ok=True)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler(
+                os.path.join(log_dir, f"halal_screener_{datetime.now().strftime('%Y%m%d')}.log")
+            ),
+            logging.StreamHandler()
+        ]
+    )
+    warnings.filterwarnings("ignore")
+
 
 # ═══════════════════════════════════════════════════════════════
 #  SECTION 1: SCREENING CONFIGURATION
 #  Standard: AAOIFI
 # ═══════════════════════════════════════════════════════════════
 
-# ── Thresholds (AAOIFI standard) ─────────────────────────────
-THRESHOLDS = {
+# ── Thresholds ───────────────────────────────────────────────
+@dataclass(frozen=True)
+class Thresholds:
+    """
+    Financial-ratio limits for one Shariah standard, as fractions.
+
+    Immutable and hashable: pass one per call (each app session / job has
+    its own) and use it as a cache key for verdicts. Supports read-only
+    dict-style access, e.g. thresholds["max_debt_to_market_cap"].
+    """
+
     # AAOIFI: debt-to-market cap ratio no higher than 30%
     # Based on hadith of Saad bin Abi Waqas: "one third, and one third is much"
-    "max_debt_to_market_cap":        0.30,
+    max_debt_to_market_cap:          float = 0.30
 
     # AAOIFI: interest-bearing securities cannot exceed 30% of market cap
     # Formula: (Cash + Cash Equivalents + Deposits) / Market Cap
-    "max_interest_bearing_securities": 0.30,
+    max_interest_bearing_securities: float = 0.30
 
     # AAOIFI: revenue from non-permissible activities must be < 5%
-    "max_haram_revenue_ratio":       0.05,
-}
+    max_haram_revenue_ratio:         float = 0.05
+
+    @classmethod
+    def from_percent(cls, debt: float, sec: float, rev: float) -> "Thresholds":
+        """Build from whole percentages, e.g. Thresholds.from_percent(33, 33, 5)."""
+        return cls(debt / 100, sec / 100, rev / 100)
+
+    @classmethod
+    def coerce(cls, value) -> "Thresholds":
+        """Thresholds from None (AAOIFI default), a Thresholds, or a mapping of its fields."""
+        if value is None:
+            return THRESHOLDS
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, Mapping):
+            return cls(**value)
+        if hasattr(value, "as_dict"):
+            # Same class loaded twice (e.g. this file run as __main__)
+            return cls(**value.as_dict())
+        raise TypeError(f"Expected Thresholds or mapping, got {type(value).__name__}")
+
+    def __getitem__(self, key: str) -> float:
+        return getattr(self, key)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+# AAOIFI standard — the default everywhere no thresholds are passed
+THRESHOLDS = Thresholds()
 
 # ── Primary Haram Activities (auto-fail) ─────────────────────
 # Both AAOIFI auto-fail companies with these as core activities.
@@ -190,77 +267,791 @@ DEFAULT_TICKERS = [
     "JPM", "BAC", "GS", "V", "MA",
 ]
 
+# ── Web app presets ───────────────────────────────────────────
+# One-click universes in app.py; screener_warm keeps them cached
+PRESETS = {
+    "🖥️ Big Tech":      ["AAPL", "MSFT", "GOOGL", "META", "AMZN", "NVDA", "TSLA"],
+    "🏥 Healthcare":    ["JNJ", "PFE", "ABBV", "MRK", "UNH", "BMY", "AMGN"],
+    "🛒 Consumer":      ["WMT", "COST", "TGT", "MCD", "PG", "KO", "SBUX"],
+    "🌙 Islamic ETFs":  ["SPUS", "HLAL", "ISDU", "UMMA"],
+    "🏦 Banks (Test)":  ["JPM", "BAC", "GS", "WFC", "C"],
+    "⚡ Energy":        ["XOM", "CVX", "COP", "SLB", "OXY"],
+    "💊 Pharma":        ["LLY", "NVO", "AZN", "GILD", "REGN", "BIIB"],
+    "🏗️ Industrial":   ["CAT", "DE", "HON", "MMM", "GE", "RTX"],
+}
+
+
+# ── Concurrent fetch budget ───────────────────────────────────
+# Shared by all workers when screening with --workers > 1
+RATE_LIMIT = {
+    # Sustained requests per second across ALL workers
+    "requests_per_sec": 2.0,
+    # Requests that may go out back-to-back before the rate applies
+    "burst":            4,
+}
+
+# AdaptiveRateLimiter bounds and step sizes (AIMD)
+ADAPTIVE_RATE = {
+    "min_rate":        0.25,    # req/s floor after repeated throttling
+    "max_rate":        20.0,    # req/s ceiling
+    "increase":        0.25,    # req/s added per second of clean traffic
+    "decrease":        0.5,     # rate and concurrency multiplier on a throttle
+    "max_concurrency": 16,      # requests in flight, upper bound
+}
+
+# Where AdaptiveRateLimiter keeps the rate it learned between runs
+RATE_STATE_PATH = os.path.join("cache", "rate_limit.json")
+
+# ── Circuit breaker ───────────────────────────────────────────
+# Shared by every fetch: after `threshold` throttles in a row, fetches
+# fail fast (or serve stale cached data) for `cooldown` seconds, then a
+# single probe request decides whether to resume
+CIRCUIT_BREAKER = {
+    "threshold": 5,
+    "cooldown":  60.0,
+}
+
+# Seconds a symbol the provider does not know is answered from memory
+NOT_FOUND_TTL = 15 * 60
+
+# ── Stale-while-revalidate ────────────────────────────────────
+# With revalidate=True, expired cached data up to this old is returned at
+# once and renewed in the background; anything older is fetched as usual
+REVALIDATE_MAX_AGE = 7 * 86400
+# Threads renewing data that was served stale
+REVALIDATE_WORKERS = 2
+
 
 # ═══════════════════════════════════════════════════════════════
 #  SECTION 2: DATA FETCHING
 # ═══════════════════════════════════════════════════════════════
 
-def fetch_stock_data(ticker: str, max_retries: int = 3) -> dict:
+class RateLimiter:
     """
-    Fetch financial data from Yahoo Finance with retry + exponential backoff.
-    Automatically handles Yahoo Finance rate limiting (429 Too Many Requests).
+    Token-bucket rate limiter shared by every fetch worker.
+
+    Tokens refill at `rate` per second up to `burst`; each request takes
+    one. After a 429, `backoff()` pauses ALL workers until the wait is
+    over, then requests resume at the sustained rate (no burst).
     """
-    for attempt in range(max_retries):
+
+    def __init__(self, rate: float = None, burst: int = None):
+        self.rate  = float(rate  or RATE_LIMIT["requests_per_sec"])
+        self.burst = float(burst or RATE_LIMIT["burst"])
+
+        self._tokens        = self.burst
+        self._updated       = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock          = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a request may be sent. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now     = time.monotonic()
+                elapsed = max(0.0, now - self._updated)
+                self._tokens  = min(self.burst, self._tokens + elapsed * self.rate)
+                self._updated = max(now, self._updated)
+
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def backoff(self, seconds: float):
+        """Pause every worker for `seconds` (never shortens an active pause)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            # Drain the bucket so workers don't burst the moment the pause ends
+            self._tokens  = 0.0
+            self._updated = self._blocked_until
+
+    # ── Feedback from fetch_stock_data (used by AdaptiveRateLimiter) ──
+    def release(self):
+        """The request admitted by the last acquire() has finished."""
+
+    def on_success(self):
+        """A request got a usable response."""
+
+    def on_throttle(self):
+        """A request was rate-limited by the provider."""
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    RateLimiter that learns the provider's real limit (AIMD).
+
+    Every second of clean traffic adds `increase` req/s, and every
+    `concurrency` successes allow one more request in flight. A throttle
+    multiplies both by `decrease` — at most once per cooldown, so a burst
+    of 429s from workers already in flight counts as one signal. The rate
+    is saved to `state_path` and is the starting rate of the next run,
+    unless `rate` is given explicitly.
+    """
+
+    SAVE_INTERVAL = 30.0    # seconds between state saves while succeeding
+
+    def __init__(
+        self,
+        rate: float = None,
+        burst: int = None,
+        state_path: str = RATE_STATE_PATH,
+        **bounds,
+    ):
+        cfg = {**ADAPTIVE_RATE, **bounds}
+        self.state_path = state_path
+        learned = self.load_state(state_path) if rate is None else {}
+        super().__init__(rate or learned.get("rate"), burst)
+
+        self.min_rate        = cfg["min_rate"]
+        self.max_rate        = cfg["max_rate"]
+        self.increase        = cfg["increase"]
+        self.decrease        = cfg["decrease"]
+        self.max_concurrency = cfg["max_concurrency"]
+        self.rate            = min(self.max_rate, max(self.min_rate, self.rate))
+        self.concurrency     = min(self.max_concurrency, int(learned.get("concurrency", 2)))
+
+        self.successes = 0
+        self.throttles = 0
+
+        self._in_flight  = 0
+        self._slots      = threading.Condition()
+        self._streak     = 0
+        self._last_cut   = float("-inf")
+        self._last_saved = time.monotonic()
+
+    # ── Admission ─────────────────────────────────────────────
+    def acquire(self) -> float:
+        """Wait for an in-flight slot, then for a token. Returns seconds waited."""
+        started = time.monotonic()
+        with self._slots:
+            while self._in_flight >= self.concurrency:
+                self._slots.wait()
+            self._in_flight += 1
+        return (time.monotonic() - started) + super().acquire()
+
+    def release(self):
+        with self._slots:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._slots.notify()
+
+    # ── Feedback ──────────────────────────────────────────────
+    def on_success(self):
+        with self._lock:
+            self.successes += 1
+            # +increase req/s per second of traffic at the current rate
+            self.rate    = min(self.max_rate, self.rate + self.increase / self.rate)
+            self._streak += 1
+            grow = self._streak >= self.concurrency
+            if grow:
+                self._streak = 0
+            save = time.monotonic() - self._last_saved >= self.SAVE_INTERVAL
+
+        if grow:
+            with self._slots:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+                self._slots.notify()
+        if save:
+            self.save_state()
+
+    def on_throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            # Requests already in flight when we cut report the same overload
+            if now - self._last_cut < max(2.0, 2.0 / self.rate):
+                return
+            self._last_cut = now
+            self.throttles += 1
+            self.rate    = max(self.min_rate, self.rate * self.decrease)
+            self._streak = 0
+            logger.info(f"Throttled — request rate cut to {self.rate:.2f}/s")
+
+        with self._slots:
+            self.concurrency = max(1, int(self.concurrency * self.decrease))
+        self.save_state()
+
+    # ── Persistence ───────────────────────────────────────────
+    @staticmethod
+    def load_state(path: str) -> dict:
+        """Saved {"rate", "concurrency"}, or {} if there is none."""
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable rate state {path}: {e}")
+            return {}
+
+    def save_state(self):
+        if not self.state_path:
+            return
+        with self._lock:
+            self._last_saved = time.monotonic()
+            state = {
+                "rate":        round(self.rate, 3),
+                "concurrency": self.concurrency,
+                "updated_at":  datetime.now().isoformat(timespec="seconds"),
+            }
         try:
-            # Stagger requests to avoid triggering Yahoo Finance rate limits
-            time.sleep(random.uniform(0.8, 1.5))
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            tmp = f"{self.state_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            logger.warning(f"Could not save rate state to {self.state_path}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "rate":        round(self.rate, 3),
+            "concurrency": self.concurrency,
+            "successes":   self.successes,
+            "throttles":   self.throttles,
+        }
 
-            stock = yf.Ticker(ticker)
-            info  = stock.info
 
-            # Empty dict = Yahoo silently rate-limited us
-            if not info or len(info) < 5:
-                raise ValueError("Empty response — possible rate limit")
+class CircuitBreaker:
+    """
+    Stops every fetch while the provider keeps throttling, instead of each
+    ticker working through its own retries and backoffs.
+
+      closed     — requests flow; `threshold` throttles in a row open it
+      open       — allow() refuses everything for `cooldown` seconds
+      half_open  — allow() lets exactly one probe through: a response
+                   closes the circuit, another throttle re-opens it
+    """
 
-            name        = info.get("longName", ticker)
-            sector      = info.get("sector", "N/A") or "N/A"
-            industry    = info.get("industry", "N/A") or "N/A"
-            description = (info.get("longBusinessSummary", "") or "").lower()
-            country     = info.get("country", "N/A") or "N/A"
-            market_cap  = info.get("marketCap")
-            price       = info.get("currentPrice") or info.get("regularMarketPrice")
-
-            # ── Balance Sheet ─────────────────────────────────
-            total_debt  = info.get("totalDebt", 0) or 0
-            total_cash  = info.get("totalCash", 0) or 0
-
-            # ── Income Statement ──────────────────────────────
-            total_revenue    = info.get("totalRevenue")
-            interest_expense = abs(info.get("interestExpense", 0) or 0)
-
-            # ── Valuation ─────────────────────────────────────
-            pe_ratio       = info.get("trailingPE")
-            pb_ratio       = info.get("priceToBook")
-            dividend_yield = info.get("dividendYield", 0) or 0
-            eps            = info.get("trailingEps")
-            roe            = info.get("returnOnEquity")
+    def __init__(self, threshold: int = None, cooldown: float = None):
+        self.threshold = int(threshold or CIRCUIT_BREAKER["threshold"])
+        self.cooldown  = float(cooldown or CIRCUIT_BREAKER["cooldown"])
+
+        self.state     = "closed"
+        self.failures  = 0      # consecutive throttles
+        self.opened    = 0      # times the circuit opened
+        self.rejected  = 0      # requests refused while open
+
+        self._opened_at = 0.0
+        self._probing   = False
+        self._lock      = threading.Lock()
+
+    def allow(self) -> bool:
+        """May a request be sent now? Callers report back with on_*()."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state    = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe may go out (0 when closed)."""
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def on_success(self):
+        """The provider answered (with data, or a definite "no such symbol")."""
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Circuit closed — provider is answering again")
+            self.state    = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def on_throttle(self):
+        """The provider rate-limited a request."""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+                self.state      = "open"
+                self.opened    += 1
+                self._opened_at = time.monotonic()
+                self._probing   = False
+                logger.warning(
+                    f"Circuit open after {self.failures} throttle(s) in a row — "
+                    f"failing fast for {self.cooldown:.0f}s"
+                )
 
+    def on_error(self):
+        """A request failed for another reason; frees the probe slot."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
             return {
-                "ticker":           ticker,
-                "name":             name,
-                "sector":           sector,
-                "industry":         industry,
-                "description":      description,
-                "country":          country,
-                "market_cap":       market_cap,
-                "price":            price,
-                "total_debt":       total_debt,
-                "total_cash":       total_cash,
-                "total_revenue":    total_revenue,
-                "interest_expense": interest_expense,
-                "pe_ratio":         pe_ratio,
-                "pb_ratio":         pb_ratio,
-                "dividend_yield":   dividend_yield,
-                "eps":              eps,
-                "roe":              roe,
+                "state":    self.state,
+                "failures": self.failures,
+                "opened":   self.opened,
+                "rejected": self.rejected,
             }
 
+
+class NotFoundCache:
+    """Symbols a provider reported as nonexistent, remembered for `ttl` seconds."""
+
+    # Expired entries are swept once this many are held
+    max_entries = 10_000
+
+    def __init__(self, ttl: float = None):
+        self.ttl    = NOT_FOUND_TTL if ttl is None else ttl
+        self._until = {}
+        self._lock  = threading.Lock()
+
+    def add(self, key):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_entries:
+                self._until = {k: t for k, t in self._until.items() if t > now}
+            self._until[key] = now + self.ttl
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            until = self._until.get(key)
+            if until is not None and until <= time.monotonic():
+                del self._until[key]
+                until = None
+            return until is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._until)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done   = threading.Event()
+        self.result = None
+        self.error  = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the
+    function, callers arriving while it is in flight wait for it and get
+    the same result (or exception). Nothing is remembered afterwards —
+    pair it with a FundamentalsCache for that.
+
+    `calls` counts every do(), `saved` the calls that joined another
+    instead of running fn themselves.
+    """
+
+    def __init__(self):
+        self.calls    = 0
+        self.saved    = 0
+        self._flights = {}
+        self._lock    = threading.Lock()
+
+    def do(self, key, fn) -> tuple:
+        """(fn()'s result, True if this caller ran fn)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            self.calls += 1
+            self.saved += not leader
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, False
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, True
+
+    def __len__(self) -> int:
+        """Calls currently in flight."""
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._flights), "calls": self.calls, "saved": self.saved}
+
+
+# Coalesces every fetch_stock_data call in this process unless another
+# SingleFlight is passed: overlapping screens, retries, batch jobs and
+# web sessions never fetch the same ticker twice at once
+IN_FLIGHT = SingleFlight()
+
+# One breaker and one not-found list for every fetch in this process
+BREAKER   = CircuitBreaker()
+NOT_FOUND = NotFoundCache()
+
+# Used whenever no provider is passed explicitly
+DEFAULT_PROVIDER = YahooProvider()
+
+# Tickers per batched quote request, for providers that don't set `quote_batch`
+QUOTE_BATCH = 50
+
+
+def normalize_info(ticker: str, info: dict) -> dict:
+    """Raw provider `info` dict → the flat record the screens consume."""
+    name        = info.get("longName", ticker)
+    sector      = info.get("sector", "N/A") or "N/A"
+    industry    = info.get("industry", "N/A") or "N/A"
+    description = (info.get("longBusinessSummary", "") or "").lower()
+    country     = info.get("country", "N/A") or "N/A"
+    market_cap  = info.get("marketCap")
+    price       = info.get("currentPrice") or info.get("regularMarketPrice")
+
+    # ── Balance Sheet ─────────────────────────────────
+    total_debt  = info.get("totalDebt", 0) or 0
+    total_cash  = info.get("totalCash", 0) or 0
+
+    # ── Income Statement ──────────────────────────────
+    total_revenue    = info.get("totalRevenue")
+    interest_expense = abs(info.get("interestExpense", 0) or 0)
+
+    # ── Valuation ─────────────────────────────────────
+    pe_ratio       = info.get("trailingPE")
+    pb_ratio       = info.get("priceToBook")
+    dividend_yield = info.get("dividendYield", 0) or 0
+    eps            = info.get("trailingEps")
+    roe            = info.get("returnOnEquity")
+
+    return {
+        "ticker":           ticker,
+        "name":             name,
+        "sector":           sector,
+        "industry":         industry,
+        "description":      description,
+        "country":          country,
+        "market_cap":       market_cap,
+        "price":            price,
+        "total_debt":       total_debt,
+        "total_cash":       total_cash,
+        "total_revenue":    total_revenue,
+        "interest_expense": interest_expense,
+        "pe_ratio":         pe_ratio,
+        "pb_ratio":         pb_ratio,
+        "dividend_yield":   dividend_yield,
+        "eps":              eps,
+        "roe":              roe,
+    }
+
+
+def _is_rate_limit(e: Exception) -> bool:
+    """True for errors that mean "slow down" rather than "no such data"."""
+    err_str = str(e).lower()
+    return "ratelimit" in type(e).__name__.lower() or any(x in err_str for x in [
+        "rate limit", "too many requests", "429",
+        "empty response", "no data", "timeout"
+    ])
+
+
+def refresh_quotes(
+    tickers: list,
+    limiter: RateLimiter = None,
+    provider: MarketDataProvider = None,
+    cache: FundamentalsCache = None,
+    within: float = 0.0,
+    breaker: CircuitBreaker = None,
+) -> int:
+    """
+    Renew cached prices in bulk. Tickers whose only stale cache group is
+    `quote` get fresh quotes from provider.get_quotes — one request per
+    batch of tickers instead of a full fetch each — so the fetch that
+    follows is a cache hit. Returns the number of tickers renewed; any
+    failure (or an open breaker) just leaves those tickers to the normal
+    per-ticker path.
+    within  — also renew quotes that go stale in the next `within` seconds.
+    breaker — CircuitBreaker to consult and report to (default: BREAKER).
+    """
+    provider   = provider or DEFAULT_PROVIDER
+    breaker    = BREAKER if breaker is None else breaker
+    get_quotes = getattr(provider, "get_quotes", None)
+    if cache is None or get_quotes is None:
+        return 0
+
+    stale = [t for t, groups in cache.stale_groups(tickers, within).items() if groups == {"quote"}]
+    batch = getattr(provider, "quote_batch", QUOTE_BATCH)
+    renewed = requests = 0
+
+    for i in range(0, len(stale), batch):
+        chunk = stale[i:i + batch]
+        if not breaker.allow():
+            break
+        try:
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                quotes = get_quotes(chunk)
+            finally:
+                if limiter is not None:
+                    limiter.release()
+        except NotImplementedError:
+            breaker.on_error()
+            return renewed
+        except Exception as e:
+            if _is_rate_limit(e):
+                breaker.on_throttle()
+                if limiter is not None:
+                    limiter.on_throttle()
+            else:
+                breaker.on_error()
+            logger.warning(f"Batched quote request failed ({len(chunk)} tickers): {e}")
+            continue
+
+        requests += 1
+        breaker.on_success()
+        if limiter is not None:
+            limiter.on_success()
+        for ticker in chunk:
+            quote = quotes.get(ticker)
+            if quote:
+                record = normalize_info(ticker, quote)
+                cache.put(ticker, {k: record[k] for k in FIELD_GROUPS["quote"]})
+                renewed += 1
+
+    if stale:
+        logger.info(f"Refreshed quotes for {renewed}/{len(stale)} cached tickers in {requests} request(s)")
+    return renewed
+
+
+def fetch_stock_data(
+    ticker: str,
+    max_retries: int = 3,
+    limiter: RateLimiter = None,
+    provider: MarketDataProvider = None,
+    cache: FundamentalsCache = None,
+    refresh: bool = False,
+    inflight: SingleFlight = None,
+    breaker: CircuitBreaker = None,
+    revalidate: bool = False,
+    on_revalidated=None,
+) -> dict:
+    """
+    Fetch financial data from Yahoo Finance with retry + exponential backoff.
+    Automatically handles Yahoo Finance rate limiting (429 Too Many Requests).
+
+    limiter    — shared RateLimiter; replaces the provider's per-request
+                 stagger and turns a 429 backoff into a pause for every worker.
+    provider   — where `info` dicts come from (default: Yahoo Finance).
+                 See screener_providers for recorded and simulated sources.
+    cache      — FundamentalsCache; fresh entries are returned without any
+                 network call, successful fetches are written back.
+    refresh    — ignore cached entries (still writes the new data back).
+    inflight   — SingleFlight that coalesces concurrent calls (default:
+                 the process-wide IN_FLIGHT). A caller asking for a ticker
+                 that is already being fetched from the same provider and
+                 cache waits for that fetch and gets a copy of its result
+                 (with refresh=True too — an in-flight fetch is fresh).
+    breaker    — CircuitBreaker shared across tickers (default: BREAKER).
+                 While it is open, fetches skip the provider and return
+                 the cached data whatever its age (timing "stale", with
+                 `age_s`), or an error when there is none — marked with
+                 `retry_in`, as the ticker was never actually tried.
+    revalidate — stale-while-revalidate: if the cached data has expired
+                 but is under REVALIDATE_MAX_AGE, return it at once (timing
+                 "revalidate", with `age_s`) and fetch a fresh copy in the
+                 background, which goes to the cache and to
+                 `on_revalidated(data)` (called on a background thread).
+
+    Symbols the provider reports as nonexistent are remembered in
+    NOT_FOUND for NOT_FOUND_TTL seconds and not requested again.
+    The returned dict carries a `timing` record (see screener_metrics).
+    """
+    started  = time.perf_counter()
+    inflight = IN_FLIGHT if inflight is None else inflight
+
+    if revalidate and cache is not None and not refresh and cache.stale_groups([ticker]):
+        stale, fetched_at = cache.get_stale(ticker)
+        age = time.time() - fetched_at if stale is not None else None
+        if age is not None and age <= REVALIDATE_MAX_AGE:
+            _revalidate(ticker, max_retries, limiter, provider, cache, on_revalidated)
+            timing = {
+                **new_timing("revalidate"), "age_s": age, "fetch_s": time.perf_counter() - started,
+            }
+            METRICS.observe(timing)
+            return {**stale, "timing": timing}
+
+    data, leader = inflight.do(
+        (ticker, provider, cache),
+        lambda: _fetch_stock_data(
+            ticker, max_retries, limiter, provider, cache, refresh,
+            BREAKER if breaker is None else breaker,
+        ),
+    )
+    if leader:
+        return data
+
+    # Joined another caller's fetch: same data, own timing record
+    timing = {**new_timing("shared"), "fetch_s": time.perf_counter() - started}
+    METRICS.observe(timing, error="error" in data)
+    return {**data, "timing": timing}
+
+
+# Background renewals of data served by revalidate=True:
+# (ticker, provider, cache) → callbacks waiting for the fresh data
+_revalidating      = {}
+_revalidating_lock = threading.Lock()
+_revalidator       = None      # ThreadPoolExecutor, started on first use
+
+
+def _revalidate(ticker, max_retries, limiter, provider, cache, on_revalidated):
+    # Queue one background renewal per ticker; later callers just add callbacks
+    global _revalidator
+    key = (ticker, provider, cache)
+    with _revalidating_lock:
+        callbacks = _revalidating.get(key)
+        if callbacks is None:
+            callbacks = _revalidating[key] = []
+            if _revalidator is None:
+                _revalidator = ThreadPoolExecutor(REVALIDATE_WORKERS, thread_name_prefix="revalidate")
+            _revalidator.submit(_run_revalidation, key, max_retries, limiter)
+        if on_revalidated is not None:
+            callbacks.append(on_revalidated)
+
+
+def _run_revalidation(key, max_retries, limiter):
+    ticker, provider, cache = key
+    try:
+        # Only prices expired → one quote request, and the fetch is a cache hit
+        refresh_quotes([ticker], limiter=limiter, provider=provider, cache=cache)
+        data = fetch_stock_data(ticker, max_retries, limiter, provider, cache)
+    except Exception as e:
+        logger.exception(f"[{ticker}] Background refresh failed")
+        data = {"ticker": ticker, "error": str(e), "timing": new_timing("miss")}
+
+    # Callbacks run before the key is dropped, so revalidations_pending()
+    # only reaches 0 once every caller has its data; callbacks added while
+    # they run are picked up when the key is removed
+    with _revalidating_lock:
+        callbacks = list(_revalidating[key])
+    _notify(ticker, callbacks, data)
+    with _revalidating_lock:
+        late = _revalidating.pop(key)[len(callbacks):]
+    _notify(ticker, late, data)
+
+
+def _notify(ticker: str, callbacks: list, data: dict):
+    for callback in callbacks:
+        try:
+            callback(data)
+        except Exception:
+            logger.exception(f"[{ticker}] on_revalidated callback failed")
+
+
+def revalidations_pending() -> int:
+    """Background renewals queued or running."""
+    with _revalidating_lock:
+        return len(_revalidating)
+
+
+def _fetch_stock_data(ticker, max_retries, limiter, provider, cache, refresh, breaker) -> dict:
+    started = time.perf_counter()
+    timing  = new_timing("off" if cache is None else "refresh" if refresh else "miss")
+
+    def finish(data: dict) -> dict:
+        timing["fetch_s"] = time.perf_counter() - started
+        data["timing"]    = timing
+        METRICS.observe(timing, error="error" in data)
+        return data
+
+    if cache is not None and not refresh:
+        cached = cache.get(ticker)
+        if cached is not None:
+            timing["cache"] = "hit"
+            return finish(cached)
+
+    provider = provider or DEFAULT_PROVIDER
+    if (provider.name, ticker) in NOT_FOUND:
+        timing["cache"] = "not_found"
+        return finish({"ticker": ticker, "error": f"{ticker} not found — check the symbol"})
+
+    def circuit_open() -> dict:
+        # Provider is throttling everyone: last known data beats waiting
+        stale, fetched_at = cache.get_stale(ticker) if cache is not None else (None, None)
+        if stale is not None:
+            timing["cache"] = "stale"
+            timing["age_s"] = time.time() - fetched_at
+            return finish(stale)
+        retry_in = breaker.retry_in()
+        return finish({
+            "ticker":   ticker,
+            "error":    f"Yahoo Finance is rate-limiting — paused, retrying in {retry_in:.0f}s",
+            "retry_in": retry_in,
+        })
+
+    for attempt in range(max_retries):
+        timing["retries"] = attempt
+        if not breaker.allow():
+            return circuit_open()
+        try:
+            if limiter is not None:
+                timing["wait_s"] += limiter.acquire()
+            elif provider.jitter:
+                # Stagger requests to avoid triggering Yahoo Finance rate limits
+                pause = random.uniform(*provider.jitter)
+                time.sleep(pause)
+                timing["wait_s"] += pause
+
+            call_started = time.perf_counter()
+            try:
+                info = provider.get_info(ticker)
+            finally:
+                timing["provider_s"] += time.perf_counter() - call_started
+                if limiter is not None:
+                    limiter.release()
+
+            # Nothing at all = silently rate-limited (providers detect it
+            # themselves where they can; sparse but valid info is kept)
+            if not info:
+                raise ValueError("Empty response — possible rate limit")
+            breaker.on_success()
+            if limiter is not None:
+                limiter.on_success()
+
+            data = normalize_info(ticker, info)
+            if cache is not None:
+                cache.put(ticker, data)
+            return finish(data)
+
+        except SymbolNotFound as e:
+            breaker.on_success()
+            NOT_FOUND.add((provider.name, ticker))
+            logger.warning(f"[{ticker}] {e}")
+            return finish({"ticker": ticker, "error": f"{ticker} not found — check the symbol"})
+
         except Exception as e:
-            err_str = str(e).lower()
-            is_rate_limit = any(x in err_str for x in [
-                "rate limit", "too many requests", "429",
-                "empty response", "no data", "timeout"
-            ])
+            is_rate_limit = _is_rate_limit(e)
+            timing["rate_limited"] += is_rate_limit
+            if is_rate_limit:
+                breaker.on_throttle()
+                if limiter is not None:
+                    limiter.on_throttle()
+            else:
+                breaker.on_error()
+
+            if is_rate_limit and breaker.state == "open":
+                return circuit_open()
 
             if is_rate_limit and attempt < max_retries - 1:
                 # Exponential backoff: 4s, 8s, 12s...
@@ -269,19 +1060,23 @@ def fetch_stock_data(ticker: str, max_retries: int = 3) -> dict:
                     f"[{ticker}] Rate limited. "
                     f"Waiting {wait:.1f}s before retry {attempt+2}/{max_retries}..."
                 )
-                time.sleep(wait)
+                if limiter is not None:
+                    limiter.backoff(wait)
+                else:
+                    time.sleep(wait)
+                timing["backoff_s"] += wait
                 continue
 
             logger.warning(f"[{ticker}] Failed after {attempt+1} attempt(s): {e}")
-            return {
+            return finish({
                 "ticker": ticker,
                 "error":  "Rate limited by Yahoo Finance — wait 30 seconds and try again"
-            }
+            })
 
-    return {
+    return finish({
         "ticker": ticker,
         "error":  "Rate limit exceeded after retries — please wait 1 minute and try again"
-    }
+    })
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -289,78 +1084,218 @@ def fetch_stock_data(ticker: str, max_retries: int = 3) -> dict:
 #  Methodology: AAOIFI (both AAOIFI)
 # ═══════════════════════════════════════════════════════════════
 
-def screen_business_activity(data: dict) -> dict:
+# ── Compiled keyword matcher ──────────────────────────────────
+# All four rule tables are compiled into ONE automaton so a description is
+# scanned once, instead of once per keyword / sector name. Uses an
+# Aho–Corasick automaton when pyahocorasick is installed, otherwise a
+# single trie-shaped regex.
+
+KeywordMatch = namedtuple("KeywordMatch", "table category keyword start")
+
+
+def _trie_pattern(words) -> str:
+    """Regex for `words` factored as a trie; at any position it matches the LONGEST word."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
     """
-    Screen 1 — Business Activity (AAOIFI standard).
+    Single-pass matcher over the business-activity rule tables.
 
-    - Primary haram core business → NON-COMPLIANT
-    - Revenue from impermissible sources must be < 5% of total revenue
-    - Gray-area industries → QUESTIONABLE (scholars differ on permissibility)
+    Tables: "primary" (PRIMARY_HARAM), "gray" (GRAY_AREA), "haram_sector"
+    (HARAM_SECTORS) and "questionable_sector" (QUESTIONABLE_SECTORS).
+    Matching is case-insensitive substring matching, exactly like `kw in text`,
+    including overlapping matches (e.g. "firearms" also matches "arms").
     """
+
+    def __init__(self, primary: dict, gray: dict, haram_sectors: list, questionable_sectors: list):
+        self.rules = {}     # keyword → [(table, category), ...]
+        for table, groups in (("primary", primary), ("gray", gray)):
+            for category, keywords in groups.items():
+                for kw in keywords:
+                    self.rules.setdefault(kw.lower(), []).append((table, category))
+        for table, sectors in (("haram_sector", haram_sectors),
+                               ("questionable_sector", questionable_sectors)):
+            for sector in sectors:
+                self.rules.setdefault(sector.lower(), []).append((table, sector))
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.rules:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            # The regex reports the longest keyword at each position; every
+            # shorter keyword that is a prefix of it matches there too.
+            self._prefixes = {
+                kw: [other for other in self.rules if other != kw and kw.startswith(other)]
+                for kw in self.rules
+            }
+            self._regex = re.compile(_trie_pattern(self.rules))
+
+    def _scan(self, text: str):
+        """Yield (start, keyword) for every occurrence in already-lowercased `text`."""
+        if self._automaton is not None:
+            for end, kw in self._automaton.iter(text):
+                yield end - len(kw) + 1, kw
+            return
+
+        search = self._regex.search
+        m = search(text)
+        while m:
+            start = m.start()
+            yield start, m.group()
+            for kw in self._prefixes[m.group()]:
+                yield start, kw
+            m = search(text, start + 1)
+
+    def find_all(self, text: str) -> list:
+        """Every (table, category, keyword, start) hit in `text`, by position."""
+        matches = [
+            KeywordMatch(table, category, kw, start)
+            for start, kw in self._scan(text.lower())
+            for table, category in self.rules[kw]
+        ]
+        matches.sort(key=lambda m: (m.start, -len(m.keyword)))
+        return matches
+
+    def matched_categories(self, text: str) -> dict:
+        """{table: {category, ...}} of every rule hit in lowercased `text`."""
+        found = {"primary": set(), "gray": set(), "haram_sector": set(), "questionable_sector": set()}
+        for _, kw in self._scan(text):
+            for table, category in self.rules[kw]:
+                found[table].add(category)
+        return found
+
+
+def _keyword_rules_key() -> tuple:
+    return (
+        tuple((c, tuple(kws)) for c, kws in PRIMARY_HARAM.items()),
+        tuple((c, tuple(kws)) for c, kws in GRAY_AREA.items()),
+        tuple(HARAM_SECTORS),
+        tuple(QUESTIONABLE_SECTORS),
+    )
+
+
+# Bumped by keyword_rules_changed(); the matcher is rebuilt when it moves
+_rules_version = 0
+_matcher_cache = {"version": None, "matcher": None, "digest": None}
+
+
+def keyword_rules_changed():
+    """
+    Call after editing PRIMARY_HARAM, GRAY_AREA, HARAM_SECTORS or
+    QUESTIONABLE_SECTORS: the matcher (and the fingerprints that cover
+    the rules) are rebuilt on next use.
+    """
+    global _rules_version
+    _rules_version += 1
+
+
+def keyword_matcher() -> KeywordMatcher:
+    """The compiled matcher for the rule tables, built once per keyword_rules_changed()."""
+    if _matcher_cache["version"] != _rules_version:
+        key = _keyword_rules_key()
+        _matcher_cache["matcher"] = KeywordMatcher(
+            PRIMARY_HARAM, GRAY_AREA, HARAM_SECTORS, QUESTIONABLE_SECTORS
+        )
+        _matcher_cache["version"] = _rules_version
+        _matcher_cache["digest"]  = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+    return _matcher_cache["matcher"]
+
+
+def _business_text(data: dict) -> tuple:
     sector      = (data.get("sector",      "") or "").strip()
     industry    = (data.get("industry",    "") or "").strip()
     description = (data.get("description", "") or "").lower()
+    return sector, industry, f"{sector} {industry} {description}".lower()
+
+
+def find_keyword_matches(data: dict) -> list:
+    """All rule hits (with positions) in a stock's sector, industry and description."""
+    return keyword_matcher().find_all(_business_text(data)[2])
 
-    combined = f"{sector} {industry} {description}".lower()
+
+def _classify_business(sector: str, industry: str, combined: str, matcher: KeywordMatcher) -> tuple:
+    """
+    Rule decision without any text: (verdict, rule, category).
+    rule is "primary", "haram_sector", "gray", "questionable_sector" or None.
+    """
+    found = matcher.matched_categories(combined)
 
     # ── 1. Primary haram keyword check ───────────────────────
-    primary_violations = []
-    for category, keywords in PRIMARY_HARAM.items():
-        for kw in keywords:
-            if kw in combined:
-                primary_violations.append(f"{category}")
-                break
-
-    if primary_violations:
+    for category in PRIMARY_HARAM:
+        if category in found["primary"]:
+            return "fail", "primary", category
+
+    # ── 2. Haram sector check ─────────────────────────────────
+    for hs in HARAM_SECTORS:
+        if hs in found["haram_sector"] or sector == hs or industry == hs:
+            return "fail", "haram_sector", hs
+
+    # ── 3. Gray-area keyword check (Questionable) ────────────
+    for category in GRAY_AREA:
+        if category in found["gray"]:
+            return "questionable", "gray", category
+
+    for qs in QUESTIONABLE_SECTORS:
+        if qs in found["questionable_sector"] or sector == qs or industry == qs:
+            return "questionable", "questionable_sector", qs
+
+    # ── 4. Clean pass ─────────────────────────────────────────
+    return "pass", None, None
+
+
+def _business_result(verdict: str, rule: str, category: str) -> dict:
+    """Status, reason and detail text for a _classify_business decision."""
+    if rule == "primary":
         return {
             "verdict": "fail",
             "status":  "❌ NON-COMPLIANT",
-            "reason":  f"Primary haram activity: {primary_violations[0]}",
+            "reason":  f"Primary haram activity: {category}",
             "detail":  (
                 "Core business involves a prohibited activity under AAOIFI "
                 "standards (AAOIFI). This activity is impermissible."
             )
         }
 
-    # ── 2. Haram sector check ─────────────────────────────────
-    for hs in HARAM_SECTORS:
-        if hs.lower() in combined or sector == hs or industry == hs:
-            return {
-                "verdict": "fail",
-                "status":  "❌ NON-COMPLIANT",
-                "reason":  f"Haram sector: {hs}",
-                "detail":  (
-                    "Company operates in a sector classified as non-permissible "
-                    "by AAOIFI standards. Flagged by AAOIFI."
-                )
-            }
+    if rule == "haram_sector":
+        return {
+            "verdict": "fail",
+            "status":  "❌ NON-COMPLIANT",
+            "reason":  f"Haram sector: {category}",
+            "detail":  (
+                "Company operates in a sector classified as non-permissible "
+                "by AAOIFI standards. Flagged by AAOIFI."
+            )
+        }
 
-    # ── 3. Gray-area keyword check (Questionable) ────────────
-    gray_flags = []
-    for category, keywords in GRAY_AREA.items():
-        for kw in keywords:
-            if kw in combined:
-                gray_flags.append(category)
-                break
-
-    if not gray_flags:
-        for qs in QUESTIONABLE_SECTORS:
-            if qs.lower() in combined or sector == qs or industry == qs:
-                gray_flags.append(qs)
-                break
-
-    if gray_flags:
+    if verdict == "questionable":
         return {
             "verdict": "questionable",
             "status":  "🟡 QUESTIONABLE",
-            "reason":  f"Gray-area industry: {gray_flags[0]}",
+            "reason":  f"Gray-area industry: {category}",
             "detail":  (
                 f"Scholars differ on permissibility "
-                f"for '{gray_flags[0]}'. Review the business model carefully before investing."
+                f"for '{category}'. Review the business model carefully before investing."
             )
         }
 
-    # ── 4. Clean pass ─────────────────────────────────────────
     return {
         "verdict": "pass",
         "status":  "✅ PASS",
@@ -369,12 +1304,26 @@ def screen_business_activity(data: dict) -> dict:
     }
 
 
+def screen_business_activity(data: dict, matcher: KeywordMatcher = None) -> dict:
+    """
+    Screen 1 — Business Activity (AAOIFI standard).
+
+    - Primary haram core business → NON-COMPLIANT
+    - Revenue from impermissible sources must be < 5% of total revenue
+    - Gray-area industries → QUESTIONABLE (scholars differ on permissibility)
+    """
+    sector, industry, combined = _business_text(data)
+    return _business_result(
+        *_classify_business(sector, industry, combined, matcher or keyword_matcher())
+    )
+
+
 # ═══════════════════════════════════════════════════════════════
 #  SECTION 4: FINANCIAL RATIO SCREEN
 #  AAOIFI Financial Ratio Screen
 # ═══════════════════════════════════════════════════════════════
 
-def screen_financial_ratios(data: dict) -> dict:
+def screen_financial_ratios(data: dict, thresholds: Thresholds = None) -> dict:
     """
     Screen 2 — Financial Ratios (AAOIFI standard).
 
@@ -389,62 +1338,32 @@ def screen_financial_ratios(data: dict) -> dict:
 
     Basis for 30%: Derived from the hadith of Saad Bin Abi Waqas where
     the Prophet ﷺ said "one third, and one third is much."
+
+    thresholds — limits to apply (default: AAOIFI, THRESHOLDS).
     """
-    market_cap = data.get("market_cap")
-    total_debt  = data.get("total_debt",  0) or 0
-    total_cash  = data.get("total_cash",  0) or 0
-    total_revenue    = data.get("total_revenue")    or 0
-    interest_expense = data.get("interest_expense", 0) or 0
+    thresholds = Thresholds.coerce(thresholds)
+    debt_ratio, sec_ratio, haram_rev_ratio = _financial_ratios(data)
 
     ratios    = {}
-    failures  = []
     warnings_ = []
 
-    debt_limit = THRESHOLDS["max_debt_to_market_cap"]
-    sec_limit  = THRESHOLDS["max_interest_bearing_securities"]
-
     # ── Ratio 1: Interest-bearing debt / Market Cap ───────────
-    if market_cap and market_cap > 0:
-        debt_ratio         = total_debt / market_cap
+    # ── Ratio 2: Interest-bearing securities / Market Cap ─────
+    # AAOIFI formula: (Cash + Cash Equivalents + Deposits) / Market Cap
+    if debt_ratio is not None:
         ratios["debt_ratio"] = round(debt_ratio * 100, 2)
-
-        if debt_ratio > debt_limit:
-            failures.append(
-                f"Debt/MktCap {debt_ratio:.1%} exceeds {debt_limit:.0%} limit"
-            )
+        ratios["sec_ratio"]  = round(sec_ratio * 100, 2)
     else:
         ratios["debt_ratio"] = None
+        ratios["sec_ratio"]  = None
         warnings_.append("Market cap unavailable — debt ratio skipped")
-
-    # ── Ratio 2: Interest-bearing securities / Market Cap ─────
-    # AAOIFI formula: (Cash + Cash Equivalents + Deposits) / Market Cap
-    if market_cap and market_cap > 0:
-        sec_ratio             = total_cash / market_cap
-        ratios["sec_ratio"]   = round(sec_ratio * 100, 2)
-
-        if sec_ratio > sec_limit:
-            failures.append(
-                f"Interest-bearing securities {sec_ratio:.1%} exceeds {sec_limit:.0%} limit"
-            )
-    else:
-        ratios["sec_ratio"] = None
         warnings_.append("Market cap unavailable — securities ratio skipped")
 
     # ── Ratio 3: Haram Revenue % (AAOIFI 5% rule) ──
-    # We use interest_expense as proxy for impermissible income
-    if total_revenue > 0 and interest_expense > 0:
-        haram_rev_ratio           = interest_expense / total_revenue
-        ratios["haram_rev_ratio"] = round(haram_rev_ratio * 100, 4)
-
-        haram_limit = THRESHOLDS["max_haram_revenue_ratio"]
-        if haram_rev_ratio > haram_limit:
-            failures.append(
-                f"Impermissible revenue {haram_rev_ratio:.1%} exceeds {haram_limit:.0%} limit"
-            )
-    else:
-        ratios["haram_rev_ratio"] = 0.0
+    ratios["haram_rev_ratio"] = round(haram_rev_ratio * 100, 4) if haram_rev_ratio is not None else 0.0
 
     # ── Final verdict ─────────────────────────────────────────
+    failures = _ratio_failures(debt_ratio, sec_ratio, haram_rev_ratio, thresholds)
     if failures:
         return {
             "verdict":  "fail",
@@ -457,12 +1376,55 @@ def screen_financial_ratios(data: dict) -> dict:
     return {
         "verdict":  "pass",
         "status":   "✅ PASS",
-        "reason":   "All financial ratios within AAOIFI limits",
+        "reason":   FIN_PASS_REASON,
         "ratios":   ratios,
         "warnings": warnings_
     }
 
 
+def _financial_ratios(data: dict) -> tuple:
+    """
+    (debt, securities, impermissible revenue) ratios as unrounded
+    fractions. The first two are None without a positive market cap, the
+    last is None without both revenue and interest expense.
+    """
+    market_cap       = data.get("market_cap")
+    total_debt       = data.get("total_debt",  0) or 0
+    total_cash       = data.get("total_cash",  0) or 0
+    total_revenue    = data.get("total_revenue")    or 0
+    interest_expense = data.get("interest_expense", 0) or 0
+
+    debt_ratio = sec_ratio = haram_rev_ratio = None
+    if market_cap and market_cap > 0:
+        debt_ratio = total_debt / market_cap
+        sec_ratio  = total_cash / market_cap
+
+    # We use interest_expense as proxy for impermissible income
+    if total_revenue > 0 and interest_expense > 0:
+        haram_rev_ratio = interest_expense / total_revenue
+
+    return debt_ratio, sec_ratio, haram_rev_ratio
+
+
+FIN_PASS_REASON = "All financial ratios within AAOIFI limits"
+
+
+def _ratio_failures(debt_ratio, sec_ratio, haram_rev_ratio, thresholds: Thresholds) -> list:
+    """Reasons the ratios fail `thresholds`, in screening order (empty = pass)."""
+    debt_limit  = thresholds.max_debt_to_market_cap
+    sec_limit   = thresholds.max_interest_bearing_securities
+    haram_limit = thresholds.max_haram_revenue_ratio
+
+    failures = []
+    if debt_ratio is not None and debt_ratio > debt_limit:
+        failures.append(f"Debt/MktCap {debt_ratio:.1%} exceeds {debt_limit:.0%} limit")
+    if sec_ratio is not None and sec_ratio > sec_limit:
+        failures.append(f"Interest-bearing securities {sec_ratio:.1%} exceeds {sec_limit:.0%} limit")
+    if haram_rev_ratio is not None and haram_rev_ratio > haram_limit:
+        failures.append(f"Impermissible revenue {haram_rev_ratio:.1%} exceeds {haram_limit:.0%} limit")
+    return failures
+
+
 # ═══════════════════════════════════════════════════════════════
 #  SECTION 5: PURIFICATION CALCULATION
 #  Both AAOIFI provide purification %
@@ -476,31 +1438,69 @@ def calculate_purification(data: dict) -> dict:
     should donate to charity to purify their returns from any residual
     impermissible income — in accordance with AAOIFI Shariah principles.
     """
-    total_revenue    = data.get("total_revenue")    or 0
-    interest_expense = data.get("interest_expense", 0) or 0
-    dividend_yield   = data.get("dividend_yield",   0) or 0
-
-    if total_revenue > 0 and interest_expense > 0:
-        purification_pct = (interest_expense / total_revenue) * 100
-    else:
-        purification_pct = 0.0
+    haram_rev_ratio  = _financial_ratios(data)[2]
+    purification_pct = haram_rev_ratio * 100 if haram_rev_ratio is not None else 0.0
 
     return {
         "purification_pct": round(purification_pct, 4),
-        "explanation": (
+        "explanation":      _purification_note(purification_pct),
+    }
+
+
+def _purification_note(purification_pct: float) -> str:
+    if purification_pct > 0:
+        return (
             f"Donate {purification_pct:.3f}% of your returns from this stock "
             f"to charity to purify any residual impermissible income."
-        ) if purification_pct > 0 else "No purification required."
-    }
+        )
+    return "No purification required."
 
 
 # ═══════════════════════════════════════════════════════════════
 #  SECTION 6: MASTER SCREENING FUNCTION
 # ═══════════════════════════════════════════════════════════════
 
-def screen_stock(ticker: str) -> dict:
+def format_market_cap(mc) -> str:
+    """$3.01T / $912.40B / $850.00M, or N/A."""
+    if mc:
+        if mc >= 1e12:  return f"${mc/1e12:.2f}T"
+        elif mc >= 1e9: return f"${mc/1e9:.2f}B"
+        else:           return f"${mc/1e6:.2f}M"
+    return "N/A"
+
+
+METHODOLOGY = "AAOIFI Shariah Standard"
+
+# Sort order for portfolio results
+VERDICT_ORDER = {
+    "✅ COMPLIANT":    0,
+    "🟡 QUESTIONABLE": 1,
+    "❌ NON-COMPLIANT": 2,
+    "⚠️ ERROR":        3
+}
+
+
+def screen_stock(
+    ticker: str,
+    limiter: RateLimiter = None,
+    provider: MarketDataProvider = None,
+    cache: FundamentalsCache = None,
+    refresh: bool = False,
+    thresholds: Thresholds = None,
+    previous: dict = None,
+    compact: bool = False,
+    revalidate: bool = False,
+    on_revalidated=None,
+) -> dict:
     """
     Full halal screening pipeline for a single ticker.
+    `previous` is its result from an earlier run (see evaluate_stock).
+    compact=True returns a ScreenResult instead of a dict.
+
+    revalidate=True returns the verdict on recently expired cached data at
+    once — its timing says cache "revalidate" and gives `age_s` — while fresh
+    data is fetched in the background; `on_revalidated(result)` then gets
+    the new verdict, from a background thread (see fetch_stock_data).
 
     Overall rating (AAOIFI 3-tier system):
       ✅ COMPLIANT      — Passes both screens
@@ -509,19 +1509,100 @@ def screen_stock(ticker: str) -> dict:
     """
     logger.info(f"Screening {ticker}...")
 
-    data = fetch_stock_data(ticker)
+    evaluate = evaluate_record if compact else evaluate_stock
+    def revalidated(fresh: dict):
+        on_revalidated(evaluate(fresh, thresholds))
+
+    data = fetch_stock_data(
+        ticker, limiter=limiter, provider=provider, cache=cache, refresh=refresh,
+        revalidate=revalidate, on_revalidated=revalidated if on_revalidated else None,
+    )
+    return evaluate(data, thresholds, previous)
+
+
+# ── Input fingerprints ───────────────────────────────────────
+# What each half of a verdict depends on. The business half also covers the
+# keyword tables; the rest covers everything else evaluate_stock reads plus
+# the thresholds. A result's `fingerprint` is "<business>:<rest>".
+BUSINESS_INPUTS = ("sector", "industry", "description")
+FINANCIAL_INPUTS = (
+    "name", "country", "market_cap", "price", "pe_ratio", "dividend_yield",
+    "total_debt", "total_cash", "total_revenue", "interest_expense",
+)
+
+
+def _digest(values) -> str:
+    # 12 and 12.0 hash alike — cached JSON and live data differ on that
+    values = tuple(float(v) if isinstance(v, int) and not isinstance(v, bool) else v for v in values)
+    return hashlib.blake2b(repr(values).encode(), digest_size=8).hexdigest()
+
+
+@functools.lru_cache(maxsize=32)
+def _thresholds_digest(thresholds: Thresholds) -> str:
+    return _digest(thresholds.as_dict().values())
+
+
+def input_fingerprint(data: dict, thresholds: Thresholds = None) -> str:
+    """
+    Hash of everything a verdict for `data` depends on, as
+    "<business>:<financial>". Equal fingerprints ⇒ equal results.
+    """
+    keyword_matcher()
+    business  = _digest((_matcher_cache["digest"], *(data.get(f) for f in BUSINESS_INPUTS)))
+    financial = _digest((_thresholds_digest(Thresholds.coerce(thresholds)),
+                         *(data.get(f) for f in FINANCIAL_INPUTS)))
+    return f"{business}:{financial}"
+
+
+def _previous_business(previous: dict) -> dict:
+    """screen_business_activity output, rebuilt from an earlier result."""
+    return {
+        "verdict": previous["biz_verdict"],
+        "status":  previous["biz_status"],
+        "reason":  previous["biz_reason"],
+        "detail":  previous.get("biz_detail") or "",
+    }
+
+
+def evaluate_stock(data: dict, thresholds: Thresholds = None, previous: dict = None) -> dict:
+    """
+    Run both screens on already-fetched data (output of fetch_stock_data).
+    No network access — re-evaluating under new thresholds is instant.
+
+    previous — this ticker's result from an earlier run. If its fingerprint
+               matches, it is returned as-is; if only the business half
+               matches, its business verdict is reused and just the ratios
+               are recomputed.
+    """
+    ticker = data["ticker"]
     if "error" in data:
         return {
             "ticker":    ticker,
             "name":      ticker,
             "overall":   "⚠️ ERROR",
             "error":     data["error"],
-            "compliant": False
+            "compliant": False,
+            "timing":    dict(data.get("timing") or {}),
         }
 
-    biz_result   = screen_business_activity(data)
-    fin_result   = screen_financial_ratios(data)
+    t0          = time.perf_counter()
+    fingerprint = input_fingerprint(data, thresholds)
+    prior       = (previous or {}).get("fingerprint") or ""
+    reuse       = None
+    if prior and "error" not in previous:
+        if prior == fingerprint:
+            stages = {"evaluate_s": time.perf_counter() - t0}
+            METRICS.observe(stages)
+            return {**previous, "timing": {**(data.get("timing") or {}), **stages, "reuse": "full"}}
+        if prior.split(":")[0] == fingerprint.split(":")[0]:
+            reuse = "business"
+
+    biz_result   = _previous_business(previous) if reuse else screen_business_activity(data)
+    t1           = time.perf_counter()
+    fin_result   = screen_financial_ratios(data, thresholds)
+    t2           = time.perf_counter()
     purification = calculate_purification(data)
+    t3           = time.perf_counter()
 
     # ── Overall verdict ───────────────────────────────────────
     if biz_result["verdict"] == "fail" or fin_result["verdict"] == "fail":
@@ -534,18 +1615,11 @@ def screen_stock(ticker: str) -> dict:
         overall   = "✅ COMPLIANT"
         compliant = True
 
-    # Format market cap
-    mc = data.get("market_cap")
-    if mc:
-        if mc >= 1e12:  mc_str = f"${mc/1e12:.2f}T"
-        elif mc >= 1e9: mc_str = f"${mc/1e9:.2f}B"
-        else:           mc_str = f"${mc/1e6:.2f}M"
-    else:
-        mc_str = "N/A"
+    mc_str = format_market_cap(data.get("market_cap"))
 
     ratios = fin_result.get("ratios", {})
 
-    return {
+    result = {
         # Identity
         "ticker":             ticker,
         "name":               data.get("name", ticker),
@@ -582,42 +1656,843 @@ def screen_stock(ticker: str) -> dict:
         "purification_note":  purification["explanation"],
 
         # Metadata
-        "methodology":        "AAOIFI Shariah Standard",
+        "methodology":        METHODOLOGY,
         "screened_at":        datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "fingerprint":        fingerprint,
     }
 
+    stages = {
+        "business_s":     t1 - t0,
+        "financial_s":    t2 - t1,
+        "purification_s": t3 - t2,
+        "evaluate_s":     time.perf_counter() - t0,
+    }
+    METRICS.observe(stages)
+    result["timing"] = {**(data.get("timing") or {}), **stages}
+    if reuse:
+        result["timing"]["reuse"] = reuse
+    return result
 
-def screen_portfolio(tickers: list) -> list:
-    """Screen a list of tickers. Returns sorted results."""
-    results = []
-    for i, ticker in enumerate(tickers, 1):
-        print(f"  [{i:>2}/{len(tickers)}] {ticker.upper():<8}", end="\r")
-        results.append(screen_stock(ticker.upper().strip()))
-
-    order = {
-        "✅ COMPLIANT":    0,
-        "🟡 QUESTIONABLE": 1,
-        "❌ NON-COMPLIANT": 2,
-        "⚠️ ERROR":        3
+
+# ── Compact result records ───────────────────────────────────
+# evaluate_stock returns ~30 keys per ticker, most of them text. For large
+# runs, evaluate_record keeps only numbers and enum codes; the text is
+# rendered on access, with the same wording, from the same rule helpers.
+
+class Verdict(IntEnum):
+    """Overall (and per-screen) verdict; values follow VERDICT_ORDER."""
+    COMPLIANT     = 0
+    QUESTIONABLE  = 1
+    NON_COMPLIANT = 2
+    ERROR         = 3
+
+    @property
+    def label(self) -> str:
+        return _VERDICT_LABELS[self]
+
+
+_VERDICT_LABELS = {Verdict(v): label for label, v in VERDICT_ORDER.items()}
+
+# Per-screen verdict words used by the dict results
+_SCREEN_WORDS = {
+    Verdict.COMPLIANT:     "pass",
+    Verdict.QUESTIONABLE:  "questionable",
+    Verdict.NON_COMPLIANT: "fail",
+}
+_SCREEN_CODES = {word: code for code, word in _SCREEN_WORDS.items()}
+
+_COMPLIANT = {
+    Verdict.COMPLIANT:     True,
+    Verdict.QUESTIONABLE:  None,
+    Verdict.NON_COMPLIANT: False,
+    Verdict.ERROR:         False,
+}
+
+@dataclass(slots=True)
+class ScreenResult:
+    """
+    One ticker's screening result, compactly. Ratios are unrounded
+    fractions and screened_at is a Unix time. Supports the read side of
+    the dict interface (r["overall"], r.get(...), "error" in r) with the
+    same values as evaluate_stock; to_dict() gives that dict in full.
+    """
+
+    ticker:          str
+    name:            str      = None
+    sector:          str      = None
+    industry:        str      = None
+    country:         str      = None
+    market_cap:      float    = None
+    price:           float    = None
+    pe_ratio:        float    = None
+    dividend_yield:  float    = None    # fraction
+    overall:         Verdict  = Verdict.ERROR
+    biz_verdict:     Verdict  = None
+    biz_rule:        str      = None    # see _classify_business
+    biz_category:    str      = None
+    fin_verdict:     Verdict  = None
+    debt_ratio:      float    = None
+    sec_ratio:       float    = None
+    haram_rev_ratio: float    = None
+    thresholds:      Thresholds = None
+    screened_at:     float    = None
+    fingerprint:     str      = None
+    error:           str      = None
+    timing:          dict     = None
+
+    # ── Rendered fields ───────────────────────────────────────
+    def _business(self) -> dict:
+        return _business_result(_SCREEN_WORDS[self.biz_verdict], self.biz_rule, self.biz_category)
+
+    @property
+    def compliant(self):
+        return _COMPLIANT[self.overall]
+
+    @property
+    def purification_pct(self) -> float:
+        return self.haram_rev_ratio * 100 if self.haram_rev_ratio is not None else 0.0
+
+    @property
+    def fin_reason(self) -> str:
+        failures = _ratio_failures(self.debt_ratio, self.sec_ratio, self.haram_rev_ratio, self.thresholds)
+        return failures[0] if failures else FIN_PASS_REASON
+
+    def to_dict(self) -> dict:
+        """The evaluate_stock dict for this result."""
+        return {key: self[key] for key in self.keys()}
+
+    # ── Read-only dict interface ──────────────────────────────
+    def keys(self) -> list:
+        if self.error is not None:
+            return _ERROR_KEYS
+        return _RECORD_KEYS if self.timing is None else _RECORD_KEYS + ["timing"]
+
+    def __contains__(self, key) -> bool:
+        return key in self.keys()
+
+    def __getitem__(self, key: str):
+        if key not in self.keys():
+            raise KeyError(key)
+        render = _RENDERERS.get(key)
+        return render(self) if render else getattr(self, key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+_ERROR_KEYS  = ["ticker", "name", "overall", "error", "compliant", "timing"]
+_RECORD_KEYS = [
+    "ticker", "name", "sector", "industry", "country", "market_cap", "price",
+    "pe_ratio", "dividend_yield", "overall", "compliant",
+    "biz_verdict", "biz_status", "biz_reason", "biz_detail",
+    "fin_verdict", "fin_status", "fin_reason",
+    "debt_ratio_pct", "sec_ratio_pct", "haram_rev_pct",
+    "purification_pct", "purification_note",
+    "methodology", "screened_at", "fingerprint",
+]
+
+
+def _pct(ratio, digits: int):
+    return round(ratio * 100, digits) if ratio is not None else None
+
+
+# Dict key → its value rendered from a ScreenResult (other keys are attributes)
+_RENDERERS = {
+    "market_cap":        lambda r: format_market_cap(r.market_cap),
+    "dividend_yield":    lambda r: round((r.dividend_yield or 0) * 100, 2),
+    "overall":           lambda r: r.overall.label,
+    "biz_verdict":       lambda r: _SCREEN_WORDS[r.biz_verdict],
+    "biz_status":        lambda r: r._business()["status"],
+    "biz_reason":        lambda r: r._business()["reason"],
+    "biz_detail":        lambda r: r._business().get("detail", ""),
+    "fin_verdict":       lambda r: _SCREEN_WORDS[r.fin_verdict],
+    "fin_status":        lambda r: "✅ PASS" if r.fin_verdict == Verdict.COMPLIANT else "❌ FAIL",
+    "debt_ratio_pct":    lambda r: _pct(r.debt_ratio, 2),
+    "sec_ratio_pct":     lambda r: _pct(r.sec_ratio, 2),
+    "haram_rev_pct":     lambda r: round(r.purification_pct, 4),
+    "purification_pct":  lambda r: round(r.purification_pct, 4),
+    "purification_note": lambda r: _purification_note(r.purification_pct),
+    "methodology":       lambda r: METHODOLOGY,
+    "screened_at":       lambda r: datetime.fromtimestamp(r.screened_at).strftime("%Y-%m-%d %H:%M"),
+}
+
+
+def evaluate_record(data: dict, thresholds: Thresholds = None, previous: ScreenResult = None) -> ScreenResult:
+    """
+    evaluate_stock, returning a compact ScreenResult. `previous` is this
+    ticker's ScreenResult from an earlier run, reused the same way.
+    """
+    ticker = data["ticker"]
+    if "error" in data:
+        return ScreenResult(ticker, name=ticker, error=data["error"], timing=dict(data.get("timing") or {}))
+
+    thresholds  = Thresholds.coerce(thresholds)
+    t0          = time.perf_counter()
+    fingerprint = input_fingerprint(data, thresholds)
+    prior       = previous.fingerprint if isinstance(previous, ScreenResult) and previous.error is None else None
+    reuse       = None
+    if prior:
+        if prior == fingerprint:
+            stages = {"evaluate_s": time.perf_counter() - t0}
+            METRICS.observe(stages)
+            return replace(previous, timing={**(data.get("timing") or {}), **stages, "reuse": "full"})
+        if prior.split(":")[0] == fingerprint.split(":")[0]:
+            reuse = "business"
+
+    if reuse:
+        biz_verdict, biz_rule, biz_category = previous.biz_verdict, previous.biz_rule, previous.biz_category
+    else:
+        word, biz_rule, biz_category = _classify_business(*_business_text(data), keyword_matcher())
+        biz_verdict = _SCREEN_CODES[word]
+    t1 = time.perf_counter()
+
+    debt_ratio, sec_ratio, haram_rev_ratio = _financial_ratios(data)
+    fin_fail = bool(_ratio_failures(debt_ratio, sec_ratio, haram_rev_ratio, thresholds))
+    t2 = time.perf_counter()
+
+    if biz_verdict == Verdict.NON_COMPLIANT or fin_fail:
+        overall = Verdict.NON_COMPLIANT
+    else:
+        overall = biz_verdict
+
+    record = ScreenResult(
+        ticker,
+        name            = data.get("name", ticker),
+        sector          = data.get("sector", "N/A"),
+        industry        = data.get("industry", "N/A"),
+        country         = data.get("country", "N/A"),
+        market_cap      = data.get("market_cap"),
+        price           = data.get("price"),
+        pe_ratio        = data.get("pe_ratio"),
+        dividend_yield  = data.get("dividend_yield"),
+        overall         = overall,
+        biz_verdict     = biz_verdict,
+        biz_rule        = biz_rule,
+        biz_category    = biz_category,
+        fin_verdict     = Verdict.NON_COMPLIANT if fin_fail else Verdict.COMPLIANT,
+        debt_ratio      = debt_ratio,
+        sec_ratio       = sec_ratio,
+        haram_rev_ratio = haram_rev_ratio,
+        thresholds      = thresholds,
+        screened_at     = time.time(),
+        fingerprint     = fingerprint,
+    )
+
+    # Purification is derived from the ratios — nothing left to time
+    stages = {
+        "business_s":     t1 - t0,
+        "financial_s":    t2 - t1,
+        "purification_s": 0.0,
+        "evaluate_s":     time.perf_counter() - t0,
     }
-    results.sort(key=lambda x: order.get(x.get("overall", ""), 99))
+    METRICS.observe(stages)
+    record.timing = {**(data.get("timing") or {}), **stages}
+    if reuse:
+        record.timing["reuse"] = reuse
+    return record
+
+
+def _default_limiter(limiter: RateLimiter, provider: MarketDataProvider, workers: int) -> RateLimiter:
+    # Concurrent workers share a RATE_LIMIT bucket unless one is given —
+    # but only for providers that need pacing (jitter=None: recorded or
+    # simulated data, which should run as fast as the workers allow)
+    if limiter is None and workers > 1 and getattr(provider or DEFAULT_PROVIDER, "jitter", None) is not None:
+        return RateLimiter()
+    return limiter
+
+
+def _iter_concurrent(fn, tickers: list, workers: int, **kwargs):
+    """Yield fn(ticker, **kwargs) for each ticker, in completion order."""
+    if workers <= 1:
+        for ticker in tickers:
+            yield fn(ticker, **kwargs)
+        return
+
+    # Only a small window of tickers is in flight at a time, so finished
+    # results are not held on to — memory stays flat on 10k-ticker runs
+    pool      = ThreadPoolExecutor(max_workers=workers)
+    remaining = iter(tickers)
+    try:
+        pending = {pool.submit(fn, t, **kwargs) for t in itertools.islice(remaining, workers * 4)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for t in itertools.islice(remaining, len(done)):
+                pending.add(pool.submit(fn, t, **kwargs))
+            for fut in done:
+                yield fut.result()
+    finally:
+        # Consumer stopped early (or finished) — drop anything not yet started
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_fetch(
+    tickers: list,
+    workers: int = 1,
+    limiter: RateLimiter = None,
+    provider: MarketDataProvider = None,
+    cache: FundamentalsCache = None,
+    refresh: bool = False,
+    inflight: SingleFlight = None,
+    revalidate: bool = False,
+    on_revalidated=None,
+    breaker: CircuitBreaker = None,
+):
+    """
+    Yield fetch_stock_data output for each ticker as soon as it is ready
+    (completion order). Same concurrency rules as screen_portfolio.
+    Cached tickers with only stale prices are renewed in bulk first —
+    unless revalidate=True, which serves them at once and renews them in
+    the background instead; revalidate / on_revalidated / breaker work as
+    in fetch_stock_data.
+    """
+    tickers = [t.upper().strip() for t in tickers]
+    limiter = _default_limiter(limiter, provider, workers)
+    if not refresh and not revalidate:
+        refresh_quotes(tickers, limiter=limiter, provider=provider, cache=cache, breaker=breaker)
+    yield from _iter_concurrent(
+        fetch_stock_data, tickers, workers,
+        limiter=limiter, provider=provider, cache=cache, refresh=refresh, inflight=inflight,
+        revalidate=revalidate, on_revalidated=on_revalidated, breaker=breaker,
+    )
+
+
+def iter_screen_portfolio(
+    tickers: list,
+    workers: int = 1,
+    limiter: RateLimiter = None,
+    provider: MarketDataProvider = None,
+    cache: FundamentalsCache = None,
+    refresh: bool = False,
+    thresholds: Thresholds = None,
+    previous: list = None,
+    compact: bool = False,
+    revalidate: bool = False,
+    on_revalidated=None,
+):
+    """
+    Streaming screen_portfolio: yield each ticker's result the moment it
+    completes, instead of waiting for the whole batch. Results arrive in
+    completion order and are NOT sorted. revalidate / on_revalidated work
+    as in screen_stock (and skip the up-front bulk price refresh).
+    """
+    tickers = [t.upper().strip() for t in tickers]
+    prior   = results_by_ticker(previous)
+    limiter = _default_limiter(limiter, provider, workers)
+    if not refresh and not revalidate:
+        refresh_quotes(tickers, limiter=limiter, provider=provider, cache=cache)
+
+    def screen(ticker, **kwargs):
+        return screen_stock(ticker, previous=prior.get(ticker), **kwargs)
+
+    yield from _iter_concurrent(
+        screen, tickers, workers,
+        limiter=limiter, provider=provider, cache=cache, refresh=refresh,
+        thresholds=thresholds, compact=compact,
+        revalidate=revalidate, on_revalidated=on_revalidated,
+    )
+
+
+def screen_portfolio(
+    tickers: list,
+    workers: int = 1,
+    limiter: RateLimiter = None,
+    provider: MarketDataProvider = None,
+    cache: FundamentalsCache = None,
+    refresh: bool = False,
+    thresholds: Thresholds = None,
+    processes: int = 1,
+    previous: list = None,
+    compact: bool = False,
+) -> list:
+    """
+    Screen a list of tickers. Returns sorted results.
+
+    With workers > 1 the tickers are fetched on a thread pool. All workers
+    share one RateLimiter (a default one from RATE_LIMIT if none is given
+    and the provider needs pacing), so throughput is set by the limiter
+    instead of fixed sleeps.
+
+    thresholds — Thresholds applied to every ticker (default: AAOIFI).
+    processes  — > 1 evaluates on a process pool instead (see screener_pool);
+                 for CPU-bound re-screens of cached or recorded data.
+    previous   — results of an earlier run: tickers whose input fingerprint
+                 is unchanged are not re-evaluated. verdict_changes() diffs
+                 the two runs.
+    compact    — return ScreenResult records instead of dicts (a fraction
+                 of the memory for large runs; `previous` must match).
+    """
+    tickers = [t.upper().strip() for t in tickers]
+    if processes > 1:
+        from screener_pool import screen_universe
+        return screen_universe(
+            tickers, processes=processes, workers=workers, limiter=limiter,
+            provider=provider, cache=cache, refresh=refresh, thresholds=thresholds,
+            previous=previous, compact=compact,
+        )
+    stream  = iter_screen_portfolio(
+        tickers, workers=workers, limiter=limiter, provider=provider,
+        cache=cache, refresh=refresh, thresholds=thresholds, previous=previous,
+        compact=compact,
+    )
+
+    results = []
+    for i, r in enumerate(stream, 1):
+        print(f"  [{i:>2}/{len(tickers)}] {r['ticker']:<8}", end="\r")
+        results.append(r)
+    return sort_results(results, tickers)
+
+
+def sort_results(results: list, tickers: list) -> list:
+    """
+    Sort in place the way screen_portfolio reports: verdict first, then
+    input order — the same for any worker or process count.
+    """
+    position = {}
+    for i, t in enumerate(tickers):
+        position.setdefault(t, i)
+    results.sort(key=lambda x: (VERDICT_ORDER.get(x.get("overall", ""), 99), position[x["ticker"]]))
     return results
 
 
+def results_by_ticker(results) -> dict:
+    """{ticker: result} from a list of results (or such a mapping already)."""
+    if not results:
+        return {}
+    if isinstance(results, Mapping):
+        return dict(results)
+    return {r["ticker"]: r for r in results}
+
+
+# How a verdict moved between two runs, keyed by the new verdict
+_CHANGE_KINDS = {
+    "❌ NON-COMPLIANT": "newly non-compliant",
+    "🟡 QUESTIONABLE":  "newly questionable",
+    "⚠️ ERROR":         "newly failing",
+    "✅ COMPLIANT":     "newly compliant",
+}
+
+# Report order: losing compliance first
+CHANGE_ORDER = [*_CHANGE_KINDS.values(), "changed", "added", "dropped"]
+
+
+def verdict_changes(previous, results) -> list:
+    """
+    Tickers whose overall verdict differs between two runs, in CHANGE_ORDER:
+    [{ticker, name, change, before, after}, ...]. Tickers only in
+    `results` are "added", tickers only in `previous` are "dropped".
+    `results` may be a generator — it is consumed once and not kept.
+    """
+    before  = results_by_ticker(previous)       # popped as results arrive
+    if isinstance(results, Mapping):
+        results = results.values()
+    changes = []
+
+    def diff(ticker, old, new):
+        old_verdict = old.get("overall") if old else None
+        new_verdict = new.get("overall") if new else None
+        if old_verdict == new_verdict:
+            return
+        if old_verdict is None:
+            change = "added"
+        elif new_verdict is None:
+            change = "dropped"
+        else:
+            change = _CHANGE_KINDS.get(new_verdict, "changed")
+        changes.append({
+            "ticker": ticker,
+            "name":   (new or old).get("name", ticker),
+            "change": change,
+            "before": old_verdict,
+            "after":  new_verdict,
+        })
+
+    for r in results:
+        diff(r["ticker"], before.pop(r["ticker"], None), r)
+    for ticker, old in before.items():
+        diff(ticker, old, None)
+    changes.sort(key=lambda c: CHANGE_ORDER.index(c["change"]))
+    return changes
+
+
+def format_result_line(r: dict) -> str:
+    """One-line CLI summary of a screen_stock result."""
+    return (
+        f"{r['overall']:<22} {r['ticker']:<7} "
+        f"Debt:{r.get('debt_ratio_pct') or 'N/A':>6}% | "
+        f"Sec:{r.get('sec_ratio_pct') or 'N/A':>6}% | "
+        f"Purify:{r.get('purification_pct',0):.3f}%"
+    )
+
+
+# ═══════════════════════════════════════════════════════════════
+#  SECTION 7: VECTORIZED SCREENING
+#  Re-screen many already-fetched stocks at once (e.g. from the cache)
+# ═══════════════════════════════════════════════════════════════
+
+# Column order of screen_frame output — same fields as screen_stock
+RESULT_FIELDS = [
+    "ticker", "name", "sector", "industry", "country", "market_cap", "price",
+    "pe_ratio", "dividend_yield", "overall", "compliant",
+    "biz_verdict", "biz_status", "biz_reason", "biz_detail",
+    "fin_verdict", "fin_status", "fin_reason",
+    "debt_ratio_pct", "sec_ratio_pct", "haram_rev_pct",
+    "purification_pct", "purification_note",
+    "methodology", "screened_at", "fingerprint",
+]
+
+_BIZ_STATUS = {"fail": "❌ NON-COMPLIANT", "questionable": "🟡 QUESTIONABLE", "pass": "✅ PASS"}
+
+
+def screen_frame(df: "pd.DataFrame", thresholds: Thresholds = None, reasons: bool = False) -> "pd.DataFrame":
+    """
+    Screen a DataFrame of fetched stock data in one go — one row per ticker,
+    columns as returned by fetch_stock_data.
+
+    Financial ratios and purification are computed as column operations with
+    the same rules as the scalar path: missing debt / cash / revenue / interest
+    count as 0, and a missing or non-positive market cap skips the debt and
+    securities ratios (NaN). The business screen still runs per row, through
+    the compiled keyword matcher.
+
+    Returns the screen_stock fields (RESULT_FIELDS), one row per input row,
+    with the same input fingerprints as evaluate_stock.
+    The text columns — market_cap, biz_reason, biz_detail, fin_reason and
+    purification_note — are only built when reasons=True (None otherwise).
+    Rows with an `error` value come back as ⚠️ ERROR.
+    """
+    import numpy as np
+    import pandas as pd
+
+    thresholds = Thresholds.coerce(thresholds)
+    df = df.reset_index(drop=True)
+    n  = len(df)
+
+    def num(col, fill=None):
+        col = pd.to_numeric(df[col], errors="coerce") if col in df else pd.Series(np.nan, index=df.index)
+        return col.fillna(fill) if fill is not None else col
+
+    def text(col):
+        return df[col].where(df[col].notna(), "") if col in df else pd.Series("", index=df.index)
+
+    # ── Screen 2 — Financial ratios ───────────────────────────
+    market_cap       = num("market_cap")
+    total_debt       = num("total_debt",       0)
+    total_cash       = num("total_cash",       0)
+    total_revenue    = num("total_revenue",    0)
+    interest_expense = num("interest_expense", 0)
+
+    has_mc      = market_cap > 0
+    debt_ratio  = (total_debt / market_cap).where(has_mc)
+    sec_ratio   = (total_cash / market_cap).where(has_mc)
+    has_haram   = (total_revenue > 0) & (interest_expense > 0)
+    haram_ratio = (interest_expense / total_revenue).where(has_haram, 0.0)
+
+    debt_fail  = (debt_ratio  > thresholds.max_debt_to_market_cap).to_numpy()
+    sec_fail   = (sec_ratio   > thresholds.max_interest_bearing_securities).to_numpy()
+    haram_fail = (haram_ratio > thresholds.max_haram_revenue_ratio).to_numpy()
+    fin_fail   = debt_fail | sec_fail | haram_fail
+
+    # ── Screen 1 — Business activity ──────────────────────────
+    matcher = keyword_matcher()
+    biz = [
+        _classify_business(*_business_text({"sector": s, "industry": i, "description": d}), matcher)
+        for s, i, d in zip(text("sector").tolist(), text("industry").tolist(), text("description").tolist())
+    ]
+    biz_verdict = np.array([b[0] for b in biz], dtype=object)
+
+    # ── Overall verdict ───────────────────────────────────────
+    is_fail = (biz_verdict == "fail") | fin_fail
+    is_q    = ~is_fail & (biz_verdict == "questionable")
+    overall   = np.select([is_fail, is_q], ["❌ NON-COMPLIANT", "🟡 QUESTIONABLE"], "✅ COMPLIANT").astype(object)
+    compliant = np.select([is_fail, is_q], [False, None], True).astype(object)
+
+    out = pd.DataFrame({
+        "ticker":           df["ticker"] if "ticker" in df else pd.Series(None, index=df.index),
+        "name":             df["name"] if "name" in df else df.get("ticker"),
+        "sector":           df.get("sector"),
+        "industry":         df.get("industry"),
+        "country":          df.get("country"),
+        "market_cap":       None,
+        "price":            num("price"),
+        "pe_ratio":         num("pe_ratio"),
+        "dividend_yield":   (num("dividend_yield", 0) * 100).round(2),
+        "overall":          overall,
+        "compliant":        compliant,
+        "biz_verdict":      biz_verdict,
+        "biz_status":       [_BIZ_STATUS[v] for v in biz_verdict],
+        "biz_reason":       None,
+        "biz_detail":       None,
+        "fin_verdict":      np.where(fin_fail, "fail", "pass").astype(object),
+        "fin_status":       np.where(fin_fail, "❌ FAIL", "✅ PASS").astype(object),
+        "fin_reason":       None,
+        "debt_ratio_pct":   (debt_ratio  * 100).round(2),
+        "sec_ratio_pct":    (sec_ratio   * 100).round(2),
+        "haram_rev_pct":    (haram_ratio * 100).round(4),
+        "purification_pct": (haram_ratio * 100).round(4),
+        "purification_note": None,
+        "methodology":      METHODOLOGY,
+        "screened_at":      datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "fingerprint":      _frame_fingerprints(df, thresholds),
+    }, index=df.index)
+
+    # ── Text columns, only on request ─────────────────────────
+    if reasons:
+        out["market_cap"] = [format_market_cap(None if pd.isna(mc) else mc) for mc in market_cap]
+
+        biz_text = [_business_result(*b) for b in biz]
+        out["biz_reason"] = [b["reason"] for b in biz_text]
+        out["biz_detail"] = [b["detail"] for b in biz_text]
+
+        fin_reason = np.full(n, FIN_PASS_REASON, dtype=object)
+        for i in np.flatnonzero(fin_fail):
+            fin_reason[i] = _ratio_failures(
+                None if pd.isna(debt_ratio[i]) else debt_ratio[i],
+                None if pd.isna(sec_ratio[i]) else sec_ratio[i],
+                haram_ratio[i], thresholds,
+            )[0]
+        out["fin_reason"] = fin_reason
+
+        out["purification_note"] = [_purification_note(pct) for pct in haram_ratio * 100]
+
+    # ── Fetch errors ──────────────────────────────────────────
+    if "error" in df:
+        err = df["error"].notna().to_numpy()
+        if err.any():
+            out.loc[err, "name"]      = out.loc[err, "ticker"]
+            out.loc[err, "overall"]   = "⚠️ ERROR"
+            out.loc[err, "compliant"] = False
+            screen_cols = RESULT_FIELDS[RESULT_FIELDS.index("biz_verdict"):RESULT_FIELDS.index("methodology")]
+            out.loc[err, screen_cols]   = None
+            out.loc[err, "fingerprint"] = None
+            out["error"] = df["error"]
+
+    return out[RESULT_FIELDS + (["error"] if "error" in out else [])]
+
+
+def _frame_fingerprints(df: "pd.DataFrame", thresholds: Thresholds) -> list:
+    """input_fingerprint of every row, built column-wise."""
+    def values(col):
+        # Python scalars with None for missing, as in fetch_stock_data dicts
+        if col not in df:
+            return [None] * len(df)
+        return df[col].astype(object).where(df[col].notna(), None).tolist()
+
+    keyword_matcher()
+    keywords   = _matcher_cache["digest"]
+    thresholds = _thresholds_digest(thresholds)
+    business   = zip(*(values(f) for f in BUSINESS_INPUTS))
+    financial  = zip(*(values(f) for f in FINANCIAL_INPUTS))
+    return [
+        f"{_digest((keywords, *b))}:{_digest((thresholds, *f))}"
+        for b, f in zip(business, financial)
+    ]
+
+
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="🌙 Halal Stock Screener")
     parser.add_argument("--tickers", nargs="+")
+    parser.add_argument("--input",   metavar="PATH",
+                        help="Read tickers from a universe file (CSV with a ticker/symbol "
+                             "column, Parquet, or plain text)")
+    parser.add_argument("--output",  metavar="PATH",
+                        help="Stream results to a .csv, .jsonl or .parquet file "
+                             "(completion order, written in chunks)")
+    parser.add_argument("--format",  choices=["csv", "jsonl", "parquet"],
+                        help="Output format when --output has no recognised extension")
+    parser.add_argument("--chunk-size", type=int, default=500,
+                        help="Results buffered per --output write (default: 500)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Concurrent fetch workers (default: 1, sequential)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Evaluate on N processes — for CPU-bound re-screens of "
+                             "cached or --replay data; sorted report only (default: 1)")
+    parser.add_argument("--rps",     type=float, default=None,
+                        help="Starting request rate across all workers (default: the rate "
+                             f"learned last run, else {RATE_LIMIT['requests_per_sec']})")
+    parser.add_argument("--burst",   type=int, default=RATE_LIMIT["burst"],
+                        help="Requests allowed back-to-back before --rps applies")
+    parser.add_argument("--fixed-rate", action="store_true",
+                        help="Keep --rps fixed instead of adapting to throttling")
+    parser.add_argument("--cache",   default=DEFAULT_CACHE_PATH,
+                        help=f"Fundamentals cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always fetch from Yahoo Finance, never read or write the cache")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached data and re-fetch (cache is still updated)")
+    parser.add_argument("--replay",  metavar="PATH",
+                        help="Screen recorded info dicts (JSON/JSONL/Parquet/dir) offline")
+    parser.add_argument("--record",  metavar="PATH",
+                        help="Append every fetched info dict to a JSONL file for --replay")
+    parser.add_argument("--max-debt", type=float, default=THRESHOLDS.max_debt_to_market_cap * 100,
+                        help="Max debt / market cap, %% (default: AAOIFI 30)")
+    parser.add_argument("--max-securities", type=float,
+                        default=THRESHOLDS.max_interest_bearing_securities * 100,
+                        help="Max interest-bearing securities / market cap, %% (default: 30)")
+    parser.add_argument("--max-haram-revenue", type=float,
+                        default=THRESHOLDS.max_haram_revenue_ratio * 100,
+                        help="Max impermissible revenue, %% (default: 5)")
+    parser.add_argument("--previous", metavar="PATH",
+                        help="Results of an earlier --output run: unchanged tickers are not "
+                             "re-evaluated, and verdict changes are reported")
+    parser.add_argument("--diff", metavar="PATH",
+                        help="With --previous: also write the verdict changes to a CSV file")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Write stage timings and counters at exit "
+                             "(Prometheus text for .prom/.txt, JSON otherwise)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Print results as each ticker completes instead of sorted at the end")
+    parser.add_argument("--job",     metavar="ID",
+                        help="Run batch job ID (created from --tickers if new); "
+                             "re-run after a crash to resume where it stopped")
+    parser.add_argument("--job-status", metavar="ID",
+                        help="Print progress of batch job ID and exit")
+    parser.add_argument("--jobs-db", default=None,
+                        help="Batch job store (default: jobs/jobs.sqlite)")
+    parser.add_argument("--retry-errors", action="store_true",
+                        help="With --job: also re-fetch tickers that previously failed")
     args = parser.parse_args()
 
-    tickers = args.tickers or DEFAULT_TICKERS
-    results = screen_portfolio(tickers)
-
-    for r in results:
-        print(
-            f"{r['overall']:<22} {r['ticker']:<7} "
-            f"Debt:{r.get('debt_ratio_pct') or 'N/A':>6}% | "
-            f"Sec:{r.get('sec_ratio_pct') or 'N/A':>6}% | "
-            f"Purify:{r.get('purification_pct',0):.3f}%"
-        )
+    if args.processes > 1 and (args.output or args.stream or args.job):
+        parser.error("--processes only applies to the sorted report — "
+                     "not with --output, --stream or --job (use --workers)")
+    from screener_io import is_parquet, parquet_available
+    parquet = [p for p in (args.input, args.output, args.previous, args.replay) if p and is_parquet(p)]
+    if args.output and args.format == "parquet" and args.output not in parquet:
+        parquet.append(args.output)
+    if parquet and not parquet_available():
+        parser.error(f"{', '.join(parquet)}: Parquet needs pyarrow — pip install pyarrow")
+    init()
+
+    thresholds = Thresholds.from_percent(args.max_debt, args.max_securities, args.max_haram_revenue)
+
+    provider = FileProvider(args.replay) if args.replay else DEFAULT_PROVIDER
+    if args.tickers:
+        tickers = args.tickers
+    elif args.input:
+        from screener_io import read_universe
+        tickers = read_universe(args.input)
+    else:
+        tickers = provider.tickers() if args.replay else DEFAULT_TICKERS
+    if args.record:
+        provider = RecordingProvider(provider, args.record)
+
+    if args.replay:
+        # Recorded data needs no pacing unless a rate is asked for
+        limiter = RateLimiter(args.rps, args.burst) if args.rps and args.workers > 1 else None
+    elif args.fixed_rate:
+        limiter = RateLimiter(args.rps, args.burst) if args.workers > 1 else None
+    else:
+        # Learns the provider's limit, starting from the rate saved last run
+        limiter = AdaptiveRateLimiter(args.rps, args.burst, max_concurrency=max(args.workers, 1))
+    # Recorded data must not leak into the live-data cache
+    cache   = None if (args.no_cache or args.replay) else FundamentalsCache(args.cache)
+    previous = None
+    if args.previous:
+        from screener_io import read_results
+        previous = read_results(args.previous)
+    opts    = {
+        "workers": args.workers, "limiter": limiter, "provider": provider,
+        "cache": cache, "refresh": args.refresh, "thresholds": thresholds,
+        "previous": previous,
+    }
+    changes = None      # verdict changes since --previous
+
+    if args.job or args.job_status:
+        from screener_jobs import JobStore, run_job, DEFAULT_JOBS_PATH
+        store = JobStore(args.jobs_db or DEFAULT_JOBS_PATH)
+
+        if args.job_status:
+            for key, value in store.progress(args.job_status).items():
+                print(f"{key:<11} {value}")
+        else:
+            if not store.exists(args.job):
+                store.create(tickers, job_id=args.job)
+            progress = run_job(
+                store, args.job, workers=args.workers,
+                limiter=limiter or (None if args.replay else RateLimiter(args.rps, args.burst)),
+                provider=provider, cache=cache, retry_errors=args.retry_errors,
+            )
+            for r in store.results(args.job, thresholds):
+                print(format_result_line(r))
+            print(f"\nJob {args.job}: {progress['done']}/{progress['total']} screened, "
+                  f"{progress['errors']} error(s)")
+
+    elif args.output:
+        # Bulk mode — nothing is held in memory beyond one chunk
+        from screener_io import open_result_writer
+        counts = {}
+
+        def written():
+            for r in iter_screen_portfolio(tickers, **opts):
+                writer.write(r)
+                counts[r["overall"]] = counts.get(r["overall"], 0) + 1
+                if writer.count % args.chunk_size == 0:
+                    print(f"  {writer.count}/{len(tickers)} screened", flush=True)
+                yield r
+
+        with open_result_writer(args.output, args.format, args.chunk_size) as writer:
+            if previous is not None:
+                changes = verdict_changes(previous, written())
+            else:
+                for _ in written():
+                    pass
+        print(f"\nWrote {writer.count} results to {args.output}")
+        for verdict, n in sorted(counts.items(), key=lambda kv: VERDICT_ORDER.get(kv[0], 99)):
+            print(f"  {verdict:<22} {n}")
+
+    elif args.stream:
+        # Print each verdict as soon as it lands (completion order)
+        def printed():
+            for r in iter_screen_portfolio(tickers, **opts):
+                print(format_result_line(r), flush=True)
+                yield r
+
+        if previous is not None:
+            changes = verdict_changes(previous, printed())
+        else:
+            for _ in printed():
+                pass
+    else:
+        results = screen_portfolio(tickers, processes=args.processes, **opts)
+        for r in results:
+            print(format_result_line(r))
+        if previous is not None:
+            changes = verdict_changes(previous, results)
+
+    if changes is not None:
+        print(f"\nVerdict changes since {args.previous}: {len(changes)}")
+        for c in changes:
+            print(f"  {c['change']:<20} {c['ticker']:<7} {c['before']} → {c['after']}")
+        if args.diff:
+            import csv
+            with open(args.diff, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=["ticker", "name", "change", "before", "after"])
+                writer.writeheader()
+                writer.writerows(changes)
+            print(f"Verdict changes written to {args.diff}")
+
+    if cache is not None and not args.job_status:
+        stats = cache.stats()
+        print(f"\nCache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['entries']} tickers cached)")
+    if cache is not None:
+        cache.close()
+    if IN_FLIGHT.saved:
+        print(f"Coalesced: {IN_FLIGHT.saved} duplicate fetch(es) joined one already in flight")
+    if BREAKER.opened:
+        print(f"Circuit breaker opened {BREAKER.opened} time(s); "
+              f"{BREAKER.rejected} fetch(es) failed fast or were served stale")
+
+    if args.metrics:
+        METRICS.export(args.metrics)
+        print(f"Metrics written to {args.metrics}")
+
+    if isinstance(limiter, AdaptiveRateLimiter) and limiter.successes:
+        limiter.save_state()
+        print(f"Learned rate: {limiter.rate:.2f} req/s "
+              f"({limiter.throttles} throttle(s), saved to {limiter.state_path})")
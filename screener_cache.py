@@ -0,0 +1,343 @@
+"""
+🌙 Halal Stock Screener — Fundamentals Cache
+Persistent on-disk cache in front of `halal_screener.fetch_stock_data`.
+
+Fields are stored in groups, each with its own time-to-live:
+  quote         — price, market cap, valuation ratios       (hours)
+  fundamentals  — debt, cash, revenue, interest expense      (days)
+  profile       — name, sector, industry, description        (days)
+
+A ticker is a cache hit only when every group is still fresh; stale_groups()
+tells callers which groups to renew (e.g. quotes alone) and fetched_at()
+how old a ticker's data is; get_stale() serves expired data when nothing
+fresher can be fetched. Entries are
+evicted least-recently-used once the cache holds more than `max_entries`
+tickers. Hits update the LRU order in memory; it is written out with the
+next put(), every TOUCH_FLUSH_SIZE hits or TOUCH_FLUSH_AGE seconds, and on
+flush() / close().
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ─────────────────────────────────────────────
+#  CONFIGURATION
+# ─────────────────────────────────────────────
+
+FIELD_GROUPS = {
+    "quote": [
+        "price", "market_cap", "pe_ratio", "pb_ratio", "dividend_yield",
+    ],
+    "fundamentals": [
+        "total_debt", "total_cash", "total_revenue", "interest_expense",
+        "eps", "roe",
+    ],
+    "profile": [
+        "name", "sector", "industry", "description", "country",
+    ],
+}
+
+# Seconds each group stays fresh
+CACHE_TTLS = {
+    "quote":        12 * 3600,      # same-day re-screens reuse prices
+    "fundamentals": 3  * 86400,     # balance sheet changes at most quarterly
+    "profile":      7  * 86400,     # descriptions rarely change
+}
+
+DEFAULT_CACHE_PATH  = os.path.join("cache", "fundamentals.sqlite")
+DEFAULT_MAX_ENTRIES = 50_000      # room for a full-market universe
+
+# Buffered LRU touches are written once this many pile up, or this old
+TOUCH_FLUSH_SIZE = 1000
+TOUCH_FLUSH_AGE  = 60.0
+
+# Tickers per SELECT ... IN (...) — well under SQLite's bound-parameter limit
+_QUERY_BATCH = 500
+
+_FIELD_TO_GROUP = {
+    field: group for group, fields in FIELD_GROUPS.items() for field in fields
+}
+
+
+# Per-fetch bookkeeping that is never cached
+_SKIP_FIELDS = {"ticker", "timing"}
+
+
+def _group_of(field: str) -> str:
+    # Anything not listed explicitly is treated as slow-changing
+    return _FIELD_TO_GROUP.get(field, "fundamentals")
+
+
+# ─────────────────────────────────────────────
+#  CACHE
+# ─────────────────────────────────────────────
+
+class FundamentalsCache:
+    """
+    SQLite-backed cache of fetched stock data, keyed by ticker.
+
+    Safe to share between fetch worker threads. `stats()` reports hit,
+    miss, write and eviction counters for the lifetime of the object.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttls: dict = None,
+    ):
+        self.path        = path
+        self.max_entries = max_entries
+        self.ttls        = {**CACHE_TTLS, **(ttls or {})}
+
+        self.hits      = 0
+        self.misses    = 0
+        self.writes    = 0
+        self.evictions = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._touched       = {}        # ticker → last_used, not yet written
+        self._touched_since = None
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fields (
+                ticker      TEXT NOT NULL,
+                grp         TEXT NOT NULL,
+                payload     TEXT NOT NULL,
+                fetched_at  REAL NOT NULL,
+                PRIMARY KEY (ticker, grp)
+            );
+            CREATE TABLE IF NOT EXISTS access (
+                ticker      TEXT PRIMARY KEY,
+                last_used   REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS access_last_used ON access (last_used);
+        """)
+        self._conn.commit()
+
+    # ── Reads ─────────────────────────────────────────────────
+    def get(self, ticker: str) -> dict:
+        """Cached data for `ticker`, or None if missing or any group is stale."""
+        return self.get_many([ticker]).get(ticker)
+
+    def get_many(self, tickers: list, touch: bool = True) -> dict:
+        """
+        {ticker: data} for every ticker in `tickers` that is fully fresh —
+        batched queries, no write. touch=False leaves the LRU order alone,
+        so read-only callers (e.g. worker processes) never write at all.
+        """
+        now  = time.time()
+        rows = []
+        with self._lock:
+            unique = list(dict.fromkeys(tickers))
+            for i in range(0, len(unique), _QUERY_BATCH):
+                batch = unique[i:i + _QUERY_BATCH]
+                rows += self._conn.execute(
+                    "SELECT ticker, grp, payload, fetched_at FROM fields "
+                    f"WHERE ticker IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+
+            by_ticker = {}
+            for ticker, grp, payload, fetched_at in rows:
+                by_ticker.setdefault(ticker, []).append((grp, payload, fetched_at))
+
+            fresh = {}
+            for ticker in unique:
+                groups = {
+                    grp: payload for grp, payload, fetched_at in by_ticker.get(ticker, ())
+                    if now - fetched_at <= self.ttls.get(grp, 0)
+                }
+                if len(groups) == len(by_ticker.get(ticker, ())) and set(FIELD_GROUPS) <= set(groups):
+                    fresh[ticker] = groups
+
+            self.hits   += len(fresh)
+            self.misses += len(unique) - len(fresh)
+            if touch and fresh:
+                self._touch(fresh, now)
+
+        found = {}
+        for ticker, groups in fresh.items():
+            data = {"ticker": ticker}
+            for payload in groups.values():
+                data.update(json.loads(payload))
+            found[ticker] = data
+        return found
+
+    def get_stale(self, ticker: str) -> tuple:
+        """
+        (data, fetched_at of its oldest group) for `ticker` whatever its
+        age, or (None, None) when it has never been cached. For serving
+        something while the provider is unavailable; not counted as a
+        hit or miss.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload, fetched_at FROM fields WHERE ticker = ?", (ticker,)
+            ).fetchall()
+        if not rows:
+            return None, None
+        data = {"ticker": ticker}
+        for payload, _ in rows:
+            data.update(json.loads(payload))
+        return data, min(fetched_at for _, fetched_at in rows)
+
+    def stale_groups(self, tickers: list, within: float = 0.0) -> dict:
+        """
+        {ticker: set of groups that are missing or stale} for every ticker
+        in `tickers` not fully fresh. Not counted as hits or misses.
+        within — also count groups that go stale in the next `within` seconds.
+        """
+        now    = time.time() + within
+        unique = list(dict.fromkeys(tickers))
+        fresh  = {}
+        with self._lock:
+            for i in range(0, len(unique), _QUERY_BATCH):
+                batch = unique[i:i + _QUERY_BATCH]
+                for ticker, grp, fetched_at in self._conn.execute(
+                    "SELECT ticker, grp, fetched_at FROM fields "
+                    f"WHERE ticker IN ({','.join('?' * len(batch))})",
+                    batch
+                ):
+                    if now - fetched_at <= self.ttls.get(grp, 0):
+                        fresh.setdefault(ticker, set()).add(grp)
+
+        stale = {}
+        for ticker in unique:
+            groups = set(FIELD_GROUPS) - fresh.get(ticker, set())
+            if groups:
+                stale[ticker] = groups
+        return stale
+
+    def fetched_at(self, tickers: list) -> dict:
+        """
+        {ticker: epoch of its oldest cached group} for every cached ticker
+        in `tickers` — when its data was last fully current.
+        """
+        unique = list(dict.fromkeys(tickers))
+        oldest = {}
+        with self._lock:
+            for i in range(0, len(unique), _QUERY_BATCH):
+                batch = unique[i:i + _QUERY_BATCH]
+                oldest.update(self._conn.execute(
+                    "SELECT ticker, MIN(fetched_at) FROM fields "
+                    f"WHERE ticker IN ({','.join('?' * len(batch))}) GROUP BY ticker",
+                    batch
+                ).fetchall())
+        return oldest
+
+    def touch(self, tickers: list):
+        """Mark `tickers` as just used (LRU order)."""
+        with self._lock:
+            self._touch(tickers, time.time())
+
+    def _touch(self, tickers, now: float):
+        # Caller holds the lock. Buffered: one write per flush, not per hit
+        self._touched.update((t, now) for t in tickers)
+        if self._touched_since is None:
+            self._touched_since = now
+        if len(self._touched) >= TOUCH_FLUSH_SIZE or now - self._touched_since >= TOUCH_FLUSH_AGE:
+            self._flush_touches()
+            self._conn.commit()
+
+    def _flush_touches(self):
+        # Caller holds the lock and commits
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE access SET last_used = MAX(last_used, ?) WHERE ticker = ?",
+                [(now, t) for t, now in self._touched.items()]
+            )
+        self._touched       = {}
+        self._touched_since = None
+
+    def flush(self):
+        """Write buffered LRU touches now."""
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+
+    # ── Writes ────────────────────────────────────────────────
+    def put(self, ticker: str, data: dict):
+        """Store a successful fetch. Error results are never cached."""
+        if "error" in data:
+            return
+
+        groups = {}
+        for field, value in data.items():
+            if field not in _SKIP_FIELDS:
+                groups.setdefault(_group_of(field), {})[field] = value
+
+        now = time.time()
+        with self._lock:
+            self._touched.pop(ticker, None)
+            self._flush_touches()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO fields (ticker, grp, payload, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(ticker, grp, json.dumps(fields), now) for grp, fields in groups.items()]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO access (ticker, last_used) VALUES (?, ?)",
+                (ticker, now)
+            )
+            self.writes += 1
+            self._evict()
+            self._conn.commit()
+
+    def invalidate(self, ticker: str = None):
+        """Drop one ticker, or everything when `ticker` is None."""
+        with self._lock:
+            if ticker is None:
+                self._touched = {}
+                self._conn.execute("DELETE FROM fields")
+                self._conn.execute("DELETE FROM access")
+            else:
+                self._touched.pop(ticker, None)
+                self._conn.execute("DELETE FROM fields WHERE ticker = ?", (ticker,))
+                self._conn.execute("DELETE FROM access WHERE ticker = ?", (ticker,))
+            self._conn.commit()
+
+    def _evict(self):
+        # Caller holds the lock
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM access").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+
+        victims = [
+            row[0] for row in self._conn.execute(
+                "SELECT ticker FROM access ORDER BY last_used ASC LIMIT ?", (excess,)
+            )
+        ]
+        self._conn.executemany("DELETE FROM fields WHERE ticker = ?", [(t,) for t in victims])
+        self._conn.executemany("DELETE FROM access WHERE ticker = ?", [(t,) for t in victims])
+        self.evictions += len(victims)
+
+    # ── Housekeeping ──────────────────────────────────────────
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM access").fetchone()[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries":   len(self),
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "hit_rate":  round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes":    self.writes,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
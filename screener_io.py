@@ -0,0 +1,252 @@
+"""
+🌙 Halal Stock Screener — Bulk Input / Output
+Ticker universes in, screening results out, for large batch runs.
+
+  read_universe(path)                       — tickers from CSV / TXT / Parquet
+  open_result_writer(path, fmt, chunk_size) — streaming CSV / JSONL / Parquet
+  read_results(path)                        — a previous run's output, for
+                                              incremental re-screening
+
+Writers buffer `chunk_size` results and write them out together, so memory
+stays flat however many tickers are screened. Columns are RESULT_FIELDS
+(input `fingerprint` included) plus `error`, whatever order the results arrive in.
+"""
+
+import csv
+import json
+import os
+
+from halal_screener import RESULT_FIELDS
+
+# Output columns — every result is written with the same schema
+OUTPUT_FIELDS = RESULT_FIELDS + ["error"]
+
+# Numeric output columns (typed as float64 in Parquet)
+FLOAT_FIELDS = {
+    "price", "pe_ratio", "dividend_yield",
+    "debt_ratio_pct", "sec_ratio_pct", "haram_rev_pct", "purification_pct",
+}
+
+# Header names recognised as the ticker column of a CSV universe
+TICKER_COLUMNS = ("ticker", "symbol", "tickers", "symbols")
+
+OUTPUT_FORMATS     = ("csv", "jsonl", "parquet")
+DEFAULT_CHUNK_SIZE = 500
+
+
+# ─────────────────────────────────────────────
+#  INPUT
+# ─────────────────────────────────────────────
+
+def is_parquet(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def parquet_available() -> bool:
+    """Whether pyarrow, which every Parquet path here needs, is installed."""
+    import importlib.util
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def read_universe(path: str) -> list:
+    """
+    Tickers to screen, upper-cased, deduplicated, in file order.
+
+    Accepted layouts:
+      • .csv / .tsv  — a `ticker` or `symbol` column; otherwise the first column
+      • .parquet     — a `ticker` or `symbol` column (needs pandas + pyarrow)
+      • anything else — plain text, tickers separated by commas, spaces or
+                        newlines; `#` starts a comment
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext in (".csv", ".tsv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = [row for row in csv.reader(f, delimiter="\t" if ext == ".tsv" else ",") if row]
+        if not rows:
+            return []
+        header = [h.strip().lower() for h in rows[0]]
+        col    = next((header.index(c) for c in TICKER_COLUMNS if c in header), None)
+        if col is None:
+            tickers = [row[0] for row in rows]
+        else:
+            tickers = [row[col] for row in rows[1:] if len(row) > col]
+
+    elif ext == ".parquet":
+        import pandas as pd
+        df  = pd.read_parquet(path)
+        col = next((c for c in df.columns if str(c).lower() in TICKER_COLUMNS), None)
+        if col is None:
+            raise ValueError(f"{path} has no ticker/symbol column")
+        tickers = df[col].dropna().astype(str).tolist()
+
+    else:
+        with open(path, encoding="utf-8") as f:
+            text = "\n".join(line.split("#", 1)[0] for line in f)
+        tickers = text.replace(",", " ").split()
+
+    return list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+
+
+# ─────────────────────────────────────────────
+#  OUTPUT
+# ─────────────────────────────────────────────
+
+class _ChunkedWriter:
+    """Buffers results and hands them to `_write_chunk` `chunk_size` at a time."""
+
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.path       = path
+        self.chunk_size = max(1, chunk_size)
+        self.count      = 0
+        self._buffer    = []
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, result: dict):
+        self._buffer.append(result)
+        self.count += 1
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_chunk(self, rows: list):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class CsvResultWriter(_ChunkedWriter):
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(path, chunk_size)
+        self._file   = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def _write_chunk(self, rows: list):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class JsonlResultWriter(_ChunkedWriter):
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(path, chunk_size)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _write_chunk(self, rows: list):
+        self._file.write("".join(
+            json.dumps({f: r.get(f) for f in OUTPUT_FIELDS}, ensure_ascii=False, default=str) + "\n"
+            for r in rows
+        ))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+def _as_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None     # e.g. yfinance's "Infinity" P/E
+
+
+class ParquetResultWriter(_ChunkedWriter):
+    """One Parquet row group per chunk, with a fixed schema. Needs pyarrow."""
+
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+
+        super().__init__(path, chunk_size)
+        self._pa     = pa
+        self._schema = pa.schema([
+            (f, pa.float64() if f in FLOAT_FIELDS else pa.bool_() if f == "compliant" else pa.string())
+            for f in OUTPUT_FIELDS
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def _write_chunk(self, rows: list):
+        columns = {}
+        for f in OUTPUT_FIELDS:
+            values = [r.get(f) for r in rows]
+            if f in FLOAT_FIELDS:
+                values = [_as_float(v) for v in values]
+            elif f != "compliant":
+                values = [None if v is None else str(v) for v in values]
+            columns[f] = values
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def _close(self):
+        self._writer.close()
+
+
+_WRITERS = {
+    "csv":     CsvResultWriter,
+    "jsonl":   JsonlResultWriter,
+    "parquet": ParquetResultWriter,
+}
+
+
+def read_results(path: str) -> list:
+    """
+    Results written by open_result_writer, as dicts with their original
+    types (CSV cells are converted back; empty cells are dropped).
+    """
+    fmt = os.path.splitext(path)[1].lower().lstrip(".")
+    fmt = {"ndjson": "jsonl", "pq": "parquet"}.get(fmt, fmt)
+
+    if fmt == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet input needs pyarrow: pip install pyarrow") from e
+        rows = pq.read_table(path).to_pylist()
+    elif fmt == "csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            for field in FLOAT_FIELDS:
+                row[field] = _as_float(row.get(field) or None)
+            row["compliant"] = {"True": True, "False": False}.get(row.get("compliant"))
+    else:
+        raise ValueError(f"Unknown results format {fmt!r} — use one of {', '.join(OUTPUT_FORMATS)}")
+
+    # Absent, not None: `"error" in result` is how failures are told apart
+    return [{k: v for k, v in row.items() if v not in (None, "")} for row in rows]
+
+
+def open_result_writer(path: str, fmt: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Streaming writer for screening results. `fmt` defaults to the file
+    extension (.csv, .jsonl / .ndjson, .parquet). Use as a context manager.
+    """
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lower().lstrip(".")
+        fmt = {"ndjson": "jsonl", "pq": "parquet"}.get(ext, ext)
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown output format {fmt!r} — use one of {', '.join(OUTPUT_FORMATS)}")
+    return _WRITERS[fmt](path, chunk_size)
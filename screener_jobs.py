@@ -0,0 +1,292 @@
+"""
+🌙 Halal Stock Screener — Background Batch Jobs
+Screen full index universes (500–3000 names) outside the request thread.
+
+Every ticker's fetched data is written to disk the moment it lands, so a
+crash or restart resumes where it stopped: running a job again only
+fetches the tickers that are still pending. Tickers refused by an open
+circuit breaker stay pending too, and the job waits out the cooldown
+instead of finishing with them as errors. Verdicts are computed when
+results are read, under whatever thresholds the reader asks for.
+
+  store  = JobStore()
+  job_id = store.create(tickers)
+  start_job(store, job_id)              # background thread
+  store.progress(job_id)                # poll
+  store.results(job_id, thresholds)     # partial or final results
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import halal_screener
+from halal_screener import iter_fetch, evaluate_stock, CircuitBreaker, RateLimiter, VERDICT_ORDER
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS_PATH = os.path.join("jobs", "jobs.sqlite")
+
+# Shortest pause before re-trying tickers the breaker refused — its probe
+# may be held by another caller, when retry_in() is already 0
+MIN_BREAKER_WAIT = 1.0
+
+
+# ─────────────────────────────────────────────
+#  JOB STORE
+# ─────────────────────────────────────────────
+
+class JobStore:
+    """
+    SQLite store of batch jobs and per-ticker state.
+
+    Item status: pending → done | error. Job status: pending → running
+    (→ waiting while the circuit breaker is open) → done | cancelled |
+    failed. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOBS_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id          TEXT PRIMARY KEY,
+                status      TEXT NOT NULL,
+                created_at  REAL NOT NULL,
+                updated_at  REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                job_id      TEXT NOT NULL,
+                position    INTEGER NOT NULL,
+                ticker      TEXT NOT NULL,
+                status      TEXT NOT NULL,
+                data        TEXT,
+                updated_at  REAL,
+                PRIMARY KEY (job_id, ticker)
+            );
+            CREATE INDEX IF NOT EXISTS items_status ON items (job_id, status);
+        """)
+        self._conn.commit()
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+            return rows
+
+    # ── Jobs ──────────────────────────────────────────────────
+    def create(self, tickers: list, job_id: str = None) -> str:
+        """Register a new job for `tickers` (deduplicated, order kept)."""
+        job_id  = job_id or uuid.uuid4().hex[:12]
+        tickers = list(dict.fromkeys(t.upper().strip() for t in tickers if t.strip()))
+        now     = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, created_at, updated_at) VALUES (?, 'pending', ?, ?)",
+                (job_id, now, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO items (job_id, position, ticker, status) VALUES (?, ?, ?, 'pending')",
+                [(job_id, i, t) for i, t in enumerate(tickers)]
+            )
+            self._conn.commit()
+        return job_id
+
+    def exists(self, job_id: str) -> bool:
+        return bool(self._execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)))
+
+    def set_status(self, job_id: str, status: str):
+        self._execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+            (status, time.time(), job_id)
+        )
+
+    def list_jobs(self) -> list:
+        """Progress of every job, newest first."""
+        ids = self._execute("SELECT id FROM jobs ORDER BY created_at DESC")
+        return [self.progress(job_id) for (job_id,) in ids]
+
+    # ── Items ─────────────────────────────────────────────────
+    def pending(self, job_id: str, retry_errors: bool = False) -> list:
+        """Tickers still to fetch, in input order."""
+        statuses = ("pending", "error") if retry_errors else ("pending",)
+        rows = self._execute(
+            f"SELECT ticker FROM items WHERE job_id = ? AND status IN ({','.join('?' * len(statuses))}) "
+            "ORDER BY position",
+            (job_id, *statuses)
+        )
+        return [t for (t,) in rows]
+
+    def record(self, job_id: str, data: dict):
+        """Persist one ticker's fetch_stock_data output."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE items SET status = ?, data = ?, updated_at = ? WHERE job_id = ? AND ticker = ?",
+                ("error" if "error" in data else "done", json.dumps(data), now, job_id, data["ticker"])
+            )
+            self._conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (now, job_id))
+            self._conn.commit()
+
+    def progress(self, job_id: str) -> dict:
+        job = self._execute(
+            "SELECT status, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+        )
+        if not job:
+            raise KeyError(f"No such job: {job_id}")
+        status, created_at, updated_at = job[0]
+
+        counts = dict(self._execute(
+            "SELECT status, COUNT(*) FROM items WHERE job_id = ? GROUP BY status", (job_id,)
+        ))
+        total = sum(counts.values())
+        done  = counts.get("done", 0) + counts.get("error", 0)
+        return {
+            "job_id":     job_id,
+            "status":     status,
+            "total":      total,
+            "done":       done,
+            "errors":     counts.get("error", 0),
+            "pending":    counts.get("pending", 0),
+            "pct":        round(done / total * 100, 1) if total else 100.0,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def fundamentals(self, job_id: str) -> dict:
+        """{ticker: fetched data} for every finished ticker, in input order."""
+        rows = self._execute(
+            "SELECT ticker, data FROM items WHERE job_id = ? AND status != 'pending' ORDER BY position",
+            (job_id,)
+        )
+        return {t: json.loads(data) for t, data in rows}
+
+    def results(self, job_id: str, thresholds=None) -> list:
+        """Screening results so far (partial while running), sorted like screen_portfolio."""
+        results = [evaluate_stock(d, thresholds) for d in self.fundamentals(job_id).values()]
+        results.sort(key=lambda x: VERDICT_ORDER.get(x.get("overall", ""), 99))
+        return results
+
+
+# ─────────────────────────────────────────────
+#  RUNNER
+# ─────────────────────────────────────────────
+
+def run_job(
+    store: JobStore,
+    job_id: str,
+    workers: int = 4,
+    limiter: RateLimiter = None,
+    provider=None,
+    cache=None,
+    inflight=None,
+    retry_errors: bool = False,
+    stop_event: threading.Event = None,
+    breaker: CircuitBreaker = None,
+) -> dict:
+    """
+    Fetch every pending ticker of `job_id`, persisting each as it lands.
+    Blocks until done (or `stop_event` is set). Safe to call again after a
+    crash — only tickers without stored data are fetched. Tickers the
+    circuit breaker (default: BREAKER) refuses are left pending and tried
+    again once it lets requests through. Returns progress.
+    """
+    breaker = halal_screener.BREAKER if breaker is None else breaker
+    tickers = store.pending(job_id, retry_errors=retry_errors)
+    store.set_status(job_id, "running")
+
+    def cancelled() -> dict:
+        store.set_status(job_id, "cancelled")
+        logger.info(f"Job {job_id}: cancelled")
+        return store.progress(job_id)
+
+    while tickers:
+        logger.info(f"Job {job_id}: {len(tickers)} ticker(s) to fetch")
+        refused = 0
+        stream  = iter_fetch(
+            tickers, workers=workers, limiter=limiter, provider=provider, cache=cache,
+            inflight=inflight, breaker=breaker,
+        )
+        try:
+            for data in stream:
+                if "retry_in" in data:
+                    refused += 1        # never tried: stays pending
+                else:
+                    store.record(job_id, data)
+                if stop_event is not None and stop_event.is_set():
+                    return cancelled()
+        except Exception:
+            store.set_status(job_id, "failed")
+            logger.exception(f"Job {job_id}: failed")
+            raise
+        finally:
+            stream.close()
+
+        if not refused:
+            break
+        wait = max(breaker.retry_in(), MIN_BREAKER_WAIT)
+        store.set_status(job_id, "waiting")
+        logger.warning(f"Job {job_id}: {refused} ticker(s) refused by the open circuit breaker — "
+                       f"retrying in {wait:.0f}s")
+        if stop_event is not None:
+            if stop_event.wait(wait):
+                return cancelled()
+        else:
+            time.sleep(wait)
+        store.set_status(job_id, "running")
+        tickers = store.pending(job_id)
+
+    store.set_status(job_id, "done")
+    logger.info(f"Job {job_id}: done")
+    return store.progress(job_id)
+
+
+# Jobs running in this process: job_id → stop event
+_running      = {}
+_running_lock = threading.Lock()
+
+
+def start_job(store: JobStore, job_id: str, **kwargs) -> bool:
+    """
+    Run (or resume) a job on a daemon thread. Returns False if it is
+    already running in this process. kwargs are passed to run_job.
+    """
+    with _running_lock:
+        if job_id in _running:
+            return False
+        stop = threading.Event()
+        _running[job_id] = stop
+
+    def target():
+        try:
+            run_job(store, job_id, stop_event=stop, **kwargs)
+        except Exception:
+            pass    # already logged and recorded as "failed"
+        finally:
+            with _running_lock:
+                _running.pop(job_id, None)
+
+    threading.Thread(target=target, name=f"screen-job-{job_id}", daemon=True).start()
+    return True
+
+
+def is_running(job_id: str) -> bool:
+    with _running_lock:
+        return job_id in _running
+
+
+def cancel_job(job_id: str):
+    """Ask a running job to stop after the ticker in flight."""
+    with _running_lock:
+        stop = _running.get(job_id)
+    if stop is not None:
+        stop.set()
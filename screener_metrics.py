@@ -0,0 +1,168 @@
+"""
+🌙 Halal Stock Screener — Pipeline Metrics
+Where the time goes in a screening run.
+
+Every fetch_stock_data call and every evaluate_stock call attaches a
+`timing` record to what it returns:
+
+  cache          — "hit", "miss", "refresh" or "off"; "shared" when the
+                   caller waited for a concurrent fetch of the same ticker;
+                   "stale" when expired cached data was served because the
+                   circuit breaker is open; "revalidate" when it was served
+                   while a fresh copy is fetched in the background
+                   (revalidate=True); "not_found" for a symbol the
+                   provider recently reported as nonexistent
+  age_s          — age of the data, for "stale" and "revalidate" only
+  wait_s         — rate-limiter wait, or provider jitter sleep
+  provider_s     — time inside provider.get_info (all attempts)
+  backoff_s      — rate-limit backoff before retries
+  retries        — attempts beyond the first
+  rate_limited   — attempts that hit a rate limit
+  fetch_s        — whole fetch_stock_data call
+  business_s / financial_s / purification_s / evaluate_s — rule evaluation
+  reuse          — "full" or "business" when evaluate_stock reused part of
+                   a previous result (absent otherwise)
+
+Each "shared" record is a provider request saved by coalescing; snapshots
+total them as `saved`. Records are also aggregated process-wide in
+METRICS; summarize(results) aggregates just one batch. Both export as
+JSON or Prometheus text.
+"""
+
+import json
+import threading
+
+# Timed stages, in pipeline order
+STAGES = [
+    "wait", "provider", "backoff", "fetch",
+    "business", "financial", "purification", "evaluate",
+]
+
+CACHE_OUTCOMES = ["hit", "miss", "refresh", "off", "shared", "stale", "revalidate", "not_found"]
+
+PROMETHEUS_PREFIX = "halal_screener"
+
+
+def new_timing(cache: str) -> dict:
+    """Empty per-ticker fetch record."""
+    return {
+        "cache":        cache,
+        "wait_s":       0.0,
+        "provider_s":   0.0,
+        "backoff_s":    0.0,
+        "retries":      0,
+        "rate_limited": 0,
+        "fetch_s":      0.0,
+    }
+
+
+class PipelineMetrics:
+    """Thread-safe running totals of timing records."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.tickers      = dict.fromkeys(CACHE_OUTCOMES, 0)
+            self.errors       = 0
+            self.retries      = 0
+            self.rate_limited = 0
+            self.stage_count  = dict.fromkeys(STAGES, 0)
+            self.stage_total  = dict.fromkeys(STAGES, 0.0)
+            self.stage_max    = dict.fromkeys(STAGES, 0.0)
+
+    def observe(self, timing: dict, error: bool = False):
+        """Add one record (fetch part, evaluation part, or both)."""
+        with self._lock:
+            if "cache" in timing:
+                self.tickers[timing["cache"]] = self.tickers.get(timing["cache"], 0) + 1
+                self.errors       += bool(error)
+                self.retries      += timing.get("retries", 0)
+                self.rate_limited += timing.get("rate_limited", 0)
+
+            for stage in STAGES:
+                seconds = timing.get(f"{stage}_s")
+                if seconds is None:
+                    continue
+                self.stage_count[stage] += 1
+                self.stage_total[stage] += seconds
+                self.stage_max[stage]    = max(self.stage_max[stage], seconds)
+
+    # ── Exports ───────────────────────────────────────────────
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {
+                stage: {
+                    "count":   self.stage_count[stage],
+                    "total_s": round(self.stage_total[stage], 4),
+                    "mean_ms": round(self.stage_total[stage] / self.stage_count[stage] * 1000, 3)
+                               if self.stage_count[stage] else 0.0,
+                    "max_ms":  round(self.stage_max[stage] * 1000, 3),
+                }
+                for stage in STAGES
+            }
+            return {
+                "tickers":      dict(self.tickers),
+                "saved":        self.tickers.get("shared", 0),
+                "errors":       self.errors,
+                "retries":      self.retries,
+                "rate_limited": self.rate_limited,
+                "stages":       stages,
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        snap = self.snapshot()
+        p    = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {p}_tickers_total Tickers fetched, by cache outcome",
+            f"# TYPE {p}_tickers_total counter",
+            *[f'{p}_tickers_total{{cache="{k}"}} {v}' for k, v in snap["tickers"].items()],
+            f"# HELP {p}_fetches_saved_total Fetches avoided by joining one already in flight",
+            f"# TYPE {p}_fetches_saved_total counter",
+            f"{p}_fetches_saved_total {snap['saved']}",
+            f"# HELP {p}_fetch_errors_total Fetches that returned an error",
+            f"# TYPE {p}_fetch_errors_total counter",
+            f"{p}_fetch_errors_total {snap['errors']}",
+            f"# HELP {p}_retries_total Fetch attempts beyond the first",
+            f"# TYPE {p}_retries_total counter",
+            f"{p}_retries_total {snap['retries']}",
+            f"# HELP {p}_rate_limited_total Fetch attempts that hit a rate limit",
+            f"# TYPE {p}_rate_limited_total counter",
+            f"{p}_rate_limited_total {snap['rate_limited']}",
+            f"# HELP {p}_stage_seconds Time spent per pipeline stage",
+            f"# TYPE {p}_stage_seconds summary",
+        ]
+        for stage, s in snap["stages"].items():
+            lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {s["total_s"]}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+        lines += [
+            f"# HELP {p}_stage_seconds_max Slowest single call per pipeline stage",
+            f"# TYPE {p}_stage_seconds_max gauge",
+            *[f'{p}_stage_seconds_max{{stage="{stage}"}} {s["max_ms"] / 1000}'
+              for stage, s in snap["stages"].items()],
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str):
+        """Write the snapshot — Prometheus text for .prom / .txt, JSON otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+# Process-wide totals, fed by fetch_stock_data and evaluate_stock
+METRICS = PipelineMetrics()
+
+
+def summarize(results: list) -> PipelineMetrics:
+    """Aggregate the timing records of one batch of results."""
+    batch = PipelineMetrics()
+    for r in results:
+        if r.get("timing"):
+            batch.observe(r["timing"], error="error" in r)
+    return batch
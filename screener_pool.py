@@ -0,0 +1,189 @@
+"""
+🌙 Halal Stock Screener — Process Pool
+Multi-core re-screening for large universes whose data is already cached
+or recorded, where screening is pure CPU work and threads hit the GIL.
+
+The universe is split into shards, one task per shard:
+  • with an on-disk cache, each worker process reads its own shard straight
+    from SQLite (read-only) and evaluates it — only ticker names go out;
+  • everything else (cache misses, provider data) is fetched in the parent
+    as usual and shipped to the workers as compact tuples of the few
+    fields the screens read, not the full `info` dicts — a shard at a time
+    as fetches complete, so evaluation overlaps fetching.
+
+Results are merged and sorted exactly like screen_portfolio.
+
+  results = screen_universe(tickers, processes=32, cache=FundamentalsCache())
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from halal_screener import (
+    Thresholds, RateLimiter, evaluate_stock, evaluate_record, iter_fetch,
+    refresh_quotes, results_by_ticker, sort_results,
+)
+from screener_cache import FundamentalsCache
+from screener_metrics import METRICS, new_timing
+
+# Fields evaluate_stock reads — all a worker needs per ticker — plus the
+# fetch timing record so it survives the trip
+COMPACT_FIELDS = (
+    "ticker", "name", "sector", "industry", "description", "country",
+    "market_cap", "price", "total_debt", "total_cash", "total_revenue",
+    "interest_expense", "pe_ratio", "dividend_yield", "error", "timing",
+)
+
+# Timing keys recorded by evaluate_stock (inside the workers)
+_EVAL_TIMINGS = ("business_s", "financial_s", "purification_s", "evaluate_s")
+
+# Shard size bounds: big enough to amortise IPC, small enough to balance load
+MIN_SHARD = 64
+MAX_SHARD = 2000
+
+
+def pack(data: dict) -> tuple:
+    """fetch_stock_data output → tuple in COMPACT_FIELDS order."""
+    return tuple(data.get(f) for f in COMPACT_FIELDS)
+
+
+def unpack(record: tuple) -> dict:
+    """Inverse of pack(); absent fields stay absent."""
+    return {f: v for f, v in zip(COMPACT_FIELDS, record) if v is not None or f == "ticker"}
+
+
+def _shard_size(count: int, processes: int) -> int:
+    return min(MAX_SHARD, max(MIN_SHARD, math.ceil(count / (processes * 4))))
+
+
+def _shards(items: list, processes: int) -> list:
+    size = _shard_size(len(items), processes)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _batches(items, size: int):
+    # _shards for an iterator: yields each shard as soon as it fills
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ─────────────────────────────────────────────
+#  WORKER SIDE
+# ─────────────────────────────────────────────
+
+# Per-process state, set once by the pool initializer
+_worker = {}
+
+
+def _init_worker(cache_path: str, thresholds: dict, previous: dict, compact: bool):
+    _worker["cache"]      = FundamentalsCache(cache_path) if cache_path else None
+    _worker["thresholds"] = Thresholds.coerce(thresholds)
+    _worker["previous"]   = previous
+    _worker["evaluate"]   = evaluate_record if compact else evaluate_stock
+
+
+def _evaluate(data: dict):
+    return _worker["evaluate"](data, _worker["thresholds"], _worker["previous"].get(data["ticker"]))
+
+
+def _screen_cached_shard(tickers: list) -> tuple:
+    """Evaluate the cached part of a shard. Returns (results, missed tickers)."""
+    started = time.perf_counter()
+    found   = _worker["cache"].get_many(tickers, touch=False)
+    per_hit = (time.perf_counter() - started) / max(len(found), 1)
+
+    results, missed = [], []
+    for t in tickers:
+        data = found.get(t)
+        if data is None:
+            missed.append(t)
+            continue
+        timing = new_timing("hit")
+        timing["fetch_s"] = per_hit
+        results.append(_evaluate({**data, "timing": timing}))
+    return results, missed
+
+
+def _evaluate_shard(records: list) -> list:
+    return [_evaluate(unpack(r)) for r in records]
+
+
+# ─────────────────────────────────────────────
+#  PARENT SIDE
+# ─────────────────────────────────────────────
+
+def screen_universe(
+    tickers: list,
+    processes: int = None,
+    workers: int = 1,
+    limiter: RateLimiter = None,
+    provider=None,
+    cache: FundamentalsCache = None,
+    refresh: bool = False,
+    thresholds: Thresholds = None,
+    previous: list = None,
+    compact: bool = False,
+) -> list:
+    """
+    screen_portfolio on a process pool. Same arguments and the same sorted
+    output; `processes` defaults to the CPU count. Cache misses are fetched
+    in this process (threads, shared limiter) and handed to the workers a
+    shard at a time while the rest are still being fetched.
+    `previous` results are sent to every worker once, at start-up; with
+    compact=True the workers send back ScreenResult records.
+    """
+    processes  = processes or os.cpu_count() or 1
+    tickers    = [t.upper().strip() for t in tickers]
+    thresholds = Thresholds.coerce(thresholds)
+    shared     = cache is not None and not refresh and cache.path != ":memory:"
+
+    pool = ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(cache.path if shared else None, thresholds.as_dict(), results_by_ticker(previous), compact),
+    )
+    with pool:
+        cached, missed = [], tickers
+        if shared:
+            # Renew stale prices first, so those tickers are worker-side hits
+            refresh_quotes(tickers, limiter=limiter, provider=provider, cache=cache)
+            missed = []
+            for shard_results, shard_missed in pool.map(_screen_cached_shard, _shards(tickers, processes)):
+                cached += shard_results
+                missed += shard_missed
+            # Worker lookups are read-only: account for the hits here, in one
+            # batch (misses are counted again by fetch_stock_data below)
+            cache.hits += len(cached)
+            if cached:
+                cache.touch([r["ticker"] for r in cached])
+
+        evaluated = []
+        if missed:
+            fetched = (pack(d) for d in iter_fetch(
+                missed, workers=workers, limiter=limiter, provider=provider,
+                cache=cache, refresh=refresh,
+            ))
+            futures = [
+                pool.submit(_evaluate_shard, shard)
+                for shard in _batches(fetched, _shard_size(len(missed), processes))
+            ]
+            for future in futures:
+                evaluated += future.result()
+
+    # Workers record into their own copy of METRICS — fold their share in here
+    for r in cached + evaluated:
+        timing = r.get("timing") or {}
+        METRICS.observe({k: timing[k] for k in _EVAL_TIMINGS if k in timing})
+    for r in cached:
+        METRICS.observe({"cache": "hit", "fetch_s": r["timing"]["fetch_s"]})
+
+    results = cached + evaluated
+    return sort_results(results, tickers)
@@ -0,0 +1,357 @@
+"""
+🌙 Halal Stock Screener — Market Data Providers
+Sources of raw Yahoo-style `info` dicts for `halal_screener.fetch_stock_data`.
+
+  YahooProvider      — live data from Yahoo Finance (default): only the
+                       fields the screens read, prices batched per request
+  FileProvider       — replays recorded `info` dicts from JSON / JSONL /
+                       Parquet, or a directory of <TICKER>.json files
+  RecordingProvider  — wraps another provider and records what it returns,
+                       producing fixtures for FileProvider
+  SimulatedProvider  — wraps another provider and injects latency and 429s,
+                       for load-testing the fetch engine offline
+
+Any object with a `name`, a `jitter` attribute and a `get_info(ticker)`
+method can be passed as `provider=` to the screening functions. Providers
+that can also serve many tickers' quotes in one call implement
+`get_quotes(tickers)`; halal_screener.refresh_quotes uses it to renew
+cached prices without refetching fundamentals.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Protocol
+
+# `info` keys halal_screener.fetch_stock_data reads — everything else a
+# provider returns is dropped
+INFO_FIELDS = (
+    "longName", "sector", "industry", "longBusinessSummary", "country",
+    "marketCap", "currentPrice", "regularMarketPrice",
+    "totalDebt", "totalCash", "totalRevenue", "interestExpense",
+    "trailingPE", "priceToBook", "dividendYield", "trailingEps", "returnOnEquity",
+)
+
+# The fast-moving subset, served by get_quotes()
+QUOTE_FIELDS = (
+    "marketCap", "currentPrice", "regularMarketPrice",
+    "trailingPE", "priceToBook", "dividendYield",
+)
+
+
+class SymbolNotFound(KeyError):
+    """The source answered, and has no such ticker. Not worth retrying."""
+
+    def __str__(self) -> str:
+        # KeyError would quote the message
+        return str(self.args[0]) if self.args else ""
+
+
+def minimal_info(info: dict) -> dict:
+    """`info` cut down to INFO_FIELDS (missing and None values left out)."""
+    return {k: info[k] for k in INFO_FIELDS if info.get(k) is not None}
+
+
+# ─────────────────────────────────────────────
+#  PROTOCOL
+# ─────────────────────────────────────────────
+
+class MarketDataProvider(Protocol):
+    # Short label used in logs and reports
+    name: str
+
+    # (min, max) seconds to sleep before each request when no shared
+    # RateLimiter is in use, or None for sources that need no pacing
+    jitter: tuple
+
+    def get_info(self, ticker: str) -> dict:
+        """Raw `info` dict for one ticker. Raise on failure — SymbolNotFound
+        when the source does not know the ticker."""
+        ...
+
+    # Optional:
+    # def get_quotes(self, tickers: list) -> dict:
+    #     """{TICKER: info dict with QUOTE_FIELDS} for as many of `tickers`
+    #     as the source knows, in a single call. Raise on failure, or
+    #     NotImplementedError when the call is not supported."""
+
+
+# ─────────────────────────────────────────────
+#  YAHOO FINANCE
+# ─────────────────────────────────────────────
+
+_YAHOO_QUERY1 = "https://query1.finance.yahoo.com"
+_YAHOO_QUERY2 = "https://query2.finance.yahoo.com"
+
+# quoteSummary modules that between them hold every INFO_FIELDS key
+# (yfinance's `.info` asks for more, plus a second full quote request)
+_SUMMARY_MODULES = "price,summaryDetail,financialData,defaultKeyStatistics,assetProfile"
+
+# v7 quote field → info key. `dividendYield` is the forward yield, as in
+# summaryDetail and yfinance's classic `.info` — but the quote endpoint
+# reports it as a percentage, so get_quotes() scales it to a fraction.
+_QUOTE_KEYS = {
+    "marketCap":          "marketCap",
+    "regularMarketPrice": "regularMarketPrice",
+    "trailingPE":         "trailingPE",
+    "priceToBook":        "priceToBook",
+    "dividendYield":      "dividendYield",
+}
+
+
+def _raw(value):
+    # formatted=false still wraps a few values as {"raw": ..., "fmt": ...}
+    return value.get("raw") if isinstance(value, dict) else value
+
+
+class YahooProvider:
+    """
+    Live data from Yahoo Finance, through yfinance's session (cookies,
+    crumb, rate-limit errors) but only for the fields the screens read:
+
+      get_info    — one quoteSummary request, five modules
+      get_quotes  — one v7 quote request per `quote_batch` tickers
+    """
+
+    name        = "yahoo"
+    jitter      = (0.8, 1.5)    # stagger requests to avoid Yahoo rate limits
+    quote_batch = 50            # symbols per quote request
+
+    def _get_json(self, url: str, params: dict) -> dict:
+        # YfData is yfinance's internal session, not public API: if a
+        # release moves it, this raises NotImplementedError and callers
+        # fall back to the public Ticker.info (requirements pin the range)
+        try:
+            from yfinance.data import YfData      # heavy; only needed for live fetches
+            get_raw_json = YfData().get_raw_json
+        except (ImportError, AttributeError) as e:
+            raise NotImplementedError(f"yfinance has no raw JSON helper: {e}") from e
+        return get_raw_json(url, params=params)
+
+    def _get_info_public(self, ticker: str) -> dict:
+        """Fallback via yfinance's public `.info` (slower: more requests)."""
+        import yfinance as yf
+        info = yf.Ticker(ticker).info or {}
+        # Newer yfinance reports `.info["dividendYield"]` as a percentage;
+        # rebuild the forward fraction from the annual rate instead
+        rate  = info.get("dividendRate")
+        price = info.get("currentPrice") or info.get("regularMarketPrice")
+        info["dividendYield"] = rate / price if rate and price else None
+        if not info.get("longName") and not info.get("shortName") and not info.get("marketCap"):
+            raise ValueError("Empty response — possible rate limit")
+        return minimal_info(info)
+
+    def get_info(self, ticker: str) -> dict:
+        try:
+            payload = self._get_json(
+                f"{_YAHOO_QUERY2}/v10/finance/quoteSummary/{ticker}",
+                {"modules": _SUMMARY_MODULES, "formatted": "false", "symbol": ticker},
+            )
+        except NotImplementedError:
+            return self._get_info_public(ticker)
+        except Exception as e:
+            # Unknown symbols are a 404 with a "Not Found" error body
+            if getattr(getattr(e, "response", None), "status_code", None) == 404:
+                raise SymbolNotFound(f"{ticker} not found on Yahoo Finance") from e
+            raise
+        summary = payload.get("quoteSummary") or {}
+        result  = summary.get("result") or []
+        if not result and (summary.get("error") or {}).get("code") == "Not Found":
+            raise SymbolNotFound(f"{ticker} not found on Yahoo Finance")
+
+        modules = [m for m in (result[0] if result else {}).values() if isinstance(m, dict)]
+        if not modules:
+            # An answer with nothing in it is how Yahoo throttles silently;
+            # a sparse one (e.g. an ETF with no debt or revenue) is fine
+            raise ValueError("Empty response — possible rate limit")
+        merged = {}
+        for module in modules:
+            merged.update({k: _raw(v) for k, v in module.items()})
+        return minimal_info(merged)
+
+    def get_quotes(self, tickers: list) -> dict:
+        payload = self._get_json(
+            f"{_YAHOO_QUERY1}/v7/finance/quote",
+            {"symbols": ",".join(tickers), "fields": ",".join(_QUOTE_KEYS), "formatted": "false"},
+        )
+        quotes = {}
+        for row in (payload.get("quoteResponse") or {}).get("result") or []:
+            quote = {key: _raw(row.get(field)) for field, key in _QUOTE_KEYS.items()}
+            if quote["dividendYield"] is not None:
+                quote["dividendYield"] /= 100
+            quotes[str(row.get("symbol", "")).upper()] = {k: v for k, v in quote.items() if v is not None}
+        return quotes
+
+
+# ─────────────────────────────────────────────
+#  RECORDED DATA
+# ─────────────────────────────────────────────
+
+def _symbol_of(info: dict) -> str:
+    return str(info.get("symbol") or info.get("ticker") or "").upper()
+
+
+def load_recorded_infos(path: str) -> dict:
+    """
+    Load recorded `info` dicts keyed by upper-case ticker.
+
+    Accepted layouts:
+      • directory         — one <TICKER>.json file per ticker
+      • .json             — {ticker: info, ...} or [info, ...]
+      • .jsonl            — one info dict per line
+      • .parquet          — one row per ticker (needs pandas + pyarrow)
+    List, JSONL and Parquet records are keyed by their `symbol` field.
+    """
+    if os.path.isdir(path):
+        infos = {}
+        for fname in sorted(os.listdir(path)):
+            if fname.endswith(".json"):
+                with open(os.path.join(path, fname), encoding="utf-8") as f:
+                    infos[os.path.splitext(fname)[0].upper()] = json.load(f)
+        return infos
+
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".parquet":
+        import pandas as pd
+        df = pd.read_parquet(path)
+        records = df.astype(object).where(df.notna(), None).to_dict("records")
+    elif ext == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        if isinstance(payload, dict):
+            return {t.upper(): info for t, info in payload.items()}
+        records = payload
+
+    return {_symbol_of(info): info for info in records if _symbol_of(info)}
+
+
+class FileProvider:
+    """Replays recorded `info` dicts — no network, no pacing."""
+
+    name   = "file"
+    jitter = None
+
+    def __init__(self, path: str):
+        self.path   = path
+        self._infos = load_recorded_infos(path)
+
+    def __len__(self) -> int:
+        return len(self._infos)
+
+    def tickers(self) -> list:
+        return list(self._infos)
+
+    def get_info(self, ticker: str) -> dict:
+        info = self._infos.get(ticker.upper())
+        if info is None:
+            raise SymbolNotFound(f"{ticker} is not in recording {self.path}")
+        return dict(info)
+
+    def get_quotes(self, tickers: list) -> dict:
+        return {
+            t: {k: info[k] for k in QUOTE_FIELDS if info.get(k) is not None}
+            for t, info in ((t.upper(), self._infos.get(t.upper())) for t in tickers)
+            if info is not None
+        }
+
+
+class RecordingProvider:
+    """
+    Pass-through provider that appends every successful response to a
+    JSONL file, tagged with its `symbol`. Replay it with FileProvider.
+    """
+
+    def __init__(self, inner: MarketDataProvider, path: str):
+        self.inner  = inner
+        self.path   = path
+        self.name   = f"recording:{inner.name}"
+        self.jitter = inner.jitter
+        self._lock  = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def get_info(self, ticker: str) -> dict:
+        info = self.inner.get_info(ticker)
+        if info:
+            line = json.dumps({**info, "symbol": ticker.upper()}, default=str)
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        return info
+
+    def get_quotes(self, tickers: list) -> dict:
+        # Quotes are not recorded: replays serve them from the recorded infos
+        if not hasattr(self.inner, "get_quotes"):
+            raise NotImplementedError(f"{self.inner.name} has no batched quotes")
+        return self.inner.get_quotes(tickers)
+
+
+# ─────────────────────────────────────────────
+#  FAULT INJECTION
+# ─────────────────────────────────────────────
+
+class SimulatedProvider:
+    """
+    Wraps a provider with artificial latency and throttling.
+
+    latency        — (min, max) seconds added to every call
+    throttle_rate  — probability that a call fails with a 429 error
+    max_rate       — calls per second allowed over a sliding one-second
+                     window; calls beyond it fail with a 429 (None = no limit)
+    """
+
+    def __init__(
+        self,
+        inner: MarketDataProvider,
+        latency: tuple = (0.05, 0.3),
+        throttle_rate: float = 0.0,
+        max_rate: float = None,
+        seed: int = None,
+    ):
+        self.inner         = inner
+        self.name          = f"simulated:{inner.name}"
+        self.jitter        = None
+        self.latency       = latency
+        self.throttle_rate = throttle_rate
+        self.max_rate      = max_rate
+        self.calls         = 0
+        self.throttled     = 0
+        self._rng          = random.Random(seed)
+        self._lock         = threading.Lock()
+        self._recent       = deque()    # call times within the last second
+
+    def get_info(self, ticker: str) -> dict:
+        self._simulate()
+        return self.inner.get_info(ticker)
+
+    def get_quotes(self, tickers: list) -> dict:
+        # One batch is one request as far as latency and throttling go
+        if not hasattr(self.inner, "get_quotes"):
+            raise NotImplementedError(f"{self.inner.name} has no batched quotes")
+        self._simulate()
+        return self.inner.get_quotes(tickers)
+
+    def _simulate(self):
+        with self._lock:
+            self.calls += 1
+            delay    = self._rng.uniform(*self.latency)
+            throttle = self._rng.random() < self.throttle_rate
+
+            if self.max_rate is not None:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 1.0:
+                    self._recent.popleft()
+                throttle = throttle or len(self._recent) >= self.max_rate
+                self._recent.append(now)
+
+            if throttle:
+                self.throttled += 1
+
+        time.sleep(delay)
+        if throttle:
+            raise RuntimeError("429 Too Many Requests (simulated)")
@@ -0,0 +1,119 @@
+"""
+🌙 Halal Stock Screener — Results Table
+One screen's results held column-wise for the web UI.
+
+The DataFrame, the verdict groups (row positions per filter), the sort
+orders and the display table are all built once per result set. Filtering
+and sorting afterwards only intersects precomputed position arrays, so a
+rerun costs O(rows shown) however large the screen is.
+
+  table = ResultsTable(results)
+  table.counts["compliant"]
+  table.view("questionable", "debt")     # the result dicts, no copies
+  table.display                          # formatted Data Table frame
+"""
+
+import numpy as np
+import pandas as pd
+
+# Filter name → test on the `compliant` field (errors count as non-compliant)
+GROUPS = ("all", "compliant", "questionable", "non_compliant")
+
+# Sort name → column, and the value that rows without one sort as
+SORTS = {
+    "status": (None,             None),     # results arrive in verdict order
+    "ticker": ("ticker",         None),
+    "debt":   ("debt_ratio_pct", 999),
+    "sec":    ("sec_ratio_pct",  999),
+}
+
+
+def verdict_counts(results: list) -> dict:
+    """Result counts per group, for plain lists (e.g. while streaming)."""
+    counts = dict.fromkeys(GROUPS, 0)
+    counts["all"] = len(results)
+    for r in results:
+        c = r.get("compliant")
+        counts["compliant" if c is True else "questionable" if c is None else "non_compliant"] += 1
+    return counts
+
+
+def _fmt(value, suffix="%", decimals=1) -> str:
+    return "N/A" if value is None or value != value else f"{value:.{decimals}f}{suffix}"
+
+
+class ResultsTable:
+    """Immutable columnar view of a list of screen_stock results."""
+
+    def __init__(self, results: list):
+        self.results = results
+        self.frame   = pd.DataFrame.from_records(results) if results else pd.DataFrame()
+        n            = len(results)
+
+        compliant    = self._column("compliant")
+        self.groups  = {
+            "all":           np.arange(n),
+            "compliant":     np.flatnonzero(compliant.map(lambda c: c is True).to_numpy(bool)),
+            "questionable":  np.flatnonzero(compliant.isna().to_numpy()),
+            "non_compliant": np.flatnonzero(compliant.map(lambda c: c is False).to_numpy(bool)),
+        }
+        self.counts = {g: len(rows) for g, rows in self.groups.items()}
+
+        self._member = {}
+        for g, rows in self.groups.items():
+            mask       = np.zeros(n, dtype=bool)
+            mask[rows] = True
+            self._member[g] = mask
+
+        self.orders = {}
+        for name, (col, missing) in SORTS.items():
+            if col is None:
+                self.orders[name] = np.arange(n)
+                continue
+            values = self._column(col)
+            if missing is not None:
+                # Same keys as `x.get(col) or missing`: None, NaN and 0 sort last
+                values = pd.to_numeric(values, errors="coerce")
+                values = values.where(values.notna() & (values != 0), missing)
+            else:
+                values = values.fillna("").astype(str)
+            self.orders[name] = np.argsort(values.to_numpy(), kind="stable")
+
+        self._display = None
+
+    def _column(self, name: str) -> pd.Series:
+        if name in self.frame:
+            return self.frame[name]
+        return pd.Series([None] * len(self.results), dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def rows(self, group: str = "all", sort: str = "status") -> np.ndarray:
+        """Row positions in `group`, in `sort` order."""
+        order = self.orders[sort]
+        return order[self._member[group][order]]
+
+    def view(self, group: str = "all", sort: str = "status", start: int = 0, stop: int = None) -> list:
+        """The result dicts for rows(group, sort)[start:stop] — the originals, not copies."""
+        return [self.results[i] for i in self.rows(group, sort)[start:stop]]
+
+    @property
+    def display(self) -> pd.DataFrame:
+        """Formatted rows for the Data Table tab (errors left out), built on first use."""
+        if self._display is None:
+            ok = [r for r in self.results if r.get("overall") != "⚠️ ERROR"]
+            self._display = pd.DataFrame({
+                "Ticker":      [r.get("ticker") for r in ok],
+                "Company":     [(r.get("name") or "")[:32] for r in ok],
+                "Sector":      [(r.get("sector") or "")[:22] for r in ok],
+                "Price":       [f"${r['price']:.2f}" if r.get("price") else "N/A" for r in ok],
+                "Mkt Cap":     [r.get("market_cap", "N/A") for r in ok],
+                "Debt %":      [_fmt(r.get("debt_ratio_pct")) for r in ok],
+                "Int. Assets": [_fmt(r.get("sec_ratio_pct")) for r in ok],
+                "Haram Rev %": [_fmt(r.get("haram_rev_pct"), decimals=3) for r in ok],
+                "Purify %":    [f"{r['purification_pct']:.3f}%" if (r.get("purification_pct") or 0) > 0 else "—"
+                                for r in ok],
+                "Verdict":     [r.get("overall", "") for r in ok],
+            })
+        return self._display
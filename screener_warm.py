@@ -0,0 +1,167 @@
+"""
+🌙 Halal Stock Screener — Cache Pre-Warming
+Keeps known universes (DEFAULT_TICKERS and the web app's PRESETS) fresh in
+the fundamentals cache, so screening them is a cache hit instead of a
+round of Yahoo requests.
+
+Each pass renews only what goes stale before the next pass: quote-only
+staleness with batched quote requests, everything else with a full fetch.
+All requests go through a dedicated RateLimiter set to the warming budget,
+well below the interactive rate, and a dedicated CircuitBreaker: throttled
+warm requests pause warming, never the interactive screens.
+
+  warmer = Warmer(default_universe(), FundamentalsCache())
+  warmer.start()                        # background thread, one pass per interval
+  warmer.last_pass                      # stats of the latest pass
+
+  python screener_warm.py               # same, as a daemon
+  python screener_warm.py --once        # a single pass (e.g. from cron)
+"""
+
+import logging
+import threading
+import time
+
+from halal_screener import (
+    DEFAULT_TICKERS, PRESETS, CircuitBreaker, RateLimiter, iter_fetch, refresh_quotes,
+)
+from screener_cache import FundamentalsCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds between passes; a pass renews anything that would go stale before the next
+WARM_INTERVAL = 3600
+
+# Requests per second spent on warming — a quarter of RATE_LIMIT's default
+WARM_RATE = 0.5
+
+
+def default_universe() -> list:
+    """DEFAULT_TICKERS plus every preset's tickers, de-duplicated."""
+    tickers = list(DEFAULT_TICKERS)
+    for preset in PRESETS.values():
+        tickers += preset
+    return list(dict.fromkeys(tickers))
+
+
+class Warmer:
+    """
+    Periodically renews `tickers` in `cache` within a request budget.
+    A user screening a ticker the warmer is fetching waits for that fetch
+    (halal_screener.IN_FLIGHT) instead of starting another.
+    """
+
+    def __init__(
+        self,
+        tickers: list,
+        cache: FundamentalsCache,
+        interval: float = WARM_INTERVAL,
+        rate: float = WARM_RATE,
+        provider=None,
+    ):
+        self.tickers   = [t.upper().strip() for t in tickers]
+        self.cache     = cache
+        self.interval  = interval
+        self.limiter   = RateLimiter(rate, burst=1)
+        self.breaker   = CircuitBreaker()       # not the process-wide BREAKER
+        self.provider  = provider
+        self.last_pass = None
+
+        self._stop   = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> dict:
+        """One pass: renew whatever goes stale within the next interval."""
+        started = time.time()
+        # Looking further ahead than half the shortest TTL would renew
+        # freshly fetched groups on every pass
+        within  = min(self.interval, min(self.cache.ttls.values()) / 2)
+        quotes  = refresh_quotes(
+            self.tickers, limiter=self.limiter, provider=self.provider,
+            cache=self.cache, within=within, breaker=self.breaker,
+        )
+
+        # Anything still due after the quote refresh needs a full fetch
+        due    = list(self.cache.stale_groups(self.tickers, within=within))
+        errors = 0
+        for data in iter_fetch(
+            due, limiter=self.limiter, provider=self.provider, cache=self.cache,
+            refresh=True, breaker=self.breaker,
+        ):
+            errors += "error" in data
+            if self._stop.is_set():
+                break
+
+        self.last_pass = {
+            "started_at": started,
+            "tickers":    len(self.tickers),
+            "quotes":     quotes,
+            "fetched":    len(due),
+            "errors":     errors,
+            "took_s":     round(time.time() - started, 1),
+        }
+        logger.info(
+            f"Warm pass: {quotes} quote(s) renewed, {len(due)} ticker(s) fetched, "
+            f"{errors} error(s) in {self.last_pass['took_s']}s"
+        )
+        return self.last_pass
+
+    def run_forever(self):
+        """Pass, sleep `interval`, repeat — until stop()."""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Warm pass failed")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "Warmer":
+        """Run on a daemon thread (no-op if already running)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="cache-warmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop after the ticker in flight."""
+        self._stop.set()
+
+
+# ═══════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════
+if __name__ == "__main__":
+    import argparse
+    from halal_screener import init
+    from screener_cache import DEFAULT_CACHE_PATH
+
+    parser = argparse.ArgumentParser(description="🌙 Keep screening universes warm in the fundamentals cache")
+    parser.add_argument("--input",    metavar="PATH",
+                        help="Universe file to warm instead of DEFAULT_TICKERS + presets "
+                             "(.csv / .txt / .parquet, see screener_io)")
+    parser.add_argument("--cache",    default=DEFAULT_CACHE_PATH, help="Cache database path")
+    parser.add_argument("--interval", type=float, default=WARM_INTERVAL,
+                        help="Seconds between passes")
+    parser.add_argument("--rps",      type=float, default=WARM_RATE,
+                        help="Request budget for warming (requests per second)")
+    parser.add_argument("--once",     action="store_true", help="Run a single pass and exit")
+    args = parser.parse_args()
+    init()
+
+    if args.input:
+        from screener_io import read_universe
+        tickers = read_universe(args.input)
+    else:
+        tickers = default_universe()
+
+    warmer = Warmer(tickers, FundamentalsCache(args.cache), interval=args.interval, rate=args.rps)
+    print(f"Warming {len(warmer.tickers)} tickers into {args.cache} "
+          f"at {args.rps} req/s" + ("" if args.once else f", every {args.interval:.0f}s"))
+    if args.once:
+        print(warmer.run_once())
+    else:
+        try:
+            warmer.run_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,116 @@
+"""
+Shared fixtures: synthetic Yahoo-style `info` dicts, replayed through
+FileProvider (optionally wrapped in SimulatedProvider for latency and 429s).
+No test touches the network.
+"""
+
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import halal_screener as hs
+from screener_cache import FundamentalsCache
+from screener_providers import FileProvider, SimulatedProvider
+
+
+def make_info(symbol: str, **fields) -> dict:
+    """A clean, compliant technology company unless `fields` say otherwise."""
+    return {
+        "symbol":              symbol,
+        "longName":            f"{symbol} Corp",
+        "sector":              "Technology",
+        "industry":            "Software—Application",
+        "longBusinessSummary": "Develops productivity software for businesses.",
+        "country":             "United States",
+        "marketCap":           1_000_000_000,
+        "currentPrice":        100.0,
+        "totalDebt":           100_000_000,
+        "totalCash":           50_000_000,
+        "totalRevenue":        400_000_000,
+        "interestExpense":     -4_000_000,
+        "trailingPE":          25.0,
+        "priceToBook":         4.0,
+        "dividendYield":       0.01,
+        **fields,
+    }
+
+
+# One ticker per verdict path
+INFOS = [
+    make_info("CLEAN"),
+    make_info("DEBT",   totalDebt=600_000_000),
+    make_info("CASH",   totalCash=450_000_000),
+    make_info("HARAMR", interestExpense=-40_000_000),
+    make_info("BANK",   sector="Financial Services", industry="Banks—Regional",
+              longBusinessSummary="Provides retail banking and loans."),
+    make_info("CASINO", industry="Resorts & Casinos",
+              longBusinessSummary="Operates a casino and hotel resort."),
+    make_info("HOTEL",  sector="Consumer Cyclical", industry="Lodging",
+              longBusinessSummary="Owns and operates hotels."),
+    make_info("NOMC",   marketCap=None),
+]
+
+
+def random_infos(n: int, seed: int = 1) -> list:
+    """`n` varied info dicts, including missing, zero and negative values."""
+    rng   = random.Random(seed)
+    words = ["software", "beer", "hotel", "casino", "supermarket", "pharma", "chips", "insurance"]
+
+    def value(scale):
+        r = rng.random()
+        return None if r < 0.1 else 0 if r < 0.15 else rng.uniform(0, scale)
+
+    return [
+        make_info(
+            f"T{i:04d}",
+            sector=rng.choice(["Technology", "Financial Services", "Consumer Defensive", None]),
+            industry=rng.choice(["Software—Application", "Banks—Regional", "Gambling", "Grocery Stores"]),
+            longBusinessSummary=" ".join(rng.choice(words) for _ in range(rng.randint(0, 4))),
+            marketCap=rng.choice([None, 0, -5, rng.uniform(1e6, 3e12)]),
+            currentPrice=value(500),
+            totalDebt=value(1e11),
+            totalCash=value(1e11),
+            totalRevenue=value(1e11),
+            interestExpense=value(1e10),
+            trailingPE=value(60),
+            dividendYield=value(0.06),
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def fresh_process_state(monkeypatch):
+    """Process-wide breaker and not-found list, fresh for every test."""
+    monkeypatch.setattr(hs, "BREAKER",   hs.CircuitBreaker())
+    monkeypatch.setattr(hs, "NOT_FOUND", hs.NotFoundCache())
+
+
+@pytest.fixture
+def recording(tmp_path) -> str:
+    path = tmp_path / "infos.json"
+    path.write_text(json.dumps(INFOS), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def provider(recording) -> FileProvider:
+    return FileProvider(recording)
+
+
+@pytest.fixture
+def simulated(provider) -> SimulatedProvider:
+    """FileProvider behind a fixed 20ms latency, no throttling."""
+    return SimulatedProvider(provider, latency=(0.02, 0.02), seed=0)
+
+
+@pytest.fixture
+def cache(tmp_path) -> FundamentalsCache:
+    cache = FundamentalsCache(str(tmp_path / "fundamentals.sqlite"))
+    yield cache
+    cache.close()
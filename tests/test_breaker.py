@@ -0,0 +1,106 @@
+"""Circuit breaker and not-found cache around the provider."""
+
+import time
+
+import halal_screener as hs
+from screener_cache import FundamentalsCache
+from screener_providers import SimulatedProvider
+
+
+# ── CircuitBreaker ────────────────────────────────────────────
+
+def test_breaker_opens_after_threshold_and_probes_after_cooldown():
+    breaker = hs.CircuitBreaker(threshold=3, cooldown=0.05)
+    for _ in range(2):
+        breaker.on_throttle()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.on_throttle()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_in() > 0
+
+    time.sleep(0.06)
+    assert breaker.allow()                          # the single probe
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.on_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["opened"] == 1
+
+
+def test_breaker_reopens_when_probe_is_throttled():
+    breaker = hs.CircuitBreaker(threshold=1, cooldown=0.01)
+    breaker.on_throttle()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.on_throttle()
+    assert breaker.state == "open"
+    assert breaker.opened == 2
+
+
+def test_breaker_frees_probe_on_other_errors():
+    breaker = hs.CircuitBreaker(threshold=1, cooldown=0.01)
+    breaker.on_throttle()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.on_error()
+    assert breaker.allow()
+
+
+# ── NotFoundCache ─────────────────────────────────────────────
+
+def test_not_found_cache_expires_entries():
+    remembered = hs.NotFoundCache(ttl=60)
+    remembered.add(("file", "NOPE"))
+    assert ("file", "NOPE") in remembered
+    assert ("file", "AAPL") not in remembered
+
+    expired = hs.NotFoundCache(ttl=0)
+    expired.add(("file", "NOPE"))
+    assert ("file", "NOPE") not in expired
+    assert len(expired) == 0
+
+
+
+# ── fetch_stock_data ──────────────────────────────────────────
+
+def test_unknown_symbols_are_remembered(simulated):
+    first  = hs.fetch_stock_data("NOPE", provider=simulated)
+    second = hs.fetch_stock_data("NOPE", provider=simulated)
+
+    assert "not found" in first["error"]
+    assert second["timing"]["cache"] == "not_found"
+    assert simulated.calls == 1
+    assert hs.BREAKER.state == "closed"
+
+
+def test_throttling_opens_the_breaker_and_fails_fast(provider):
+    throttled = SimulatedProvider(provider, latency=(0, 0), throttle_rate=1.0, seed=0)
+    breaker   = hs.CircuitBreaker(threshold=2, cooldown=60)
+
+    results = [
+        hs.fetch_stock_data(t, max_retries=1, provider=throttled, breaker=breaker)
+        for t in ("CLEAN", "DEBT", "CASH", "BANK")
+    ]
+
+    assert throttled.calls == 2                     # the rest never reached the provider
+    assert breaker.state == "open"
+    assert all("error" in r for r in results)
+    assert "paused" in results[-1]["error"]
+    assert results[-1]["retry_in"] > 0             # refused, not tried
+
+
+def test_open_breaker_serves_stale_cached_data(provider, tmp_path):
+    cache = FundamentalsCache(str(tmp_path / "c.sqlite"), ttls={"quote": -1})
+    hs.fetch_stock_data("CLEAN", provider=provider, cache=cache)
+
+    breaker = hs.CircuitBreaker(threshold=1, cooldown=60)
+    breaker.on_throttle()
+    stale = hs.fetch_stock_data("CLEAN", provider=provider, cache=cache, breaker=breaker)
+
+    assert stale["timing"]["cache"] == "stale"
+    assert stale["timing"]["age_s"] >= 0
+    assert stale["name"] == "CLEAN Corp"
+    cache.close()
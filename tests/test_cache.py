@@ -0,0 +1,137 @@
+"""FundamentalsCache: per-group TTLs, stale reads and LRU eviction."""
+
+import time
+
+import halal_screener as hs
+from screener_cache import FIELD_GROUPS, FundamentalsCache
+
+
+def record(ticker: str, price: float = 10.0) -> dict:
+    return {
+        "ticker": ticker, "name": f"{ticker} Corp", "sector": "Technology",
+        "price": price, "market_cap": 1e9, "total_debt": 1e8, "total_revenue": 4e8,
+    }
+
+
+def test_put_then_get_round_trips(cache):
+    cache.put("AAPL", {**record("AAPL"), "timing": {"cache": "miss"}})
+    assert cache.get("AAPL") == record("AAPL")
+    assert cache.get("MSFT") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_errors_are_never_cached(cache):
+    cache.put("NOPE", {"ticker": "NOPE", "error": "not found"})
+    assert len(cache) == 0
+
+
+def test_expired_group_is_a_miss_but_still_readable_stale(tmp_path):
+    cache = FundamentalsCache(str(tmp_path / "c.sqlite"), ttls={"quote": -1})
+    cache.put("AAPL", record("AAPL"))
+
+    assert cache.get("AAPL") is None
+    assert cache.stale_groups(["AAPL", "MSFT"]) == {"AAPL": {"quote"}, "MSFT": set(FIELD_GROUPS)}
+
+    stale, fetched_at = cache.get_stale("AAPL")
+    assert stale == record("AAPL")
+    assert time.time() - fetched_at < 60
+    assert cache.get_stale("MSFT") == (None, None)
+    cache.close()
+
+
+def test_stale_groups_looks_ahead(cache):
+    cache.put("AAPL", record("AAPL"))
+    assert cache.stale_groups(["AAPL"]) == {}
+    assert cache.stale_groups(["AAPL"], within=cache.ttls["quote"] + 1) == {"AAPL": {"quote"}}
+
+
+def test_quote_only_put_renews_just_the_quote_group(tmp_path):
+    cache = FundamentalsCache(str(tmp_path / "c.sqlite"), ttls={"quote": -1})
+    cache.put("AAPL", record("AAPL"))
+    cache.ttls["quote"] = 3600
+    cache.put("AAPL", {"price": 12.0, "market_cap": 1.2e9})
+
+    assert cache.get("AAPL") == {**record("AAPL"), "price": 12.0, "market_cap": 1.2e9}
+    cache.close()
+
+
+def test_get_many_batches_lookups(cache):
+    for t in ("A", "B", "C"):
+        cache.put(t, record(t))
+    found = cache.get_many(["A", "B", "ZZZ", "A"])
+    assert sorted(found) == ["A", "B"]
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_ticker_is_evicted(tmp_path):
+    cache = FundamentalsCache(str(tmp_path / "c.sqlite"), max_entries=3)
+    for t in ("A", "B", "C"):
+        cache.put(t, record(t))
+        time.sleep(0.01)
+
+    assert cache.get("A") is not None               # A is now more recent than B
+    cache.put("D", record("D"))
+
+    assert len(cache) == 3
+    assert cache.get("B") is None
+    assert all(cache.get(t) is not None for t in ("A", "C", "D"))
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def test_buffered_touches_survive_close(tmp_path):
+    path  = str(tmp_path / "c.sqlite")
+    cache = FundamentalsCache(path, max_entries=2)
+    for t in ("A", "B"):
+        cache.put(t, record(t))
+        time.sleep(0.01)
+    cache.get("A")
+    cache.close()
+
+    reopened = FundamentalsCache(path, max_entries=2)
+    reopened.put("C", record("C"))
+    assert reopened.get("A") is not None
+    assert reopened.get("B") is None
+    reopened.close()
+
+
+def test_read_only_lookups_leave_lru_order_alone(tmp_path):
+    cache = FundamentalsCache(str(tmp_path / "c.sqlite"), max_entries=2)
+    for t in ("A", "B"):
+        cache.put(t, record(t))
+        time.sleep(0.01)
+
+    cache.get_many(["A"], touch=False)
+    cache.put("C", record("C"))
+    assert cache.get("A") is None
+    cache.close()
+
+
+def test_invalidate(cache):
+    for t in ("A", "B"):
+        cache.put(t, record(t))
+    cache.invalidate("A")
+    assert cache.get("A") is None and cache.get("B") is not None
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_fetched_at_reports_oldest_group(cache):
+    cache.put("A", record("A"))
+    before = time.time()
+    time.sleep(0.01)
+    cache.put("A", {"price": 11.0})
+
+    assert cache.fetched_at(["A", "B"])["A"] < before
+    assert "B" not in cache.fetched_at(["A", "B"])
+
+
+def test_fetch_uses_and_fills_the_cache(simulated, cache):
+    first  = hs.fetch_stock_data("CLEAN", provider=simulated, cache=cache)
+    second = hs.fetch_stock_data("CLEAN", provider=simulated, cache=cache)
+
+    assert simulated.calls == 1
+    assert first["timing"]["cache"] == "miss"
+    assert second["timing"]["cache"] == "hit"
+    assert {k: v for k, v in second.items() if k != "timing"} == \
+           {k: v for k, v in first.items() if k != "timing"}
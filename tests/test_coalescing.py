@@ -0,0 +1,76 @@
+"""Request coalescing: concurrent fetches of one ticker share a single call."""
+
+import threading
+
+import pytest
+
+import halal_screener as hs
+
+
+# ── SingleFlight ──────────────────────────────────────────────
+
+def _run_concurrently(n: int, fn) -> list:
+    results = [None] * n
+    def run(i):
+        results[i] = fn()
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    flight  = hs.SingleFlight()
+    calls   = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(1.0)
+        return "data"
+
+    threading.Timer(0.05, release.set).start()
+    results = _run_concurrently(6, lambda: flight.do("AAPL", slow))
+
+    assert len(calls) == 1
+    assert sorted(leader for _, leader in results) == [False] * 5 + [True]
+    assert {value for value, _ in results} == {"data"}
+    assert flight.stats() == {"in_flight": 0, "calls": 6, "saved": 5}
+
+
+def test_single_flight_shares_errors_and_forgets_finished_calls():
+    flight  = hs.SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(1.0)
+        raise ValueError("boom")
+
+    threading.Timer(0.05, release.set).start()
+    errors = _run_concurrently(3, lambda: pytest.raises(ValueError, flight.do, "X", failing))
+    assert len(errors) == 3
+
+    # Nothing is remembered: the next call runs again
+    assert flight.do("X", lambda: 1) == (1, True)
+
+
+# ── fetch_stock_data ──────────────────────────────────────────
+
+def test_concurrent_fetches_of_one_ticker_hit_the_provider_once(simulated):
+    inflight = hs.SingleFlight()
+    results  = _run_concurrently(
+        8, lambda: hs.fetch_stock_data("CLEAN", provider=simulated, inflight=inflight)
+    )
+
+    assert simulated.calls == 1
+    assert {r["name"] for r in results} == {"CLEAN Corp"}
+    assert sorted(r["timing"]["cache"] for r in results) == ["off"] + ["shared"] * 7
+
+
+def test_iter_fetch_of_duplicate_tickers_fetches_once(simulated):
+    fetched = list(hs.iter_fetch(["CLEAN"] * 6 + ["DEBT"], workers=7, provider=simulated))
+    assert len(fetched) == 7
+    assert {d["name"] for d in fetched if d["ticker"] == "CLEAN"} == {"CLEAN Corp"}
+    assert simulated.calls == 2
@@ -0,0 +1,56 @@
+"""Compact ScreenResult records behave like evaluate_stock dicts."""
+
+import math
+
+import pytest
+
+import halal_screener as hs
+from conftest import INFOS, random_infos
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+@pytest.mark.parametrize("thresholds", [None, hs.Thresholds.from_percent(20, 20, 2)])
+def test_compact_results_match_dict_results(thresholds):
+    records = [hs.normalize_info(i["symbol"], i) for i in INFOS + random_infos(300)]
+    records.append({"ticker": "ERR", "error": "boom"})
+    for record in records:
+        compact = hs.evaluate_record(record, thresholds)
+        full    = hs.evaluate_stock(record, thresholds)
+        assert set(compact.keys()) - {"timing"} == set(full) - {"timing"}
+        for field in full:
+            if field not in ("screened_at", "timing"):
+                assert _same(full[field], compact[field]), (record["ticker"], field)
+
+
+def test_compact_result_reads_like_a_dict():
+    record  = hs.evaluate_record(hs.normalize_info("CLEAN", INFOS[0]))
+    assert record["overall"] == "✅ COMPLIANT"
+    assert record.get("nope", "default") == "default"
+    assert "error" not in record
+    with pytest.raises(KeyError):
+        record["nope"]
+
+    error = hs.evaluate_record({"ticker": "ERR", "error": "boom"})
+    assert "error" in error and error["overall"] == "⚠️ ERROR"
+    assert error["compliant"] is False
+
+
+def test_compact_previous_is_reused_when_inputs_are_unchanged():
+    record   = hs.normalize_info("CLEAN", INFOS[0])
+    previous = hs.evaluate_record(record)
+    again    = hs.evaluate_record(record, previous=previous)
+    assert again.timing["reuse"] == "full"
+    assert again.screened_at == previous.screened_at
+
+
+def test_screen_portfolio_compact_matches_dicts(provider):
+    tickers = [i["symbol"] for i in INFOS] + ["NOPE"]
+    full    = hs.screen_portfolio(tickers, provider=provider)
+    compact = hs.screen_portfolio(tickers, provider=provider, compact=True)
+    assert [r["ticker"] for r in compact] == [r["ticker"] for r in full]
+    assert [r["overall"] for r in compact] == [r["overall"] for r in full]
@@ -0,0 +1,55 @@
+"""Report exports: the styled Excel workbook, CSV and their cache key."""
+
+import io
+import warnings
+
+import pytest
+
+import halal_screener as hs
+from conftest import INFOS
+
+pytest.importorskip("streamlit")
+openpyxl = pytest.importorskip("openpyxl")
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")     # Streamlit warns when imported outside `streamlit run`
+    import app
+
+
+@pytest.fixture
+def results(provider) -> list:
+    return hs.screen_portfolio([i["symbol"] for i in INFOS], provider=provider)
+
+
+def test_excel_has_every_row_and_column(results):
+    ws   = openpyxl.load_workbook(io.BytesIO(app.to_excel_bytes(results))).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert list(rows[0]) == [header for header, _ in app.EXCEL_COLUMNS]
+    assert [row[0] for row in rows[1:]] == [r["ticker"] for r in results]
+
+
+def test_excel_rows_are_coloured_by_verdict(results):
+    ws    = openpyxl.load_workbook(io.BytesIO(app.to_excel_bytes(results))).active
+    fills = {"✅ COMPLIANT": "E8F5E9", "🟡 QUESTIONABLE": "FFF9E6", "❌ NON-COMPLIANT": "FFEBEE"}
+    verdict_col = [key for _, key in app.EXCEL_COLUMNS].index("overall") + 1
+
+    assert ws.cell(1, 1).font.b
+    for row in range(2, len(results) + 2):
+        verdict = ws.cell(row, verdict_col).value
+        assert ws.cell(row, 1).fill.fgColor.rgb.endswith(fills.get(verdict, "FFEBEE"))
+
+
+def test_excel_of_no_results_is_just_the_header():
+    ws = openpyxl.load_workbook(io.BytesIO(app.to_excel_bytes([]))).active
+    assert ws.max_row == 1
+
+
+def test_csv_has_one_line_per_result(results):
+    lines = app.to_csv(results).splitlines()
+    assert lines[0].startswith("Ticker,Company,Sector")
+    assert [line.split(",")[0] for line in lines[1:]] == [r["ticker"] for r in results]
+
+
+def test_fingerprint_follows_content(results):
+    assert app.results_fingerprint(results) == app.results_fingerprint([dict(r) for r in results])
+    assert app.results_fingerprint(results) != app.results_fingerprint(results[:-1])
@@ -0,0 +1,42 @@
+"""screen_frame gives the same results as evaluate_stock, row for row."""
+
+import math
+
+import pytest
+
+import halal_screener as hs
+from conftest import INFOS, random_infos
+
+pd = pytest.importorskip("pandas")
+
+
+def same(a, b) -> bool:
+    if isinstance(b, float) and math.isnan(b):
+        b = None
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+@pytest.mark.parametrize("thresholds", [None, hs.Thresholds.from_percent(33, 33, 5)])
+def test_screen_frame_matches_evaluate_stock(thresholds):
+    records = [hs.normalize_info(i["symbol"], i) for i in INFOS + random_infos(400)]
+    records.append({"ticker": "ERR", "error": "boom"})
+
+    frame = hs.screen_frame(pd.DataFrame(records), thresholds, reasons=True)
+    assert list(frame.columns) == hs.RESULT_FIELDS + ["error"]
+
+    for record, (_, row) in zip(records, frame.iterrows()):
+        expected = hs.evaluate_stock(record, thresholds)
+        for field, value in expected.items():
+            if field in ("timing", "screened_at"):
+                continue
+            assert same(value, row[field]), (record["ticker"], field, value, row[field])
+
+
+def test_screen_frame_without_reasons_skips_text_columns():
+    records = [hs.normalize_info(i["symbol"], i) for i in INFOS]
+    frame   = hs.screen_frame(pd.DataFrame(records))
+    assert frame["fin_reason"].isna().all()
+    assert frame["overall"].tolist() == [hs.evaluate_stock(r)["overall"] for r in records]
+    assert frame["fingerprint"].tolist() == [hs.input_fingerprint(r) for r in records]
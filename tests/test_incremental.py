@@ -0,0 +1,99 @@
+"""Input fingerprints, incremental re-screens and verdict diffs between runs."""
+
+import halal_screener as hs
+from conftest import INFOS
+from screener_io import open_result_writer, read_results
+
+
+# ── Fingerprints and incremental re-screens ───────────────────
+
+def clean_record(**changes) -> dict:
+    return {**hs.normalize_info("CLEAN", INFOS[0]), **changes}
+
+
+def test_unchanged_inputs_reuse_the_previous_result():
+    previous = hs.evaluate_stock(clean_record())
+    again    = hs.evaluate_stock(clean_record(), previous=previous)
+    assert again["timing"]["reuse"] == "full"
+    assert again["screened_at"] == previous["screened_at"]
+
+
+def test_financial_change_reuses_only_the_business_screen():
+    previous = hs.evaluate_stock(clean_record())
+    moved    = hs.evaluate_stock(clean_record(total_debt=900_000_000), previous=previous)
+    assert moved["timing"]["reuse"] == "business"
+    assert moved["overall"] == "❌ NON-COMPLIANT"
+
+    stricter = hs.evaluate_stock(clean_record(), hs.Thresholds.from_percent(5, 33, 5), previous=previous)
+    assert stricter["timing"]["reuse"] == "business"
+    assert stricter["overall"] == "❌ NON-COMPLIANT"
+
+
+def test_business_change_is_re_screened():
+    previous = hs.evaluate_stock(clean_record())
+    changed  = hs.evaluate_stock(clean_record(description="operates a casino"), previous=previous)
+    assert "reuse" not in changed["timing"]
+    assert changed["biz_verdict"] == "fail"
+
+
+def test_fingerprint_ignores_int_float_differences():
+    assert hs.input_fingerprint(clean_record(market_cap=1_000_000_000)) == \
+           hs.input_fingerprint(clean_record(market_cap=1e9))
+
+
+def test_verdict_changes_lists_moves_in_report_order():
+    before = [
+        {"ticker": "A", "name": "A", "overall": "✅ COMPLIANT"},
+        {"ticker": "B", "name": "B", "overall": "🟡 QUESTIONABLE"},
+        {"ticker": "C", "name": "C", "overall": "❌ NON-COMPLIANT"},
+        {"ticker": "D", "name": "D", "overall": "✅ COMPLIANT"},
+    ]
+    after = [
+        {"ticker": "A", "name": "A", "overall": "✅ COMPLIANT"},
+        {"ticker": "B", "name": "B", "overall": "✅ COMPLIANT"},
+        {"ticker": "C", "name": "C", "overall": "⚠️ ERROR"},
+        {"ticker": "E", "name": "E", "overall": "🟡 QUESTIONABLE"},
+        {"ticker": "D", "name": "D", "overall": "❌ NON-COMPLIANT"},
+    ]
+    changes = hs.verdict_changes(before, after)
+    assert [(c["ticker"], c["change"]) for c in changes] == [
+        ("D", "newly non-compliant"),
+        ("C", "newly failing"),
+        ("B", "newly compliant"),
+        ("E", "added"),
+    ]
+
+
+def test_verdict_changes_reports_dropped_tickers_and_takes_a_generator():
+    before  = [{"ticker": "A", "name": "A", "overall": "✅ COMPLIANT"},
+               {"ticker": "B", "name": "B", "overall": "✅ COMPLIANT"}]
+    after   = ({"ticker": t, "name": t, "overall": "✅ COMPLIANT"} for t in ["B"])
+    changes = hs.verdict_changes(before, after)
+    assert changes == [{"ticker": "A", "name": "A", "change": "dropped",
+                        "before": "✅ COMPLIANT", "after": None}]
+    assert len(before) == 2                         # the previous run is not modified
+
+
+def test_screen_portfolio_with_previous_skips_unchanged_tickers(provider):
+    tickers  = [i["symbol"] for i in INFOS]
+    previous = hs.screen_portfolio(tickers, provider=provider)
+    again    = hs.screen_portfolio(tickers, provider=provider, previous=previous)
+
+    assert {r["timing"].get("reuse") for r in again} == {"full"}
+    assert hs.verdict_changes(previous, again) == []
+
+
+def test_read_back_results_drive_incremental_re_screens(provider, tmp_path):
+    tickers = [i["symbol"] for i in INFOS] + ["NOPE"]
+    results = hs.screen_portfolio(tickers, provider=provider)
+    path    = str(tmp_path / "results.csv")
+    with open_result_writer(path) as writer:
+        for r in results:
+            writer.write(r)
+
+    previous = read_results(path)
+    again    = hs.screen_portfolio(tickers, provider=provider, previous=previous)
+
+    reused = {r["ticker"] for r in again if r.get("timing", {}).get("reuse") == "full"}
+    assert reused == {i["symbol"] for i in INFOS}
+    assert hs.verdict_changes(previous, again) == []
@@ -0,0 +1,82 @@
+"""Universe files in, chunked result files out, and the bulk CLI."""
+
+import csv
+import os
+import subprocess
+import sys
+
+import pytest
+
+import halal_screener as hs
+from conftest import INFOS
+from screener_io import OUTPUT_FIELDS, open_result_writer, read_results, read_universe
+
+SCREENER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "halal_screener.py")
+
+
+@pytest.fixture
+def results(provider) -> list:
+    return hs.screen_portfolio([i["symbol"] for i in INFOS] + ["NOPE"], provider=provider)
+
+
+def written(result: dict) -> dict:
+    """What a result should read back as: output columns, empty values dropped."""
+    return {f: result[f] for f in OUTPUT_FIELDS if result.get(f) not in (None, "")}
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "parquet"])
+def test_results_round_trip(fmt, results, tmp_path):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    path = str(tmp_path / f"results.{fmt}")
+    with open_result_writer(path, chunk_size=3) as writer:
+        for r in results:
+            writer.write(r)
+
+    assert writer.count == len(results)
+    assert read_results(path) == [written(r) for r in results]
+
+
+def test_writer_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ValueError):
+        open_result_writer(str(tmp_path / "results.xml"))
+
+
+def test_read_universe_csv_uses_ticker_column(tmp_path):
+    path = tmp_path / "universe.csv"
+    path.write_text("Name,Symbol\nApple,aapl\nMicrosoft,MSFT\nApple again,AAPL\n", encoding="utf-8")
+    assert read_universe(str(path)) == ["AAPL", "MSFT"]
+
+
+def test_read_universe_text_skips_comments(tmp_path):
+    path = tmp_path / "universe.txt"
+    path.write_text("# watchlist\naapl, msft\nNVDA  # chips\n", encoding="utf-8")
+    assert read_universe(str(path)) == ["AAPL", "MSFT", "NVDA"]
+
+
+# ── CLI bulk mode ─────────────────────────────────────────────
+
+def run_cli(*args, cwd) -> str:
+    done = subprocess.run(
+        [sys.executable, SCREENER, *args], cwd=cwd, capture_output=True, text=True, timeout=60,
+    )
+    assert done.returncode == 0, done.stderr
+    return done.stdout
+
+
+def test_cli_output_writes_results_and_diffs_previous(recording, tmp_path):
+    tickers = [i["symbol"] for i in INFOS]
+    first   = tmp_path / "first.csv"
+    run_cli("--replay", recording, "--tickers", *tickers[:5], "--output", str(first), cwd=tmp_path)
+    assert len(read_results(str(first))) == 5
+
+    second = tmp_path / "second.csv"
+    diff   = tmp_path / "diff.csv"
+    out = run_cli(
+        "--replay", recording, "--tickers", *tickers[1:], "--output", str(second),
+        "--previous", str(first), "--diff", str(diff), "--workers", "3", cwd=tmp_path,
+    )
+    assert f"Wrote {len(tickers) - 1} results" in out
+    with open(diff, newline="", encoding="utf-8") as f:
+        changes = {row["ticker"]: row["change"] for row in csv.DictReader(f)}
+    assert changes == {"CLEAN": "dropped", "HOTEL": "added", "CASINO": "added", "NOMC": "added"}
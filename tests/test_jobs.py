@@ -0,0 +1,115 @@
+"""Batch jobs: per-ticker persistence, resume after a stop, error handling."""
+
+import threading
+
+import pytest
+
+import halal_screener as hs
+from conftest import INFOS
+import screener_jobs
+from screener_jobs import JobStore, run_job
+from screener_providers import SimulatedProvider
+
+TICKERS = [i["symbol"] for i in INFOS]
+
+
+@pytest.fixture
+def store(tmp_path) -> JobStore:
+    return JobStore(str(tmp_path / "jobs.sqlite"))
+
+
+def test_create_dedupes_and_keeps_order(store):
+    job_id = store.create(["clean", "DEBT", " CLEAN ", "", "cash"])
+    assert store.exists(job_id)
+    assert store.pending(job_id) == ["CLEAN", "DEBT", "CASH"]
+    progress = store.progress(job_id)
+    assert (progress["status"], progress["total"], progress["done"]) == ("pending", 3, 0)
+
+
+def test_progress_of_unknown_job_raises(store):
+    with pytest.raises(KeyError):
+        store.progress("nope")
+
+
+def test_run_job_fetches_everything(store, provider):
+    job_id   = store.create(TICKERS)
+    progress = run_job(store, job_id, workers=4, provider=provider)
+
+    assert progress["status"] == "done"
+    assert (progress["done"], progress["pending"], progress["errors"]) == (len(TICKERS), 0, 0)
+    assert sorted(store.fundamentals(job_id)) == sorted(TICKERS)
+
+    expected = hs.screen_portfolio(TICKERS, provider=provider)
+    assert ({r["ticker"]: r["overall"] for r in store.results(job_id)}
+            == {r["ticker"]: r["overall"] for r in expected})
+
+
+def test_errors_are_recorded_and_retried_on_request(store, provider, monkeypatch):
+    job_id   = store.create(["CLEAN", "NOPE"])
+    progress = run_job(store, job_id, provider=provider)
+    assert (progress["status"], progress["errors"]) == ("done", 1)
+    assert store.pending(job_id) == []
+    assert store.pending(job_id, retry_errors=True) == ["NOPE"]
+    assert "error" in store.fundamentals(job_id)["NOPE"]
+
+    monkeypatch.setattr(hs, "NOT_FOUND", hs.NotFoundCache())   # forget the miss
+    counting = SimulatedProvider(provider, latency=(0, 0))
+    run_job(store, job_id, provider=counting, retry_errors=True)
+    assert counting.calls == 1                                  # CLEAN is not refetched
+
+
+def test_cancelled_job_resumes_where_it_stopped(store, provider):
+    job_id = store.create(TICKERS)
+    stop   = threading.Event()
+    stop.set()                                                  # stop after the first ticker
+    progress = run_job(store, job_id, workers=1, provider=provider, stop_event=stop)
+    assert progress["status"] == "cancelled"
+    assert progress["done"] == 1
+
+    # A fresh store on the same file, as after a restart
+    resumed  = JobStore(store.path)
+    left     = resumed.pending(job_id)
+    assert len(left) == len(TICKERS) - 1
+    progress = run_job(resumed, job_id, workers=2, provider=provider)
+    assert (progress["status"], progress["done"], progress["pending"]) == ("done", len(TICKERS), 0)
+
+
+class ThrottledAtFirst:
+    """Answers 429 to the first `times` requests, then delegates."""
+
+    name   = "throttled"
+    jitter = None
+
+    def __init__(self, inner, times: int):
+        self.inner = inner
+        self.times = times
+        self.calls = 0
+
+    def get_info(self, ticker):
+        self.calls += 1
+        if self.calls <= self.times:
+            raise RuntimeError("429 Too Many Requests")
+        return self.inner.get_info(ticker)
+
+
+def test_tickers_refused_by_the_breaker_stay_pending(store, provider, monkeypatch):
+    monkeypatch.setattr(screener_jobs, "MIN_BREAKER_WAIT", 0.01)
+    throttled = ThrottledAtFirst(provider, times=1)
+    breaker   = hs.CircuitBreaker(threshold=1, cooldown=0.05)
+    job_id    = store.create(TICKERS)
+
+    progress = run_job(store, job_id, provider=throttled, breaker=breaker)
+    assert breaker.opened == 1
+    assert (progress["status"], progress["errors"], progress["done"]) == ("done", 0, len(TICKERS))
+    assert throttled.calls == len(TICKERS) + 1      # only the throttled ticker was tried twice
+
+
+def test_job_cancelled_while_waiting_for_the_breaker(store, provider):
+    breaker = hs.CircuitBreaker(threshold=1, cooldown=60)
+    breaker.on_throttle()
+    job_id  = store.create(TICKERS)
+    stop    = threading.Event()
+    threading.Timer(0.05, stop.set).start()
+
+    progress = run_job(store, job_id, provider=provider, breaker=breaker, stop_event=stop)
+    assert (progress["status"], progress["errors"], progress["pending"]) == ("cancelled", 0, len(TICKERS))
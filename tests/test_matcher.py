@@ -0,0 +1,87 @@
+"""Compiled keyword matcher: both backends agree with plain substring search."""
+
+import random
+
+import pytest
+
+import halal_screener as hs
+
+
+def all_keywords() -> list:
+    return (
+        [kw for table in (hs.PRIMARY_HARAM, hs.GRAY_AREA) for kws in table.values() for kw in kws]
+        + hs.HARAM_SECTORS + hs.QUESTIONABLE_SECTORS
+    )
+
+
+def random_texts(n: int, seed: int = 0) -> list:
+    """Text sprinkled with rule keywords, some glued together (overlaps, prefixes)."""
+    rng   = random.Random(seed)
+    words = all_keywords()
+    noise = "the company makes products farms harmful services software hardware arms".split()
+    texts = []
+    for _ in range(n):
+        text = " ".join(
+            rng.choice(words if rng.random() < 0.2 else noise) for _ in range(rng.randint(0, 30))
+        )
+        texts.append((text.replace(" ", "") if rng.random() < 0.3 else text).lower())
+    return texts
+
+
+def build_matcher():
+    return hs.KeywordMatcher(hs.PRIMARY_HARAM, hs.GRAY_AREA, hs.HARAM_SECTORS, hs.QUESTIONABLE_SECTORS)
+
+
+def naive_matches(matcher, text: str) -> set:
+    """Every (table, category, keyword, start) by plain `kw in text` scanning."""
+    found = set()
+    for kw, rules in matcher.rules.items():
+        start = text.find(kw)
+        while start != -1:
+            found.update((table, category, kw, start) for table, category in rules)
+            start = text.find(kw, start + 1)
+    return found
+
+
+@pytest.fixture
+def regex_matcher(monkeypatch):
+    monkeypatch.setattr(hs, "ahocorasick", None)
+    return build_matcher()
+
+
+def test_regex_matcher_finds_every_substring_match(regex_matcher):
+    for text in random_texts(500):
+        assert set(regex_matcher.find_all(text)) == naive_matches(regex_matcher, text), text
+
+
+def test_aho_corasick_matches_regex_backend(monkeypatch):
+    pytest.importorskip("ahocorasick")
+    automaton = build_matcher()
+    assert automaton._automaton is not None
+    monkeypatch.setattr(hs, "ahocorasick", None)
+    regex_matcher = build_matcher()
+
+    for text in random_texts(500, seed=1):
+        assert automaton.find_all(text) == regex_matcher.find_all(text), text
+        assert automaton.matched_categories(text) == regex_matcher.matched_categories(text)
+
+
+def test_overlapping_keywords_all_match(regex_matcher):
+    keywords = {m.keyword for m in regex_matcher.find_all("firearms")}
+    assert {"firearms", "arms"} <= keywords
+
+
+def test_matcher_is_built_once_and_rebuilt_on_request(monkeypatch):
+    matcher = hs.keyword_matcher()
+    assert hs.keyword_matcher() is matcher
+    digest  = hs.input_fingerprint({"description": "a zzqx maker"})
+
+    try:
+        monkeypatch.setitem(hs.GRAY_AREA, "Test Category", ["zzqx"])
+        hs.keyword_rules_changed()
+        assert hs.keyword_matcher() is not matcher
+        assert hs.screen_business_activity({"description": "a zzqx maker"})["verdict"] == "questionable"
+        assert hs.input_fingerprint({"description": "a zzqx maker"}) != digest
+    finally:
+        monkeypatch.undo()
+        hs.keyword_rules_changed()
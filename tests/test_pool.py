@@ -0,0 +1,49 @@
+"""Process-pool screening must give exactly the serial results."""
+
+import json
+
+import pytest
+
+import halal_screener as hs
+from conftest import INFOS, random_infos
+from screener_pool import screen_universe
+from screener_providers import FileProvider
+
+
+def strip(results):
+    return [{k: v for k, v in r.items() if k not in ("timing", "screened_at")} for r in results]
+
+
+@pytest.fixture
+def universe(tmp_path):
+    """200 varied tickers plus the fixture set and one unknown symbol."""
+    infos = random_infos(200) + INFOS
+    path  = tmp_path / "universe.json"
+    path.write_text(json.dumps(infos), encoding="utf-8")
+    return [i["symbol"] for i in infos] + ["NOPE"], FileProvider(str(path))
+
+
+def test_pool_matches_serial_without_cache(universe):
+    tickers, provider = universe
+    serial = hs.screen_portfolio(tickers, provider=provider)
+    pooled = screen_universe(tickers, processes=2, provider=provider)
+    assert strip(pooled) == strip(serial)
+
+
+def test_pool_matches_serial_with_partial_cache(universe, cache):
+    tickers, provider = universe
+    for t in tickers[:120]:
+        hs.fetch_stock_data(t, provider=provider, cache=cache)
+    serial = hs.screen_portfolio(tickers, provider=provider)
+
+    pooled = hs.screen_portfolio(tickers, processes=2, provider=provider, cache=cache)
+    assert strip(pooled) == strip(serial)
+    assert sum(r["timing"].get("cache") == "hit" for r in pooled) == 120
+
+
+def test_pool_applies_thresholds(universe):
+    tickers, provider = universe
+    strict = hs.Thresholds.from_percent(20, 20, 2)
+    serial = hs.screen_portfolio(tickers, provider=provider, thresholds=strict)
+    pooled = screen_universe(tickers, processes=2, provider=provider, thresholds=strict)
+    assert strip(pooled) == strip(serial)
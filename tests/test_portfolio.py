@@ -0,0 +1,71 @@
+"""Concurrent screening: the shared token bucket and thread-pool fetching."""
+
+import time
+
+import pytest
+
+import halal_screener as hs
+from conftest import INFOS
+
+
+# ── RateLimiter ───────────────────────────────────────────────
+
+def test_rate_limiter_allows_burst_then_paces():
+    limiter = hs.RateLimiter(rate=20, burst=2)
+    assert limiter.acquire() == 0.0
+    assert limiter.acquire() == 0.0
+
+    started = time.monotonic()
+    waited  = limiter.acquire()
+    assert waited > 0
+    assert time.monotonic() - started >= 0.04       # ~1/20 s for the next token
+
+
+def test_rate_limiter_backoff_pauses_every_caller():
+    limiter = hs.RateLimiter(rate=100, burst=5)
+    limiter.backoff(0.1)
+    limiter.backoff(0.01)                           # never shortens the pause
+    assert limiter.acquire() >= 0.09
+
+
+def test_shared_limiter_paces_all_workers(provider):
+    limiter = hs.RateLimiter(rate=50, burst=1)
+    started = time.monotonic()
+    list(hs.iter_fetch([i["symbol"] for i in INFOS], workers=4, limiter=limiter, provider=provider))
+    # 8 requests, 1 up front and 7 at 50/s
+    assert time.monotonic() - started >= 7 / 50 * 0.9
+
+
+# ── Thread-pool fetching ──────────────────────────────────────
+
+def test_iter_fetch_yields_every_ticker_once(simulated):
+    tickers = ["CLEAN", "DEBT", "CASH", "BANK", "NOPE"]
+    fetched = list(hs.iter_fetch(tickers, workers=4, provider=simulated))
+    assert sorted(d["ticker"] for d in fetched) == sorted(tickers)
+    assert [d["ticker"] for d in fetched if "error" in d] == ["NOPE"]
+
+
+def test_concurrent_screen_matches_sequential(simulated):
+    tickers = [i["symbol"] for i in INFOS] + ["NOPE"]
+
+    def strip(results):
+        return [{k: v for k, v in r.items() if k not in ("timing", "screened_at")} for r in results]
+
+    sequential = hs.screen_portfolio(tickers, provider=simulated)
+    concurrent = hs.screen_portfolio(tickers, workers=4, provider=simulated)
+    assert strip(concurrent) == strip(sequential)
+    assert [r["ticker"] for r in sequential][-1] == "NOPE"      # errors sort last
+
+
+@pytest.mark.parametrize("symbol, overall", [
+    ("CLEAN",  "✅ COMPLIANT"),
+    ("DEBT",   "❌ NON-COMPLIANT"),
+    ("CASH",   "❌ NON-COMPLIANT"),
+    ("HARAMR", "❌ NON-COMPLIANT"),
+    ("BANK",   "❌ NON-COMPLIANT"),
+    ("CASINO", "❌ NON-COMPLIANT"),
+    ("HOTEL",  "🟡 QUESTIONABLE"),
+    ("NOMC",   "✅ COMPLIANT"),
+])
+def test_fixture_verdicts(symbol, overall, provider):
+    assert hs.screen_stock(symbol, provider=provider)["overall"] == overall
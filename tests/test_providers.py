@@ -0,0 +1,94 @@
+"""YahooProvider payload handling (no network) and batched quote refreshes."""
+
+import pytest
+
+import halal_screener as hs
+from screener_cache import FundamentalsCache
+from screener_providers import SimulatedProvider, SymbolNotFound, YahooProvider
+
+
+class FakeYahoo(YahooProvider):
+    """YahooProvider answering from canned JSON payloads."""
+
+    jitter = None
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def _get_json(self, url, params):
+        if isinstance(self.payload, Exception):
+            raise self.payload
+        return self.payload
+
+
+def summary(**modules) -> dict:
+    return {"quoteSummary": {"result": [modules], "error": None}}
+
+
+def test_get_info_merges_modules_and_keeps_forward_yield():
+    info = FakeYahoo(summary(
+        price={"longName": "Clean Corp", "marketCap": {"raw": 1e9, "fmt": "1B"}},
+        summaryDetail={"dividendYield": 0.012, "trailingAnnualDividendYield": 0.01},
+        assetProfile={"sector": "Technology", "longBusinessSummary": "Software."},
+    )).get_info("CLEAN")
+
+    assert info == {
+        "longName": "Clean Corp", "marketCap": 1e9, "dividendYield": 0.012,
+        "sector": "Technology", "longBusinessSummary": "Software.",
+    }
+
+
+def test_sparse_info_is_not_a_rate_limit():
+    etf = FakeYahoo(summary(price={"longName": "Broad Market ETF", "regularMarketPrice": 400.0}))
+    data = hs.fetch_stock_data("ETF", provider=etf)
+    assert "error" not in data
+    assert data["name"] == "Broad Market ETF"
+    assert data["timing"]["rate_limited"] == 0
+
+
+@pytest.mark.parametrize("payload", [
+    {},
+    {"quoteSummary": {"result": [], "error": None}},
+    summary(),
+])
+def test_empty_payload_is_a_rate_limit(payload):
+    with pytest.raises(ValueError, match="possible rate limit"):
+        FakeYahoo(payload).get_info("CLEAN")
+
+    data = hs.fetch_stock_data("CLEAN", max_retries=1, provider=FakeYahoo(payload))
+    assert "error" in data
+    assert data["timing"]["rate_limited"] == 1
+
+
+def test_not_found_body_raises_symbol_not_found():
+    payload = {"quoteSummary": {"result": None, "error": {"code": "Not Found"}}}
+    with pytest.raises(SymbolNotFound):
+        FakeYahoo(payload).get_info("NOPE")
+
+
+def test_falls_back_to_public_info_without_the_raw_json_helper(monkeypatch):
+    provider = FakeYahoo(NotImplementedError("no YfData"))
+    monkeypatch.setattr(provider, "_get_info_public", lambda ticker: {"longName": f"{ticker} Corp"})
+    assert provider.get_info("CLEAN") == {"longName": "CLEAN Corp"}
+
+
+def test_quote_yield_is_scaled_to_a_fraction():
+    quotes = FakeYahoo({"quoteResponse": {"result": [
+        {"symbol": "clean", "regularMarketPrice": 101.0, "dividendYield": 1.2, "trailingPE": None},
+    ]}}).get_quotes(["CLEAN"])
+    assert quotes == {"CLEAN": {"regularMarketPrice": 101.0, "dividendYield": pytest.approx(0.012)}}
+
+
+def test_refresh_quotes_renews_prices_in_one_batch(provider, tmp_path):
+    cache = FundamentalsCache(str(tmp_path / "c.sqlite"))
+    for info in ("CLEAN", "DEBT", "CASH"):
+        hs.fetch_stock_data(info, provider=provider, cache=cache)
+    cache.ttls["quote"] = -1
+
+    counted = SimulatedProvider(provider, latency=(0, 0), seed=0)
+    assert hs.refresh_quotes(["CLEAN", "DEBT", "CASH"], provider=counted, cache=cache) == 3
+    assert counted.calls == 1
+
+    cache.ttls["quote"] = 3600
+    assert cache.stale_groups(["CLEAN", "DEBT", "CASH"]) == {}
+    cache.close()
@@ -0,0 +1,81 @@
+"""Adaptive (AIMD) rate control: learning Yahoo's tolerated request rate."""
+
+import threading
+
+import pytest
+
+import halal_screener as hs
+from screener_providers import SimulatedProvider
+
+
+# ── AdaptiveRateLimiter (AIMD) ────────────────────────────────
+
+def test_adaptive_limiter_grows_on_success_and_halves_on_throttle(tmp_path):
+    limiter = hs.AdaptiveRateLimiter(2.0, state_path=str(tmp_path / "rate.json"))
+    concurrency = limiter.concurrency
+
+    for _ in range(concurrency):
+        limiter.on_success()
+    assert limiter.rate > 2.0
+    assert limiter.concurrency == concurrency + 1
+
+    rate = limiter.rate
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(rate * hs.ADAPTIVE_RATE["decrease"])
+    assert limiter.concurrency == max(1, int((concurrency + 1) * hs.ADAPTIVE_RATE["decrease"]))
+
+    # 429s from requests already in flight are one signal, not several
+    limiter.on_throttle()
+    assert limiter.throttles == 1
+
+
+def test_adaptive_limiter_respects_bounds(tmp_path):
+    limiter = hs.AdaptiveRateLimiter(1.0, state_path=str(tmp_path / "rate.json"), min_rate=0.5, max_rate=1.1)
+    for _ in range(50):
+        limiter.on_success()
+    assert limiter.rate == 1.1
+
+    limiter._last_cut = float("-inf")
+    limiter.on_throttle()
+    limiter._last_cut = float("-inf")
+    limiter.on_throttle()
+    assert limiter.rate == 0.5
+
+
+def test_adaptive_limiter_starts_from_saved_rate(tmp_path):
+    path = str(tmp_path / "rate.json")
+    limiter = hs.AdaptiveRateLimiter(4.0, state_path=path)
+    limiter.on_throttle()                           # saves 2.0
+
+    assert hs.AdaptiveRateLimiter(state_path=path).rate == 2.0
+    assert hs.AdaptiveRateLimiter(3.0, state_path=path).rate == 3.0
+
+
+def test_adaptive_limiter_caps_requests_in_flight(tmp_path):
+    limiter = hs.AdaptiveRateLimiter(100.0, burst=10, state_path=str(tmp_path / "rate.json"))
+    limiter.concurrency = 1
+    limiter.acquire()
+
+    admitted = threading.Event()
+    waiter   = threading.Thread(target=lambda: (limiter.acquire(), admitted.set()))
+    waiter.start()
+    assert not admitted.wait(0.05)
+    limiter.release()
+    assert admitted.wait(1.0)
+    waiter.join()
+
+
+def test_throttled_fetch_cuts_the_adaptive_rate(provider, tmp_path):
+    throttled = SimulatedProvider(provider, latency=(0, 0), throttle_rate=1.0, seed=0)
+    limiter   = hs.AdaptiveRateLimiter(8.0, state_path=str(tmp_path / "rate.json"))
+
+    data = hs.fetch_stock_data("CLEAN", max_retries=1, provider=throttled, limiter=limiter)
+    assert "error" in data
+    assert limiter.throttles == 1
+    assert limiter.rate == pytest.approx(8.0 * hs.ADAPTIVE_RATE["decrease"])
+
+
+def test_default_limiter_only_for_paced_providers(provider):
+    assert hs._default_limiter(None, provider, workers=4) is None
+    assert isinstance(hs._default_limiter(None, hs.YahooProvider(), workers=4), hs.RateLimiter)
+    assert hs._default_limiter(None, hs.YahooProvider(), workers=1) is None
@@ -0,0 +1,70 @@
+"""ResultsTable: precomputed groups and sort orders agree with plain list code."""
+
+import pytest
+
+import halal_screener as hs
+from conftest import INFOS, random_infos
+from screener_results import GROUPS, SORTS, ResultsTable, verdict_counts
+
+
+@pytest.fixture(scope="module")
+def results() -> list:
+    records = [hs.normalize_info(i["symbol"], i) for i in INFOS + random_infos(300)]
+    records.append({"ticker": "ERR", "error": "boom"})
+    return hs.sort_results([hs.evaluate_stock(r) for r in records], [r["ticker"] for r in records])
+
+
+def in_group(r: dict, group: str) -> bool:
+    c = r.get("compliant")
+    return {
+        "all":           True,
+        "compliant":     c is True,
+        "questionable":  c is None,
+        "non_compliant": c is False,
+    }[group]
+
+
+def sort_key(sort: str):
+    col, missing = SORTS[sort]
+    if col is None:
+        return None
+    if missing is None:
+        return lambda r: str(r.get(col) or "")
+    return lambda r: r.get(col) or missing
+
+
+@pytest.mark.parametrize("group", GROUPS)
+@pytest.mark.parametrize("sort", list(SORTS))
+def test_view_matches_filtering_and_sorting_the_list(results, group, sort):
+    expected = [r for r in results if in_group(r, group)]
+    if sort_key(sort) is not None:
+        expected = sorted(expected, key=sort_key(sort))
+    assert [r["ticker"] for r in ResultsTable(results).view(group, sort)] == \
+           [r["ticker"] for r in expected]
+
+
+def test_counts_match_verdict_counts(results):
+    table = ResultsTable(results)
+    assert table.counts == verdict_counts(results)
+    assert len(table) == len(results)
+    assert table.counts["non_compliant"] >= 1          # the error row
+
+
+def test_view_pages_return_the_original_dicts(results):
+    table = ResultsTable(results)
+    page  = table.view("all", "ticker", start=10, stop=20)
+    assert len(page) == 10
+    assert all(any(r is original for original in results) for r in page)
+
+
+def test_display_leaves_out_errors(results):
+    display = ResultsTable(results).display
+    assert "ERR" not in set(display["Ticker"])
+    assert len(display) == sum(r["overall"] != "⚠️ ERROR" for r in results)
+
+
+def test_empty_results():
+    table = ResultsTable([])
+    assert table.counts == dict.fromkeys(GROUPS, 0)
+    assert table.view("compliant", "debt") == []
+    assert table.display.empty
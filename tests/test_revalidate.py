@@ -0,0 +1,109 @@
+"""Stale-while-revalidate: expired cached data is served at once and renewed behind."""
+
+import threading
+import time
+
+import pytest
+
+import halal_screener as hs
+from conftest import INFOS
+from screener_providers import SimulatedProvider
+
+TICKERS = [i["symbol"] for i in INFOS]
+
+
+@pytest.fixture
+def slow(provider) -> SimulatedProvider:
+    """Every request — info or quotes — takes 300ms."""
+    return SimulatedProvider(provider, latency=(0.3, 0.3), seed=0)
+
+
+def age(cache, seconds: float, group: str = None):
+    """Pretend the cached groups (or just `group`) were fetched `seconds` earlier."""
+    sql = "UPDATE fields SET fetched_at = fetched_at - ?" + (" WHERE grp = ?" if group else "")
+    cache._conn.execute(sql, (seconds, group) if group else (seconds,))
+
+
+def settle(timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while hs.revalidations_pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert hs.revalidations_pending() == 0
+
+
+def test_expired_data_is_served_at_once_and_renewed_behind(provider, slow, cache):
+    hs.fetch_stock_data("CLEAN", provider=provider, cache=cache)
+    age(cache, cache.ttls["fundamentals"] + 60)
+
+    renewed = []
+    started = time.monotonic()
+    data    = hs.fetch_stock_data("CLEAN", provider=slow, cache=cache,
+                                  revalidate=True, on_revalidated=renewed.append)
+    assert time.monotonic() - started < 0.2
+    assert data["timing"]["cache"] == "revalidate"
+    assert data["timing"]["age_s"] > cache.ttls["fundamentals"]
+    assert data["name"] == "CLEAN Corp"
+
+    settle()
+    assert len(renewed) == 1
+    assert renewed[0]["name"] == "CLEAN Corp"
+    assert renewed[0]["timing"]["cache"] != "revalidate"
+    assert hs.fetch_stock_data("CLEAN", provider=slow, cache=cache)["timing"]["cache"] == "hit"
+
+
+def test_concurrent_callers_share_one_renewal(provider, slow, cache):
+    hs.fetch_stock_data("CLEAN", provider=provider, cache=cache)
+    age(cache, cache.ttls["fundamentals"] + 60)
+
+    renewed = []
+    for _ in range(3):
+        hs.fetch_stock_data("CLEAN", provider=slow, cache=cache,
+                            revalidate=True, on_revalidated=renewed.append)
+    settle()
+    assert len(renewed) == 3
+    assert slow.calls <= 2                          # a quote request and/or one full fetch
+
+
+def test_data_past_the_revalidate_window_is_fetched_normally(provider, cache):
+    hs.fetch_stock_data("CLEAN", provider=provider, cache=cache)
+    age(cache, hs.REVALIDATE_MAX_AGE + 60)
+
+    data = hs.fetch_stock_data("CLEAN", provider=provider, cache=cache, revalidate=True)
+    assert data["timing"]["cache"] == "miss"
+    assert hs.revalidations_pending() == 0
+
+
+def test_stale_prices_do_not_block_a_revalidating_screen(provider, slow, cache):
+    for t in TICKERS:
+        hs.fetch_stock_data(t, provider=provider, cache=cache)
+    age(cache, cache.ttls["quote"] + 60, group="quote")
+
+    done    = threading.Event()
+    renewed = []
+
+    def on_revalidated(result):
+        renewed.append(result)
+        if len(renewed) == len(TICKERS):
+            done.set()
+
+    started = time.monotonic()
+    results = list(hs.iter_screen_portfolio(TICKERS, workers=4, provider=slow, cache=cache,
+                                            revalidate=True, on_revalidated=on_revalidated))
+    assert time.monotonic() - started < 0.2         # no up-front 300ms quote request
+    assert {r["timing"]["cache"] for r in results} == {"revalidate"}
+
+    assert done.wait(5)
+    settle()
+    assert sorted(r["ticker"] for r in renewed) == sorted(TICKERS)
+    assert all("overall" in r for r in renewed)
+    assert cache.stale_groups(TICKERS) == {}
+
+
+def test_iter_fetch_without_revalidate_renews_prices_first(provider, slow, cache):
+    for t in TICKERS:
+        hs.fetch_stock_data(t, provider=provider, cache=cache)
+    age(cache, cache.ttls["quote"] + 60, group="quote")
+
+    fetched = list(hs.iter_fetch(TICKERS, workers=4, provider=slow, cache=cache))
+    assert {d["timing"]["cache"] for d in fetched} == {"hit"}
+    assert slow.calls == 1                          # one batched quote request
@@ -0,0 +1,60 @@
+"""Cache pre-warming: only what is due is fetched, within its own budget and breaker."""
+
+import halal_screener as hs
+from conftest import INFOS
+from screener_providers import SimulatedProvider
+from screener_warm import Warmer, default_universe
+
+TICKERS = [i["symbol"] for i in INFOS]
+
+
+def test_default_universe_covers_presets_once():
+    universe = default_universe()
+    assert len(universe) == len(set(universe))
+    assert set(hs.DEFAULT_TICKERS) <= set(universe)
+    for preset in hs.PRESETS.values():
+        assert set(preset) <= set(universe)
+
+
+def test_passes_fetch_only_what_is_due(provider, cache):
+    counted = SimulatedProvider(provider, latency=(0, 0), seed=0)
+    warmer  = Warmer(TICKERS, cache, interval=60, rate=1000, provider=counted)
+
+    first = warmer.run_once()
+    assert (first["fetched"], first["errors"]) == (len(TICKERS), 0)
+    assert counted.calls == len(TICKERS)
+    assert all(hs.fetch_stock_data(t, provider=counted, cache=cache)["timing"]["cache"] == "hit"
+               for t in TICKERS)
+
+    calls  = counted.calls
+    second = warmer.run_once()
+    assert (second["quotes"], second["fetched"]) == (0, 0)
+    assert counted.calls == calls
+
+
+def test_quote_only_staleness_is_renewed_in_one_batch(provider, cache):
+    counted = SimulatedProvider(provider, latency=(0, 0), seed=0)
+    warmer  = Warmer(TICKERS, cache, interval=60, rate=1000, provider=counted)
+    warmer.run_once()
+
+    # Age the prices past their TTL, leaving the fundamentals fresh
+    cache._conn.execute("UPDATE fields SET fetched_at = fetched_at - ? WHERE grp = 'quote'",
+                        (cache.ttls["quote"] + 1,))
+    calls = counted.calls
+    stats = warmer.run_once()
+    assert (stats["quotes"], stats["fetched"]) == (len(TICKERS), 0)
+    assert counted.calls == calls + 1
+
+
+def test_warm_throttling_does_not_open_the_shared_breaker(provider, cache):
+    throttled = SimulatedProvider(provider, latency=(0, 0), throttle_rate=1.0, seed=0)
+    warmer    = Warmer(TICKERS, cache, interval=60, rate=1000, provider=throttled)
+    warmer.breaker = hs.CircuitBreaker(threshold=1, cooldown=60)
+
+    stats = warmer.run_once()
+    assert stats["errors"] == len(TICKERS)
+    assert throttled.calls == 1                     # the rest failed fast on the warm breaker
+    assert warmer.breaker.state == "open"
+    assert hs.BREAKER.state == "closed"
+    assert hs.BREAKER.stats()["opened"] == 0
+    assert hs.BREAKER.allow()